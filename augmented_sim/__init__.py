@@ -1,6 +1,10 @@
 import pathlib
 import os
 import re
+import sys
+
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 __version__ = '0.0.1.dev1'
 __year__ = 2020
@@ -15,7 +19,9 @@ GIT_URL = 'https://gitlab.com/projeto-fm-usp-mortalidade-sp/' \
 here = pathlib.Path(__file__).parent.resolve()
 
 
-LONG_DESCRIPTION = (here.parent / 'README.md').read_text(encoding='utf-8')
+def _long_description() -> str:
+    return (here.parent / 'README.md').read_text(encoding='utf-8')
+
 
 PROJECT_DESCRIPTION = '''
 Este programa está sendo desenvolvido como parte do projeto
@@ -32,26 +38,73 @@ sob responsabilidade do Prof. Dr. Paulo Andrade Lotufo (palotufo@usp.br).
 - Vinícius Bitencourt Matos (bolsista de dez/2020 a jul/2021).'''.strip()
 
 
-PROGRAM_METADATA = {}
+# Texts, the year and the (name, text) of each licence
+MetadataValue = Union[str, int, List[Tuple[str, str]]]
+
+
+class LazyMetadata(MutableMapping):
+    '''A dict that is only filled (by load) when it is first used.
+
+    Starting the program does not read the files the metadata come from.
+    '''
+
+    def __init__(self, load: Callable[[Dict[str, MetadataValue]], None]):
+        self._load = load
+        self._values = None
+
+    def _loaded(self) -> Dict[str, MetadataValue]:
+        if self._values is None:
+            self._values = {}
+            self._load(self._values)
+        return self._values
+
+    def __getitem__(self, key: str) -> MetadataValue:
+        return self._loaded()[key]
 
+    def __setitem__(self, key: str, value: MetadataValue) -> None:
+        self._loaded()[key] = value
 
-def define_values() -> None:
-    PROGRAM_METADATA['NAME'] = NAME
-    PROGRAM_METADATA['VERSION'] = __version__
-    PROGRAM_METADATA['YEAR'] = __year__
-    PROGRAM_METADATA['LICENCE_TEXT'] = (here.parent / 'LICENCE.txt') \
+    def __delitem__(self, key: str) -> None:
+        del self._loaded()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaded())
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+
+def define_values(metadata: Optional[Dict] = None) -> None:
+    if metadata is None:
+        metadata = PROGRAM_METADATA
+    metadata['NAME'] = NAME
+    metadata['VERSION'] = __version__
+    metadata['YEAR'] = __year__
+    metadata['LICENCE_TEXT'] = (here.parent / 'LICENCE.txt') \
         .read_text(encoding='utf-8')
-    PROGRAM_METADATA['READ_ME'] = (here.parent / 'README.md') \
+    metadata['READ_ME'] = (here.parent / 'README.md') \
         .read_text(encoding='utf-8') \
         .split('<!-- ABOUT:END -->')[0].split('<!-- ABOUT:BEGIN -->')[-1] \
         + '<br/> <br/> \n \n' + f'[Documentação]({GIT_URL})'
     directory = here / '.licences'
-    PROGRAM_METADATA['LICENCES'] = []
+    metadata['LICENCES'] = []
     for f in sorted(os.listdir(directory)):
         if re.match(r'^\d\d_.+', f):
             licence = (directory / f).read_text(encoding='utf-8')
-            PROGRAM_METADATA['LICENCES'].append((f[3:], licence))
-    PROGRAM_METADATA['PROJECT_DESCRIPTION'] = PROJECT_DESCRIPTION
+            metadata['LICENCES'].append((f[3:], licence))
+    metadata['PROJECT_DESCRIPTION'] = PROJECT_DESCRIPTION
+
+
+# Read from the files on first access
+PROGRAM_METADATA = LazyMetadata(define_values)
+
+
+def __getattr__(name: str):
+    # LONG_DESCRIPTION is also read on first access (Python >= 3.7)
+    if name == 'LONG_DESCRIPTION':
+        return _long_description()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
-define_values()
+if sys.version_info < (3, 7):
+    LONG_DESCRIPTION = _long_description()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import csv
+import io
+
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, \
+    Optional, Sequence, Tuple
+
+from augmented_sim.compression import CompressedFile, compression_suffix, \
+    is_compressed, split_member, zip_members
+from augmented_sim.i18n import get_translator, get_tr
+from augmented_sim.table_reader import TableReadingError
+from augmented_sim.table_writer import TableWriter
+
+
+class Aggregator:
+    '''Counts the rows by the values of some columns (the dimensions).
+
+    Counts are kept in memory, one per distinct combination of values, and
+    can be merged with other counts of the same dimensions (computed by
+    worker processes or loaded from a file saved by a previous run).
+    '''
+
+    COUNT_COLUMN = 'OBITOS'
+
+    def __init__(self, dimensions: List[str],
+                 types: Optional[Dict[str, str]] = None):
+        self.dimensions = dimensions
+        self.types = types or {}
+        self.counts = Counter()
+
+    @classmethod
+    def keys(cls, dimensions: List[str], columns: List[str],
+             rows: Iterable[Sequence]) -> Iterator[Tuple]:
+        # Values of the dimensions in each row (given in the order of
+        # columns)
+        indices = [columns.index(d) for d in dimensions]
+        if len(indices) == 1:
+            return zip(map(itemgetter(*indices), rows))
+        return map(itemgetter(*indices), rows)
+
+    @classmethod
+    def count(cls, dimensions: List[str], columns: List[str],
+              rows: Iterable[Sequence]) -> Counter:
+        return Counter(cls.keys(dimensions, columns, rows))
+
+    def add(self, columns: List[str], rows: Iterable[Sequence]) -> None:
+        self.counts.update(self.keys(self.dimensions, columns, rows))
+
+    def merge(self, counts: Mapping[Tuple, int]) -> None:
+        self.counts.update(counts)
+
+    def normalized(self) -> Counter:
+        # Blank values are written as '' (and read back as such)
+        counts = Counter()
+        for key, n in self.counts.items():
+            if None in key:
+                key = tuple('' if v is None else v for v in key)
+            counts[key] += n
+        return counts
+
+    @classmethod
+    def _sort_key(cls, key: Tuple) -> List[Tuple[int, Any]]:
+        # Numbers first, then text
+        return [(0, v) if isinstance(v, (int, float)) else (1, str(v))
+                for v in key]
+
+    def save(self, file_name: str, format: Optional[str] = None) -> int:
+        '''Writes the counts (sorted by the dimensions); returns how many.'''
+        counts = self.normalized()
+        format = format or TableWriter.format_for(file_name)
+        types = {**self.types, self.COUNT_COLUMN: 'int'}
+        columns = [*self.dimensions, self.COUNT_COLUMN]
+        with TableWriter(format, columns, file_name, types) as w:
+            w.write_header()
+            w.write_many((*key, counts[key])
+                         for key in sorted(counts, key=self._sort_key))
+        return len(counts)
+
+    def load(self, file_name: str) -> None:
+        '''Adds the counts in a file saved with the same dimensions.'''
+        columns = [*self.dimensions, self.COUNT_COLUMN]
+        try:
+            if TableWriter.format_for(file_name) == 'CSV':
+                rows = self._read_csv(file_name, columns)
+            else:
+                rows = self._read_columnar(file_name, columns)
+            for *key, n in rows:
+                key = tuple(int(v) if isinstance(v, float) and v.is_integer()
+                            else '' if v is None else v for v in key)
+                self.counts[key] += int(n)
+        except Exception as e:
+            tr = get_tr(type(self).__name__, get_translator(None))
+            msg = tr('invalid-aggregate').format(
+                file_name, ', '.join(columns))
+            raise TableReadingError(msg, file_name, e)
+
+    @classmethod
+    def _read_csv(cls, file_name: str, columns: List[str]) -> List[List]:
+        # Numbers are not quoted (see TableWriter), which compresses the
+        # file according to its suffix; a zip archive has it as its member
+        if compression_suffix(file_name) == '.zip' and \
+                split_member(file_name)[1] is None:
+            file_name = (zip_members(file_name) or [file_name])[0]
+        if is_compressed(file_name):
+            fd = io.TextIOWrapper(CompressedFile(file_name), newline='')
+        else:
+            fd = open(file_name, newline='')
+        with fd:
+            reader = csv.reader(fd, quoting=csv.QUOTE_NONNUMERIC)
+            if next(reader) != columns:
+                raise ValueError(f'columns are not {columns}')
+            return list(reader)
+
+    @classmethod
+    def _read_columnar(cls, file_name: str,
+                       columns: List[str]) -> List[List]:
+        if TableWriter.format_for(file_name) == 'PARQUET':
+            import pyarrow.parquet as pq
+            table = pq.read_table(file_name)
+        else:
+            import pyarrow.ipc as ipc
+            table = ipc.open_file(file_name).read_all()
+        if table.column_names != columns:
+            raise ValueError(f'columns are not {columns}')
+        return list(zip(*[c.to_pylist() for c in table.columns]))
@@ -2,8 +2,12 @@
 # coding=utf-8
 
 import argparse
+import codecs
+import datetime
 import sys
 
+from typing import List, Optional
+
 if vars(sys.modules[__name__])['__package__'] is None and \
         __name__ == '__main__':
     # allow running from any folder
@@ -12,26 +16,155 @@ if vars(sys.modules[__name__])['__package__'] is None and \
     sys.path.insert(1, str(here))
 
 
-from augmented_sim.core import AugmentedSIM
+from augmented_sim.core import AugmentedSIM, ORIGINAL_COLUMNS
+from augmented_sim.delta import ROW_HASH
+from augmented_sim.row_filter import RowFilter
+from augmented_sim.table_reader import TableReader
+from augmented_sim.table_writer import TableWriter
 from augmented_sim.sim.input_pattern import ALL_PATTERNS
 
 
+def encoding_name(value: str) -> str:
+    try:
+        return codecs.lookup(value).name
+    except LookupError:
+        raise argparse.ArgumentTypeError(f'unknown encoding: {value}')
+
+
+def column_list(value: str) -> Optional[List[str]]:
+    columns = [col.strip() for col in value.split(',') if col.strip()]
+    return columns or None
+
+
+def year_list(value: str) -> Optional[List[int]]:
+    try:
+        return [int(year) for year in column_list(value) or []] or None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid years: {value}')
+
+
+def iso_date(value: str) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid date: {value}')
+
+
 def main() -> None:
     desc = '''
-    This program reads a DBF or CSV file containing death causes encoded
+    This program reads a DBF, DBC or CSV file containing death causes encoded
     according to "Sistema de Informa\xe7\xe3o sobre Mortalidade" (SIM).
-    It adds a few columns and saves the file as CSV.
+    It adds a few columns and saves the file as CSV (or as Parquet or Arrow,
+    according to the output file extension or to --format).
+    Files ending in .gz, .xz, .bz2, .zst or .zip are read and written
+    compressed.
     '''
 
     # Command-line arguments
     arg_parser = argparse.ArgumentParser(description=desc)
     arg_parser.add_argument('output_file', type=str,
-                            help='output file name (CSV)')
+                            help='output file name (CSV, possibly '
+                            'compressed, Parquet or Arrow)')
     arg_parser.add_argument('input_files', nargs='+',
                             type=str,
-                            help='input file names (DBF or CSV)')
+                            help='input file names (DBF, DBC or CSV)')
     arg_parser.add_argument('--pattern', '-p', type=str, required=True,
                             choices=list(ALL_PATTERNS.keys()))
+    arg_parser.add_argument('--workers', '-w', type=int, default=1,
+                            help='number of worker processes (default: 1)')
+    arg_parser.add_argument('--encoding', '-e', type=encoding_name,
+                            help='encoding of the CSV input files '
+                            '(default: detect)')
+    arg_parser.add_argument('--cache-size', type=int, default=0,
+                            help='remember up to this many results of each '
+                            'augmenter (default: 0, disabled)')
+    arg_parser.add_argument('--dbf-backend', default='fast',
+                            choices=TableReader.DBF_BACKENDS,
+                            help='DBF reader (default: fast, which falls '
+                            'back to dbfread when needed)')
+    arg_parser.add_argument('--format', '-f', type=str.upper,
+                            choices=TableWriter.FORMATS,
+                            help='output format (default: from the output '
+                            'file extension, .parquet, .arrow or .feather, '
+                            'or CSV otherwise)')
+    arg_parser.add_argument('--columns', '-c', type=column_list,
+                            help='comma-separated list of the columns to '
+                            'save, among the new ones and those of the input '
+                            f'files ("{ORIGINAL_COLUMNS}" for all of the '
+                            'latter); only what they need is computed '
+                            '(default: all columns)')
+    filters = arg_parser.add_argument_group(
+        'filters', 'only the rows that pass all of them are augmented and '
+        'saved')
+    filters.add_argument('--date-from', type=iso_date, metavar='YYYY-MM-DD',
+                         help='first date of death (DTOBITO)')
+    filters.add_argument('--date-to', type=iso_date, metavar='YYYY-MM-DD',
+                         help='last date of death (DTOBITO)')
+    filters.add_argument('--year', type=year_list,
+                         help='comma-separated list of years of death (ANO)')
+    filters.add_argument('--municipality', type=column_list,
+                         help='comma-separated list of municipalities of '
+                         'residence (CODMUNRES)')
+    filters.add_argument('--cause', type=column_list,
+                         help='comma-separated list of prefixes of the '
+                         'underlying cause of death (CAUSABAS), e.g. '
+                         'B34,U07')
+    aggregation = arg_parser.add_argument_group(
+        'aggregation', 'count the rows by the values of some columns')
+    aggregation.add_argument('--group-by', '-g', type=column_list,
+                             help='comma-separated list of the columns to '
+                             'count by, e.g. ANOEPI,SEMANAEPI,CIDBR; the '
+                             'counts are saved in the output file instead of '
+                             'the rows (and --columns is ignored), unless '
+                             '--aggregate-file is given')
+    aggregation.add_argument('--aggregate-file', type=str,
+                             help='file where the counts are saved, besides '
+                             'the rows in the output file')
+    aggregation.add_argument('--merge-aggregate', type=str, action='append',
+                             metavar='FILE',
+                             help='add the counts saved in this file by a '
+                             'previous run with the same --group-by (can be '
+                             'repeated)')
+    incremental = arg_parser.add_argument_group(
+        'incremental runs', 'only augment the rows that are not in the '
+        'output of a previous run, and copy the others')
+    incremental.add_argument('--previous', type=str, metavar='FILE',
+                             help='CSV file saved by a previous run with the '
+                             'same columns (not the output file); the new, '
+                             'changed and removed rows are listed in the '
+                             'output file name followed by ".changes.csv"')
+    incremental.add_argument('--key', type=str, default='NUMERODO',
+                             help='column that identifies each row (default: '
+                             f'NUMERODO), or "{ROW_HASH}" for all the columns '
+                             'read from the input files')
+    arg_parser.add_argument('--resume', action='store_true',
+                            help='continue writing the output file from the '
+                            'last checkpoint of a run that was interrupted '
+                            '(only for uncompressed CSV output)')
+    metrics = arg_parser.add_argument_group(
+        'metrics', 'the time spent in each stage (reading, each new column, '
+        'writing...) is shown at the end and can also be saved')
+    metrics.add_argument('--metrics', type=str, metavar='FILE',
+                         help='save the metrics in this JSON file')
+    metrics.add_argument('--prometheus', type=str, metavar='FILE',
+                         help='save the metrics in this file in the text '
+                         'format of Prometheus (for the textfile collector '
+                         'of the node exporter, use a ".prom" file)')
+    profiling = arg_parser.add_argument_group(
+        'profiling', 'profile the thread that reads, augments and writes the '
+        'rows (not the worker processes, so use them with --workers 1)')
+    profiling.add_argument('--profile', type=str, metavar='PREFIX',
+                           help='save the cProfile statistics in '
+                           'PREFIX.pstats and the collapsed stacks (for '
+                           'flame graphs) in PREFIX.collapsed')
+    profiling.add_argument('--trace-memory', type=str, metavar='FILE',
+                           help='trace the memory allocations (which is much '
+                           'slower) and save the lines that allocated the '
+                           'most memory in this text file, from time to time')
+    profiling.add_argument('--trace-memory-interval', type=float,
+                           default=10.0, metavar='SECONDS',
+                           help='seconds between memory snapshots (default: '
+                           '10)')
     a = arg_parser.parse_args()
 
     def on_exc(e: BaseException) -> None:
@@ -39,8 +172,16 @@ def main() -> None:
         details = getattr(e, 'details', '')
         print('=====', msg, '\n', details, '\n\n')
 
-    aug = AugmentedSIM(a.input_files, a.output_file, a.pattern)
+    aug = AugmentedSIM(a.input_files, a.output_file, a.pattern, a.workers,
+                       a.encoding, a.cache_size, a.dbf_backend, a.format,
+                       a.columns, RowFilter(a.date_from, a.date_to, a.year,
+                                            a.municipality, a.cause),
+                       a.group_by, a.aggregate_file, a.merge_aggregate,
+                       a.previous, a.key, a.resume, a.metrics,
+                       a.prometheus, a.profile, a.trace_memory,
+                       a.trace_memory_interval)
     aug.augment(report_exception=on_exc)
+    aug.wait()
 
 
 if __name__ == '__main__':
@@ -2,17 +2,18 @@
 # coding=utf-8
 
 import argparse
+import datetime
 import os.path
 import pathlib
 import sys
 
-from typing import Type, Optional, List, Tuple
+from typing import Type, Optional, List
 
 from PySide2.QtGui import QKeyEvent, QKeySequence
-from PySide2.QtCore import QObject, Signal, QRect, QEvent
+from PySide2.QtCore import QObject, Signal, QRect, QEvent, QTimer, Qt
 from PySide2.QtWidgets import QApplication, QMainWindow, QFileDialog, \
     QMessageBox, QDialog, QDialogButtonBox, QWidget, \
-    QVBoxLayout, QScrollArea, QTextBrowser, QFrame
+    QVBoxLayout, QScrollArea, QTextBrowser, QFrame, QListWidgetItem
 
 
 if vars(sys.modules[__name__])['__package__'] is None and \
@@ -22,10 +23,14 @@ if vars(sys.modules[__name__])['__package__'] is None and \
     sys.path.insert(1, str(here))
 
 
-from augmented_sim.core import AugmentedSIM
+from augmented_sim.compression import compression_suffix
+from augmented_sim.core import AugmentedSIM, PROGRESS_INTERVAL, \
+    NEW_COLUMNS, ORIGINAL_COLUMNS
 from augmented_sim.gui.main import Ui_MainWindow
 from augmented_sim.gui.about import Ui_AboutDialog
-from augmented_sim.i18n import get_translator, get_tr, \
+from augmented_sim.table_reader import Progress
+from augmented_sim.table_writer import TableWriter
+from augmented_sim.i18n import get_qt_translator, get_tr, \
     AVAILABLE_LANGUAGES, CHOSEN_LANGUAGE, change_language_globally
 from augmented_sim import PROGRAM_METADATA
 
@@ -51,6 +56,14 @@ class AugmentedSIMGUI(QObject):
     current_file_signal = Signal(str)
     error_signal = Signal(str, str, str)
     status_msg_signal = Signal(str)
+    finished_signal = Signal(bool)
+
+    # Extension added to an output file name without one, by file filter
+    OUTPUT_SUFFIXES = {
+        'Compressed Comma-Separated Values': '.csv.gz',
+        'Apache Parquet': '.parquet',
+        'Apache Arrow / Feather': '.arrow'
+    }
 
     def __init__(self, augment_cls: Type,
                  input_files: Optional[List[str]] = None,
@@ -61,7 +74,7 @@ class AugmentedSIMGUI(QObject):
 
         self.app = QApplication(sys.argv)
 
-        self.trans = get_translator(None)
+        self.trans = get_qt_translator(None)
         self.tr = get_tr(type(self).__name__, self.trans)
         self.app.installTranslator(self.trans)
 
@@ -78,6 +91,11 @@ class AugmentedSIMGUI(QObject):
         self.current_file_signal.connect(self.ui.label_current_file.setText)
         self.status_msg_signal.connect(self.ui.label_msg.setText)
         self.error_signal.connect(self._error_msg)
+        self.finished_signal.connect(self.on_finished)
+        self.aug = None
+        self.progress_timer = QTimer()
+        self.progress_timer.setInterval(int(1000 * PROGRESS_INTERVAL))
+        self.progress_timer.timeout.connect(self.poll_progress)
         self.df = DeleteFilter()
         self.ui.list_infile1.installEventFilter(self.df)
         for code, name, *_ in AVAILABLE_LANGUAGES:
@@ -89,13 +107,17 @@ class AugmentedSIMGUI(QObject):
             self.ui.cbox_input_pattern.addItem(p, p)
         self.ui.cbox_input_pattern.setCurrentIndex(
             self.ui.cbox_input_pattern.findData(pattern_name))
+        self.ui.spin_workers.setMaximum(os.cpu_count() or 1)
+        self.ui.spin_workers.setValue(1)
+        self.fill_columns()
         self.ui.cbox_language.currentIndexChanged.connect(
             lambda idx:
             self.change_language(self.ui.cbox_language.itemData(idx)))
         self.widgets_to_disable = [
             self.ui.btn_execute, self.ui.btn_file1, self.ui.btn_outfile1,
             self.ui.list_infile1, self.ui.edit_outfile1, self.ui.btn_close,
-            self.ui.cbox_input_pattern
+            self.ui.cbox_input_pattern, self.ui.spin_workers,
+            self.ui.list_columns
         ]
         if input_files:
             self.fill_file1(input_files)
@@ -152,16 +174,18 @@ class AugmentedSIMGUI(QObject):
 
     def change_language(self, language: str) -> None:
         change_language_globally(language)
-        self.trans = get_translator(None)
+        self.trans = get_qt_translator(None)
         self.tr = get_tr(type(self).__name__, self.trans)
         self.app.installTranslator(self.trans)
         self.ui.retranslateUi(self.window)
+        self.ui.list_columns.item(0).setText(self.tr('original-columns'))
 
     def choose_file1(self) -> None:
         options = QFileDialog.Options()
         names, _ = QFileDialog.getOpenFileNames(
             self.window, self.tr('input-files'), '',
-            'DBase File / Comma-Separated Values (*.dbf *.csv)',
+            'DBase File / Comma-Separated Values (*.dbf *.dbc *.csv '
+            '*.zip *.gz *.xz *.bz2 *.zst)',
             options=options
         )
         self.fill_file1(names)
@@ -175,16 +199,41 @@ class AugmentedSIMGUI(QObject):
                 self.ui.list_infile1.addItem(f)
                 existing.add(f)
 
+    def fill_columns(self) -> None:
+        # The first item stands for all the columns of the input files
+        for col in [ORIGINAL_COLUMNS, *NEW_COLUMNS]:
+            item = QListWidgetItem(col, self.ui.list_columns)
+            item.setData(Qt.UserRole, col)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+        self.ui.list_columns.item(0).setText(self.tr('original-columns'))
+
+    def chosen_columns(self) -> Optional[List[str]]:
+        # None if all the columns are chosen
+        w = self.ui.list_columns
+        items = [w.item(i) for i in range(w.count())]
+        columns = [item.data(Qt.UserRole) for item in items
+                   if item.checkState() == Qt.Checked]
+        return None if len(columns) == len(items) else columns
+
     def choose_outfile1(self) -> None:
         options = QFileDialog.Options()
-        f, _ = QFileDialog.getSaveFileName(
+        f, selected = QFileDialog.getSaveFileName(
             self.window, self.tr('output-file'), '',
-            'Comma-Separated Values (*.csv)',
+            'Comma-Separated Values (*.csv);;'
+            'Compressed Comma-Separated Values '
+            '(*.csv.gz *.csv.xz *.csv.bz2 *.csv.zst *.csv.zip);;'
+            'Apache Parquet (*.parquet);;'
+            'Apache Arrow / Feather (*.arrow *.feather)',
             options=options
         )
         if f:
-            if not f.lower().endswith('.csv'):
-                f += '.csv'
+            # The output format is chosen by the extension
+            suffix = self.OUTPUT_SUFFIXES.get(selected.split(' (')[0])
+            known = TableWriter.format_for(f) != 'CSV' or \
+                f.lower().endswith('.csv') or compression_suffix(f)
+            if not known:
+                f += suffix or '.csv'
             self.fill_outfile1(f)
 
     def fill_outfile1(self, file: Optional[str]) -> None:
@@ -207,6 +256,8 @@ class AugmentedSIMGUI(QObject):
         input_files = [w.item(i).text() for i in range(w.count())]
         output_file = self.ui.edit_outfile1.text()
         pattern_name = self.ui.cbox_input_pattern.currentData()
+        workers = self.ui.spin_workers.value()
+        columns = self.chosen_columns()
         self.current_progress_signal.emit(0)
         self.overall_progress_signal.emit(0)
         self.current_file_signal.emit('')
@@ -225,19 +276,43 @@ class AugmentedSIMGUI(QObject):
             self._error_msg(self.tr('error'),
                             self.tr('blank-pattern'))
             return
+        if columns == []:
+            self.ui.label_msg.setText('')
+            self._error_msg(self.tr('error'),
+                            self.tr('no-columns'))
+            return
         self.show_progress()
-        aug = self.augment_cls(input_files, output_file, pattern_name)
+        aug = self.augment_cls(input_files, output_file, pattern_name,
+                               workers, columns=columns)
         self.disable_widgets()
         self.ui.label_msg.setText(self.tr('executing'))
         self.ui.label_msg.repaint()
+        self.aug = aug
         aug.augment(
-            report_progress=self.update_progress,
-            report_exception=self.on_error
+            report_exception=self.on_error,
+            report_conclusion=lambda *a: self.finished_signal.emit(True)
         )
+        self.progress_timer.start()
+
+    def poll_progress(self) -> None:
+        if self.aug:
+            p = self.aug.progress()
+            if p:
+                self.update_progress(p)
+
+    def on_finished(self, success: bool) -> None:
+        # Runs in the GUI thread after the augmentation thread finishes
+        self.progress_timer.stop()
+        if success:
+            self.poll_progress()
+            self.ui.label_msg.setText(self.tr('file-saved'))
+            self.enable_widgets()
+            self.current_file_signal.emit('')
 
     def on_error(self, e: BaseException) -> None:
         msg = getattr(e, 'message', str(e))
         details = getattr(e, 'details', '')
+        self.finished_signal.emit(False)
         self.status_msg_signal.emit('')
         self.current_file_signal.emit('')
         self.current_progress_signal.emit(0)
@@ -253,15 +328,16 @@ class AugmentedSIMGUI(QObject):
     def disable_widgets(self) -> None:
         self.enable_widgets(False)
 
-    def update_progress(self, p: Tuple[int, int, int, int, Optional[str]]) \
-            -> None:
-        self.current_progress_signal.emit(int((100 * p[0]) / p[1]))
-        self.overall_progress_signal.emit(int((100 * p[2]) / p[3]))
-        self.current_file_signal.emit(p[-1] or '')
-        if p[2] == p[3]:
-            self.ui.label_msg.setText(self.tr('file-saved'))
-            self.enable_widgets()
-            self.current_file_signal.emit('')
+    def update_progress(self, p: Progress) -> None:
+        self.current_progress_signal.emit(
+            int((100 * p.current) / p.current_total))
+        self.overall_progress_signal.emit(
+            int((100 * p.overall) / p.overall_total))
+        self.current_file_signal.emit(p.file_name or '')
+        if p.eta is not None:
+            eta = datetime.timedelta(seconds=round(p.eta))
+            self.status_msg_signal.emit(self.tr('executing-rate').format(
+                round(p.rows_per_second), eta))
 
     def show_progress(self, show: bool = True) -> None:
         widgets = [self.ui.pbar_overall,
@@ -280,7 +356,7 @@ def main() -> None:
     arg_parser.add_argument('output_file', nargs='?',
                             help='output file name (CSV)')
     arg_parser.add_argument('input_files', nargs='*',
-                            help='input file names (DBF or CSV)')
+                            help='input file names (DBF, DBC or CSV)')
     arg_parser.add_argument('--pattern', '-p', type=str, default='')
     a = arg_parser.parse_args()
     AugmentedSIMGUI(
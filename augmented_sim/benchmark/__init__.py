@@ -0,0 +1,6 @@
+'''Benchmarks of the augmenters, the parsers and whole runs.
+
+Run ``python -m augmented_sim.benchmark --help``. The input tables are
+synthetic (see generator.SIMGenerator), so results can be reproduced and
+compared with a baseline saved by an earlier run.
+'''
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import argparse
+import os
+import sys
+import tempfile
+
+from typing import Any, Dict, List
+
+from augmented_sim.benchmark.end_to_end import run_end_to_end
+from augmented_sim.benchmark.generator import SIMGenerator
+from augmented_sim.benchmark.micro import run_micro
+from augmented_sim.benchmark.startup import run_startup
+from augmented_sim.benchmark import results as res
+
+
+# A worksheet is read whole, so large XLSX tables are not generated
+MAX_XLSX_ROWS = 100000
+
+
+def input_file(data_dir: str, pattern_name: str, file_format: str,
+               rows: int, seed: int) -> str:
+    '''Generates an input file, unless it exists in data_dir.'''
+    file_name = os.path.join(
+        data_dir, f'sim_{pattern_name}_{rows}_{seed}.{file_format}')
+    if not os.path.exists(file_name):
+        print(f'Generating {file_name}...', file=sys.stderr)
+        tmp_name = file_name + '.tmp.' + file_format
+        SIMGenerator(pattern_name, seed).write(tmp_name, rows)
+        os.replace(tmp_name, file_name)
+    return file_name
+
+
+def run_all(a: argparse.Namespace, data_dir: str) -> Dict[str, Any]:
+    results = {}
+    if not a.skip_startup:
+        print('Startup...', file=sys.stderr)
+        results['startup/cli'] = run_startup(repeat=max(5, a.repeat))
+    if not a.skip_micro:
+        for pattern_name in a.patterns:
+            print(f'Micro-benchmarks ({pattern_name})...', file=sys.stderr)
+            for name, r in run_micro(a.micro_rows, a.seed, a.repeat,
+                                     pattern_name, a.cache_size).items():
+                results[name.replace('micro/', f'micro/{pattern_name}/')] = r
+    if not a.skip_end_to_end:
+        for pattern_name in a.patterns:
+            for file_format in a.formats:
+                rows = a.rows
+                if file_format == 'xlsx':
+                    rows = min(rows, MAX_XLSX_ROWS)
+                file_name = input_file(data_dir, pattern_name, file_format,
+                                       rows, a.seed)
+                for workers in a.workers:
+                    name = f'e2e/{pattern_name}/{file_format}'
+                    if workers > 1:
+                        name += f'/w{workers}'
+                    print(f'{name}...', file=sys.stderr)
+                    output_file = os.path.join(
+                        data_dir, f'out_{os.getpid()}.csv')
+                    runs = [
+                        run_end_to_end(file_name, output_file, pattern_name,
+                                       workers, a.cache_size)
+                        for _ in range(max(1, a.repeat))
+                    ]
+                    results[name] = best_run(runs)
+    return results
+
+
+def best_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    '''The fastest run, with the highest peak memory of all of them.'''
+    for r in runs:
+        if 'error' in r:
+            return r
+    best = dict(min(runs, key=lambda r: r['seconds']))
+    for measure in ['peak_rss_mb', 'workers_peak_rss_mb']:
+        values = [r[measure] for r in runs if r.get(measure) is not None]
+        best[measure] = max(values) if values else None
+    return best
+
+
+def comma_list(text: str) -> List[str]:
+    return [x.strip() for x in text.split(',') if x.strip()]
+
+
+def int_list(text: str) -> List[int]:
+    return [int(x) for x in comma_list(text)]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description='Benchmarks the augmenters, the parsers and whole runs '
+        'on synthetic SIM tables.')
+    arg_parser.add_argument('--rows', '-n', type=int, default=100000,
+                            help='rows of each input file of the '
+                            'end-to-end benchmarks (at most '
+                            f'{MAX_XLSX_ROWS} for XLSX)')
+    arg_parser.add_argument('--micro-rows', type=int, default=100000,
+                            help='rows of the micro-benchmarks')
+    arg_parser.add_argument('--seed', '-s', type=int, default=0)
+    arg_parser.add_argument('--patterns', type=comma_list,
+                            default=list(SIMGenerator.COLUMNS),
+                            help='comma-separated input patterns')
+    arg_parser.add_argument('--formats', type=comma_list,
+                            default=['csv', 'dbf', 'xlsx'],
+                            help='comma-separated input formats')
+    arg_parser.add_argument('--workers', type=int_list, default=[1],
+                            help='comma-separated numbers of workers')
+    arg_parser.add_argument('--cache-size', type=int, default=0)
+    arg_parser.add_argument('--repeat', '-r', type=int, default=3,
+                            help='runs of each benchmark (the fastest one '
+                            'is kept)')
+    arg_parser.add_argument('--data-dir', type=str,
+                            help='folder where the generated input files '
+                            'are kept for later runs (default: a '
+                            'temporary folder)')
+    arg_parser.add_argument('--skip-startup', action='store_true')
+    arg_parser.add_argument('--skip-micro', action='store_true')
+    arg_parser.add_argument('--skip-end-to-end', action='store_true')
+    arg_parser.add_argument('--output', '-o', type=str,
+                            help='JSON file where the results are saved')
+    arg_parser.add_argument('--baseline', '-b', type=str,
+                            help='JSON file saved by an earlier run; exits '
+                            'with status 1 if there are regressions')
+    arg_parser.add_argument('--tolerance', type=float, default=0.1,
+                            help='relative change that is not a '
+                            'regression (default: 0.1)')
+    a = arg_parser.parse_args()
+
+    unknown = [p for p in a.patterns if p not in SIMGenerator.COLUMNS]
+    unknown += [f for f in a.formats if f not in ('csv', 'dbf', 'xlsx')]
+    if unknown:
+        arg_parser.error('unknown pattern or format: ' + ', '.join(unknown))
+    baseline = res.load(a.baseline)['results'] if a.baseline else None
+
+    if a.data_dir:
+        os.makedirs(a.data_dir, exist_ok=True)
+        results = run_all(a, a.data_dir)
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            results = run_all(a, data_dir)
+
+    res.print_results(results)
+    if a.output:
+        settings = {
+            k: getattr(a, k) for k in [
+                'rows', 'micro_rows', 'seed', 'patterns', 'formats',
+                'workers', 'cache_size', 'repeat'
+            ]
+        }
+        res.save(a.output, settings, results)
+    if baseline is not None:
+        print()
+        regressions = res.print_comparison(
+            res.compare(results, baseline, a.tolerance))
+        if regressions:
+            sys.exit(f'{regressions} regression(s) above '
+                     f'{a.tolerance:.0%}')
+
+
+if __name__ == '__main__':
+    main()
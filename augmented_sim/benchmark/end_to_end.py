@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+if vars(sys.modules[__name__])['__package__'] is None and \
+        __name__ == '__main__':
+    # allow running from any folder
+    here = Path(__file__).parent.parent.parent.resolve()
+    sys.path.insert(1, str(here))
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    '''Peak memory (resident set size) of this process and its children.
+
+    The children are the worker processes that have finished. It is not
+    available on Windows.
+    '''
+    try:
+        import resource
+    except ImportError:
+        return {'peak_rss_mb': None, 'workers_peak_rss_mb': None}
+    # Kibibytes, but bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    # On Linux, ru_maxrss is kept across exec, so it can be the peak of the
+    # process that started this one
+    try:
+        with open('/proc/self/status', encoding='ascii') as fd:
+            for line in fd:
+                if line.startswith('VmHWM:'):
+                    own = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return {
+        'peak_rss_mb': round(own / 2 ** 20, 1),
+        'workers_peak_rss_mb': round(children / 2 ** 20, 1)
+    }
+
+
+def run_end_to_end(input_file: str, output_file: str, pattern_name: str,
+                   workers: int = 1, cache_size: int = 0) -> Dict[str, Any]:
+    '''Augments a file in a new process and returns its measures.
+
+    Each run has a process of its own, so that its peak memory is not
+    affected by other runs.
+    '''
+    result_file = output_file + '.json'
+    package_root = str(Path(__file__).parent.parent.parent.resolve())
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in [package_root, env.get('PYTHONPATH')] if p)
+    command = [
+        sys.executable, '-m', 'augmented_sim.benchmark.end_to_end',
+        input_file, output_file, '--pattern', pattern_name,
+        '--workers', str(workers), '--cache-size', str(cache_size),
+        '--result', result_file
+    ]
+    process = subprocess.run(command, env=env, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    try:
+        with open(result_file, encoding='utf-8') as fd:
+            result = json.load(fd)
+        os.remove(result_file)
+    except (OSError, ValueError):
+        result = {'error': process.stderr.strip()[-2000:]}
+    if os.path.exists(output_file):
+        os.remove(output_file)
+    return result
+
+
+def main() -> None:
+    # Runs in the process started by run_end_to_end
+    arg_parser = argparse.ArgumentParser(
+        description='Augments a file and saves how long it took and how '
+        'much memory it used.')
+    arg_parser.add_argument('input_file', type=str)
+    arg_parser.add_argument('output_file', type=str)
+    arg_parser.add_argument('--pattern', '-p', type=str, required=True)
+    arg_parser.add_argument('--workers', '-w', type=int, default=1)
+    arg_parser.add_argument('--cache-size', type=int, default=0)
+    arg_parser.add_argument('--result', type=str, required=True,
+                            help='JSON file where the measures are saved')
+    a = arg_parser.parse_args()
+
+    from augmented_sim.core import AugmentedSIM
+
+    measures = {}
+
+    def on_exc(e: BaseException) -> None:
+        measures['error'] = getattr(e, 'message', str(e))
+
+    def on_conclusion(elapsed: float) -> None:
+        measures['seconds'] = round(elapsed, 6)
+
+    aug = AugmentedSIM([a.input_file], a.output_file, a.pattern, a.workers,
+                       cache_size=a.cache_size)
+    aug.augment(report_exception=on_exc, report_conclusion=on_conclusion)
+    aug.wait()
+    if 'seconds' in measures:
+        rows = aug.progress().rows
+        measures['rows'] = rows
+        measures['rows_per_second'] = round(
+            rows / measures['seconds'], 1) if measures['seconds'] else None
+        measures['stages'] = aug.thread.metrics.to_json({})['stages']
+    measures.update(peak_rss_mb())
+    with open(a.result, 'w', encoding='utf-8') as fd:
+        json.dump(measures, fd)
+
+
+if __name__ == '__main__':
+    main()
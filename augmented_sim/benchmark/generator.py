@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import argparse
+import calendar
+import csv
+import datetime
+import struct
+import sys
+
+import numpy as np
+
+from typing import Iterator, List, Tuple
+
+if vars(sys.modules[__name__])['__package__'] is None and \
+        __name__ == '__main__':
+    # allow running from any folder
+    import pathlib
+    here = pathlib.Path(__file__).parent.parent.parent.resolve()
+    sys.path.insert(1, str(here))
+
+
+class SIMGenerator:
+    '''Generates random SIM tables, always the same for the same seed.
+
+    The values follow distributions close to those of real death records
+    of São Paulo: causes of death (CAUSABAS) with their usual frequencies
+    and COVID-19 in 2020 and 2021, ages (IDADE) concentrated on the elderly
+    with a few infant deaths, dates of death (DTOBITO) with more deaths in
+    the winter and in the pandemic, and districts of residence (CODBAIRES,
+    or CD_GEOCODI) of different sizes. A few values are blank or invalid,
+    as they are in real files. The columns are those of each input pattern.
+    '''
+
+    COLUMNS = {
+        '10.2020': ['NUMERODO', 'DTOBITO', 'IDADE', 'SEXO', 'RACACOR',
+                    'CODBAIRES', 'CODMUNRES', 'LOCOCOR', 'CAUSABAS'],
+        '12.2020': ['NUMERODO', 'DTOBITO', 'ANO_OBITO', 'MES_OBITO',
+                    'IDADE', 'SEXO', 'RACACOR', 'CD_GEOCODI', 'CODMUNRES',
+                    'LOCOCOR', 'CAUSABAS'],
+        '02.2021': ['NUMERODO', 'DTOBITO', 'IDADE', 'SEXO', 'RACACOR',
+                    'CD_GEOCODI', 'CODMUNRES', 'LOCOCOR', 'CAUSABAS']
+    }
+
+    # Width of each column in DBF files (enough for the invalid values, so
+    # that all formats have the same values)
+    WIDTHS = {
+        'NUMERODO': 9, 'DTOBITO': 8, 'ANO_OBITO': 4, 'MES_OBITO': 2,
+        'IDADE': 3, 'SEXO': 1, 'RACACOR': 1, 'CODBAIRES': 8,
+        'CD_GEOCODI': 15, 'CODMUNRES': 6, 'LOCOCOR': 1, 'CAUSABAS': 5
+    }
+
+    FORMATS = ['CSV', 'DBF', 'XLSX']
+
+    # Underlying causes and their relative frequencies
+    CAUSES = [
+        ('I219', 7), ('J189', 6), ('I64', 4), ('E149', 4), ('R99', 4),
+        ('A419', 3), ('I10', 3), ('J449', 3), ('I251', 3), ('C349', 2.5),
+        ('I509', 2), ('G309', 1.5), ('F03', 1), ('X954', 2), ('C509', 1.5),
+        ('C61', 1.5), ('K746', 1.5), ('N189', 1.5), ('V892', 1.5),
+        ('I110', 1.5), ('C169', 1), ('C189', 1), ('C259', 1), ('W19', 1),
+        ('J969', 1), ('R98', 1), ('X700', 0.8), ('B24', 0.7), ('E46', 0.5),
+        ('P369', 0.5), ('P073', 0.3), ('Q249', 0.2), ('O998', 0.1)
+    ]
+    COVID_CAUSES = [('U071', 9), ('B342', 1)]
+    BAD_CAUSES = ['', '', '', 'I21.9', 'i219', 'XYZ', '1234', 'O244']
+    BAD_DATES = ['', '', '31022020', '00012020', '32012020', 'abc']
+    BAD_AGES = ['', '', '999', '9', 'abc']
+
+    MUNICIPALITIES = [('355030', 80), ('351880', 5), ('354870', 5),
+                      ('353440', 4), ('350950', 3), ('330455', 3)]
+    SEXES = [('M', 55), ('F', 45), ('I', 0.1)]
+    RACES = [('1', 45), ('2', 8), ('3', 1), ('4', 40), ('5', 0.5), ('', 2)]
+    PLACES = [('1', 65), ('2', 8), ('3', 20), ('4', 2), ('5', 4), ('6', 1)]
+
+    # More deaths in the winter (by month) and in the COVID-19 waves
+    SEASONS = [0.95, 0.9, 1.0, 1.0, 1.1, 1.15, 1.2, 1.15, 1.05, 1.0, 0.95,
+               0.95]
+    WAVES = {(2020, 5): 1.5, (2020, 6): 1.6, (2020, 7): 1.5, (2020, 8): 1.3,
+             (2021, 3): 1.9, (2021, 4): 1.8, (2021, 5): 1.5, (2021, 6): 1.5}
+
+    DISTRICTS = 96
+
+    # Rows generated at once (the rows depend on it, besides the seed)
+    BLOCK_SIZE = 100000
+
+    def __init__(self, pattern_name: str = '10.2020', seed: int = 0,
+                 first_year: int = 2015, last_year: int = 2022):
+        if pattern_name not in self.COLUMNS:
+            raise ValueError(f'unknown pattern: {pattern_name}')
+        self.pattern_name = pattern_name
+        self.columns = self.COLUMNS[pattern_name]
+        self.seed = seed
+        self.first_year = first_year
+        self.last_year = last_year
+
+    @classmethod
+    def _choose(cls, rng: np.random.Generator,
+                choices: List[Tuple[str, float]], n: int) -> np.ndarray:
+        values, weights = zip(*choices)
+        p = np.array(weights) / sum(weights)
+        return np.array(values)[rng.choice(len(values), n, p=p)]
+
+    @classmethod
+    def _replace(cls, rng: np.random.Generator, values: np.ndarray,
+                 rate: float, replacements: List[str]) -> np.ndarray:
+        # Some values, at this rate, become one of the replacements
+        mask = rng.random(len(values)) < rate
+        values = values.astype(object)
+        values[mask] = np.array(replacements, dtype=object)[
+            rng.integers(len(replacements), size=mask.sum())]
+        return values
+
+    def _dates(self, rng: np.random.Generator,
+               n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # DDMMYYYY, year and month (0 for invalid dates)
+        months = [(y, m) for y in range(self.first_year, self.last_year + 1)
+                  for m in range(1, 13)]
+        weights = np.array([self.SEASONS[m - 1] * self.WAVES.get((y, m), 1)
+                            for y, m in months])
+        chosen = rng.choice(len(months), n, p=weights / weights.sum())
+        year = np.array([y for y, m in months])[chosen]
+        month = np.array([m for y, m in months])[chosen]
+        lengths = np.array([calendar.monthrange(y, m)[1]
+                            for y, m in months])[chosen]
+        day = (rng.random(n) * lengths).astype(int) + 1
+        number = day * 1000000 + month * 10000 + year
+        text = np.char.zfill(number.astype('U8'), 8)
+        # A few have lost their leading zero in a spreadsheet
+        lost_zero = rng.random(n) < 0.002
+        text[lost_zero] = number[lost_zero].astype('U8')
+        bad = rng.random(n) < 0.005
+        text = text.astype(object)
+        text[bad] = np.array(self.BAD_DATES, dtype=object)[
+            rng.integers(len(self.BAD_DATES), size=bad.sum())]
+        year[bad] = 0
+        month[bad] = 0
+        return text, year, month
+
+    def _causes(self, rng: np.random.Generator, year: np.ndarray,
+                month: np.ndarray) -> np.ndarray:
+        n = len(year)
+        causes = self._choose(rng, self.CAUSES, n).astype('U4')
+        # The fourth character varies
+        vary = (rng.random(n) < 0.3) & (np.char.str_len(causes) == 4)
+        digits = rng.integers(10, size=vary.sum()).astype('U1')
+        causes[vary] = np.char.add(causes[vary].astype('U3'), digits)
+        when = year * 100 + month
+        pandemic = (when >= 202003) & (when <= 202112) & \
+            (rng.random(n) < 0.2)
+        causes[pandemic] = self._choose(rng, self.COVID_CAUSES,
+                                        pandemic.sum())
+        causes = self._replace(rng, causes, 0.003, self.BAD_CAUSES)
+        # Causes of deaths without a valid date are not coded (the cause
+        # of death augmenter needs the date for them)
+        causes[year == 0] = ''
+        return causes
+
+    def _ages(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        # In years, mostly elderly; -1 for infants
+        r = rng.random(n)
+        years = np.clip(np.rint(rng.normal(72, 16, n)), 20, 115).astype(int)
+        young = r < 0.05
+        years[young] = rng.integers(1, 20, size=young.sum())
+        years[r < 0.025] = -1
+        return years
+
+    def _coded_ages(self, rng: np.random.Generator,
+                    years: np.ndarray) -> np.ndarray:
+        # As in SIM: unit (minutes, hours, days, months, years, 100+ years)
+        # followed by two digits
+        unit = np.where(years >= 100, 5, 4)
+        value = np.where(years >= 100, years - 100, years)
+        infant = years < 0
+        # Mostly days and months
+        units = rng.choice(4, infant.sum(), p=np.array([1, 2, 8, 6]) / 17)
+        limits = np.array([60, 24, 30, 12])[units]
+        unit[infant] = units
+        value[infant] = (rng.random(infant.sum()) * limits).astype(int)
+        ages = np.char.zfill((unit * 100 + value).astype('U3'), 3)
+        return self._replace(rng, ages, 0.005, self.BAD_AGES)
+
+    def block(self, rng: np.random.Generator, first: int,
+              n: int) -> List[List[str]]:
+        '''Values of n rows, column by column.'''
+        date, year, month = self._dates(rng, n)
+        years = self._ages(rng, n)
+        values = {
+            'NUMERODO': np.arange(first, first + n).astype('U9'),
+            'DTOBITO': date,
+            'CAUSABAS': self._causes(rng, year, month),
+            'SEXO': self._choose(rng, self.SEXES, n),
+            'RACACOR': self._choose(rng, self.RACES, n),
+            'CODMUNRES': self._choose(rng, self.MUNICIPALITIES, n),
+            'LOCOCOR': self._choose(rng, self.PLACES, n)
+        }
+        if self.pattern_name == '12.2020':
+            valid = year > 0
+            values['ANO_OBITO'] = np.where(valid, year.astype('U4'), '')
+            values['MES_OBITO'] = np.where(
+                valid, np.char.zfill(month.astype('U2'), 2), '')
+            ages = np.maximum(years, 0).astype('U3')
+            values['IDADE'] = self._replace(rng, ages, 0.005, [''])
+        else:
+            values['IDADE'] = self._coded_ages(rng, years)
+        # Districts have different sizes, in an order given by the seed
+        sizes = 1 / np.sqrt(np.arange(1, self.DISTRICTS + 1))
+        sizes = sizes[np.random.default_rng(self.seed).permutation(
+            self.DISTRICTS)]
+        district = rng.choice(self.DISTRICTS, n, p=sizes / sizes.sum()) + 1
+        if 'CODBAIRES' in self.columns:
+            values['CODBAIRES'] = self._replace(
+                rng, np.char.zfill(district.astype('U8'), 8), 0.01, [''])
+        else:
+            # State, municipality, district, subdistrict and sector
+            sector = rng.integers(1, 2000, size=n)
+            code = 355030800000000 + district * 1000000 + sector
+            values['CD_GEOCODI'] = code.astype('U15')
+        return [values[c].tolist() for c in self.columns]
+
+    def rows(self, n: int) -> Iterator[Tuple[str, ...]]:
+        rng = np.random.default_rng(self.seed)
+        first = int(rng.integers(10000000, 20000000))
+        for start in range(0, n, self.BLOCK_SIZE):
+            size = min(self.BLOCK_SIZE, n - start)
+            yield from zip(*self.block(rng, first + start, size))
+
+    def write(self, file_name: str, n: int) -> None:
+        '''Writes n rows as CSV, DBF or XLSX, according to the extension.'''
+        format = file_name.rsplit('.', 1)[-1].upper()
+        if format not in self.FORMATS:
+            raise ValueError(f'unsupported file: {file_name}')
+        getattr(self, 'write_' + format.lower())(file_name, n)
+
+    def write_csv(self, file_name: str, n: int) -> None:
+        with open(file_name, 'w', newline='', encoding='utf-8') as fd:
+            writer = csv.writer(fd)
+            writer.writerow(self.columns)
+            writer.writerows(self.rows(n))
+
+    def write_dbf(self, file_name: str, n: int) -> None:
+        # dBASE III with character fields only
+        widths = [self.WIDTHS[c] for c in self.columns]
+        header_length = 32 + 32 * len(widths) + 1
+        record_length = 1 + sum(widths)
+        today = datetime.date.today()
+        with open(file_name, 'wb') as fd:
+            fd.write(struct.pack(
+                '<BBBBLHH20x', 3, today.year - 1900, today.month, today.day,
+                n, header_length, record_length))
+            for column, width in zip(self.columns, widths):
+                fd.write(struct.pack('<11sc4xBB14x', column.encode('ascii'),
+                                     b'C', width, 0))
+            fd.write(b'\r')
+            for row in self.rows(n):
+                fd.write(b' ' + b''.join(
+                    v.encode('ascii').ljust(w)[:w]
+                    for v, w in zip(row, widths)))
+            fd.write(b'\x1a')
+
+    def write_xlsx(self, file_name: str, n: int) -> None:
+        # Not in write-only mode, which does not save the size of the sheet
+        # (read by TableReader); so all the rows are kept in memory
+        import openpyxl
+        if n >= 1 << 20:
+            raise ValueError(f'too many rows for an XLSX file: {n}')
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(self.columns)
+        for row in self.rows(n):
+            sheet.append(row)
+        workbook.save(file_name)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description='Generates a synthetic SIM table.')
+    arg_parser.add_argument('output_file', type=str,
+                            help='output file name (CSV, DBF or XLSX)')
+    arg_parser.add_argument('--rows', '-n', type=int, default=100000)
+    arg_parser.add_argument('--pattern', '-p', type=str, default='10.2020',
+                            choices=list(SIMGenerator.COLUMNS))
+    arg_parser.add_argument('--seed', '-s', type=int, default=0)
+    a = arg_parser.parse_args()
+    SIMGenerator(a.pattern, a.seed).write(a.output_file, a.rows)
+
+
+if __name__ == '__main__':
+    main()
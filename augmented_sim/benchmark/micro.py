@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from augmented_sim.benchmark.generator import SIMGenerator
+from augmented_sim.core import CHUNK_SIZE, get_augmenters
+from augmented_sim.sim.input_pattern import ALL_PATTERNS
+from augmented_sim.sim.row_parser import SIMRowParser
+
+
+# Result of a benchmark: rows, seconds and rows per second
+Result = Dict[str, Any]
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    '''Shortest of repeat runs, in seconds.'''
+    times = []
+    for i in range(max(1, repeat)):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def result(rows: int, seconds: float) -> Result:
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'rows_per_second': round(rows / seconds, 1) if seconds else None
+    }
+
+
+def column_chunks(pattern_name: str, n: int,
+                  seed: int) -> List[Dict[str, tuple]]:
+    '''Generated rows, adapted and split in chunks of columns.
+
+    These are the unparsed values that RowPlan gives to the augmenters.
+    '''
+    generator = SIMGenerator(pattern_name, seed)
+    index, adapt = ALL_PATTERNS[pattern_name].compile_adapter(
+        generator.columns)
+    rows = [list(row) for row in generator.rows(n)]
+    if adapt:
+        for row in rows:
+            adapt(row)
+    chunks = []
+    for start in range(0, n, CHUNK_SIZE):
+        table = list(zip(*rows[start:start + CHUNK_SIZE]))
+        chunks.append({col: table[i] for col, i in index.items()})
+    return chunks
+
+
+def augmenter_benchmarks(chunks: List[Dict[str, tuple]], repeat: int,
+                         cache_size: int = 0) -> Dict[str, Result]:
+    # Each augmenter receives the columns that RowPlan would give it
+    rows = sum(len(next(iter(c.values()))) for c in chunks)
+    augmenters = get_augmenters(cache_size)
+    inputs = list(SIMRowParser.CONVERTERS)
+    for augmenter in augmenters:
+        inputs += [c for c in augmenter.REQUIRES if c not in inputs]
+    columns = [{c: chunk[c] for c in inputs if c in chunk}
+               for chunk in chunks]
+    results = {}
+    for augmenter in augmenters:
+        name = getattr(augmenter, 'name', None) or augmenter.__name__
+
+        def run() -> None:
+            for chunk in columns:
+                augmenter.get_new_values_batch(chunk)
+        results[f'micro/augmenter/{name}'] = result(
+            rows, best_time(run, repeat))
+    return results
+
+
+def converter_benchmarks(chunks: List[Dict[str, tuple]],
+                         repeat: int) -> Dict[str, Result]:
+    # Each converter of SIMRowParser on its column, value by value
+    results = {}
+    for column, method in SIMRowParser.CONVERTERS.items():
+        values = [v for chunk in chunks for v in chunk.get(column, ())]
+        if not values:
+            continue
+        converter = getattr(SIMRowParser, method)
+        results[f'micro/converter/{method}'] = result(
+            len(values),
+            best_time(lambda: list(map(converter, values)), repeat))
+    dates = [chunk['DTOBITO'] for chunk in chunks if 'DTOBITO' in chunk]
+    if dates:
+        def parse_dates() -> None:
+            for chunk in dates:
+                SIMRowParser.parse_date_batch(chunk)
+        results['micro/converter/parse_date_batch'] = result(
+            sum(map(len, dates)), best_time(parse_dates, repeat))
+    return results
+
+
+def run_micro(n: int, seed: int, repeat: int, pattern_name: str = '10.2020',
+              cache_size: int = 0) -> Dict[str, Result]:
+    chunks = column_chunks(pattern_name, n, seed)
+    return {
+        **augmenter_benchmarks(chunks, repeat, cache_size),
+        **converter_benchmarks(chunks, repeat)
+    }
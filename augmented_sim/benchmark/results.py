@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import json
+import os
+import platform
+
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import augmented_sim
+
+
+VERSION = 1
+
+
+def environment() -> Dict[str, Any]:
+    '''Where the benchmarks ran (results from different machines should
+    not be compared).'''
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'augmented_sim': augmented_sim.__version__,
+        'date': datetime.now().isoformat(timespec='seconds')
+    }
+
+
+def save(file_name: str, settings: Dict[str, Any],
+         results: Dict[str, Dict[str, Any]]) -> None:
+    data = {
+        'version': VERSION,
+        'environment': environment(),
+        'settings': settings,
+        'results': results
+    }
+    with open(file_name, 'w', encoding='utf-8') as fd:
+        json.dump(data, fd, indent=2, sort_keys=True)
+        fd.write('\n')
+
+
+def load(file_name: str) -> Dict[str, Any]:
+    with open(file_name, encoding='utf-8') as fd:
+        data = json.load(fd)
+    if data.get('version') != VERSION:
+        raise ValueError(f'{file_name}: unsupported benchmark file')
+    return data
+
+
+def compare(results: Dict[str, Dict[str, Any]],
+            baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[Tuple[str, str, Any, Any, bool]]:
+    '''Compares the results with a baseline.
+
+    Returns (name, measure, baseline value, current value, regression)
+    for each measure present in both. Fewer rows per second, more memory
+    or a slower startup than the baseline by more than tolerance (e.g. 0.1
+    for 10%) is a regression.
+    '''
+    comparison = []
+    for name in sorted(set(results) & set(baseline)):
+        current, old = results[name], baseline[name]
+        for measure, higher_is_better in [
+                ('rows_per_second', True), ('peak_rss_mb', False),
+                ('workers_peak_rss_mb', False), ('import_ms', False)]:
+            a, b = old.get(measure), current.get(measure)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            worse = change < -tolerance if higher_is_better \
+                else change > tolerance
+            comparison.append((name, measure, a, b, worse))
+    return comparison
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    width = max(map(len, results), default=0)
+    for name, r in results.items():
+        if 'error' in r:
+            print(f'{name:<{width}}  ERROR: {r["error"]}')
+            continue
+        if 'import_ms' in r:
+            print(f'{name:<{width}}  {r["import_ms"]:>14,.1f} ms to import')
+            continue
+        line = f'{name:<{width}}  {r.get("rows_per_second") or 0:>14,.0f} ' \
+            'rows/s'
+        if r.get('peak_rss_mb') is not None:
+            line += f'  {r["peak_rss_mb"]:>9,.1f} MiB'
+        if r.get('workers_peak_rss_mb'):
+            line += f' (workers: {r["workers_peak_rss_mb"]:,.1f} MiB)'
+        print(line)
+
+
+def print_comparison(
+        comparison: List[Tuple[str, str, Any, Any, bool]]) -> int:
+    '''Prints the comparison and returns how many regressions there are.'''
+    width = max((len(c[0]) for c in comparison), default=0)
+    regressions = 0
+    for name, measure, a, b, worse in comparison:
+        regressions += worse
+        mark = 'REGRESSION' if worse else ''
+        print(f'{name:<{width}}  {measure:<19} {a:>14,.1f} -> '
+              f'{b:>14,.1f} ({(b - a) / a:+7.1%}) {mark}')
+    return regressions
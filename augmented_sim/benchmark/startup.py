@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import argparse
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+if vars(sys.modules[__name__])['__package__'] is None and \
+        __name__ == '__main__':
+    # allow running from any folder
+    here = Path(__file__).parent.parent.parent.resolve()
+    sys.path.insert(1, str(here))
+
+
+# What starting the CLI imports
+MODULE = 'augmented_sim.augmented_sim_cli'
+
+# Milliseconds that importing MODULE may take
+BUDGET_MS = 400.0
+
+# Packages that MODULE must not import (they are only imported when a file,
+# an option or the GUI needs them)
+FORBIDDEN = [
+    'PySide2', 'openpyxl', 'dbfread', 'tqdm', 'dateutil', 'pyarrow',
+    'zstandard', 'sqlite3', 'cProfile', 'tracemalloc'
+]
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    '''Milliseconds taken to import a module in a new interpreter.
+
+    Returns the total and the cumulative time of each imported module, as
+    reported by "python -X importtime".
+    '''
+    package_root = str(Path(__file__).parent.parent.parent.resolve())
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in [package_root, env.get('PYTHONPATH')] if p)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip()[-2000:])
+    total = 0.0
+    modules = {}
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        cumulative = int(fields[1]) / 1000
+        if not name.startswith('  '):  # imported by the -c command
+            total += cumulative
+        name = name.strip()
+        modules[name] = max(modules.get(name, 0.0), cumulative)
+    return total, modules
+
+
+def run_startup(module: str = MODULE, repeat: int = 5) -> Dict[str, Any]:
+    '''The fastest of repeat imports, with the slowest top-level packages
+    and the forbidden ones that were imported.'''
+    runs = [import_times(module) for _ in range(max(1, repeat))]
+    total, modules = min(runs, key=lambda run: run[0])
+    packages = {}
+    for name, ms in modules.items():
+        package = name.split('.')[0]
+        if package != module.split('.')[0]:
+            packages[package] = max(packages.get(package, 0.0), ms)
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:10]
+    return {
+        'import_ms': round(total, 1),
+        'slowest': [[name, round(ms, 1)] for name, ms in slowest],
+        'forbidden': [name for name in FORBIDDEN if name in packages]
+    }
+
+
+def check(result: Dict[str, Any], budget_ms: float) -> List[str]:
+    errors = []
+    if result['import_ms'] > budget_ms:
+        errors.append(f'import took {result["import_ms"]:.1f} ms '
+                      f'(budget: {budget_ms:.1f} ms)')
+    if result['forbidden']:
+        errors.append('imported ' + ', '.join(result['forbidden']))
+    return errors
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description='Measures how long it takes to import the CLI, and '
+        'exits with status 1 if it is over budget or if it imports '
+        'packages it should only import when needed.')
+    arg_parser.add_argument('--module', '-m', type=str, default=MODULE)
+    arg_parser.add_argument('--repeat', '-r', type=int, default=5,
+                            help='imports (the fastest one is kept)')
+    arg_parser.add_argument('--budget', '-b', type=float, default=BUDGET_MS,
+                            help='milliseconds the import may take '
+                            f'(default: {BUDGET_MS:.0f})')
+    a = arg_parser.parse_args()
+    result = run_startup(a.module, a.repeat)
+    print(f'{a.module}: {result["import_ms"]:.1f} ms')
+    for name, ms in result['slowest']:
+        print(f'    {name:<24} {ms:>8.1f} ms')
+    errors = check(result, a.budget)
+    if errors:
+        sys.exit('; '.join(errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+class BlastError(ValueError):
+    '''The compressed data is invalid or truncated.'''
+
+
+class Blast:
+    '''Decompresses data imploded by PKWare's Data Compression Library.
+
+    This is the format of DATASUS' .dbc files. The algorithm and tables
+    follow blast.c, by Mark Adler (part of the zlib distribution).
+    '''
+
+    # Compact Huffman code lengths: for each byte, the low four bits are a
+    # bit length and the high four bits are the repeat count minus one
+    LITERAL_LENGTHS = [
+        11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
+        9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
+        7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
+        8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
+        44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
+        44, 173
+    ]
+    LENGTH_LENGTHS = [2, 35, 36, 53, 38, 23]
+    DISTANCE_LENGTHS = [2, 20, 53, 230, 247, 151, 248]
+
+    # Base and number of extra bits of each length code
+    LENGTH_BASE = [3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264]
+    LENGTH_EXTRA = [0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+    END_OF_STREAM = 519
+    WINDOW_SIZE = 4096
+    CHUNK_SIZE = 1 << 16
+
+    _TABLES = None
+
+    @classmethod
+    def _table(cls, compact: List[int]) -> Tuple[List[Tuple[int, int]], int]:
+        # Lookup table indexed by the next max_bits bits of the stream (the
+        # first bit is the least significant one), giving (symbol, length).
+        # Codes are canonical, but stored with their bits inverted.
+        lengths = []
+        for byte in compact:
+            lengths += [byte & 15] * ((byte >> 4) + 1)
+        max_bits = max(lengths)
+        table = [(0, 0)] * (1 << max_bits)
+        code = 0
+        for bits in range(1, max_bits + 1):
+            for symbol, length in enumerate(lengths):
+                if length != bits:
+                    continue
+                index = 0
+                for i in range(bits):
+                    if not (code >> (bits - 1 - i)) & 1:
+                        index |= 1 << i
+                for high in range(1 << (max_bits - bits)):
+                    table[index | (high << bits)] = (symbol, bits)
+                code += 1
+            code <<= 1
+        return table, max_bits
+
+    @classmethod
+    def tables(cls) -> Dict[str, Tuple[List[Tuple[int, int]], int]]:
+        if cls._TABLES is None:
+            cls._TABLES = {
+                'literal': cls._table(cls.LITERAL_LENGTHS),
+                'length': cls._table(cls.LENGTH_LENGTHS),
+                'distance': cls._table(cls.DISTANCE_LENGTHS),
+            }
+        return cls._TABLES
+
+    @classmethod
+    def decompress(cls, read: Callable[[int], bytes]) -> Iterator[bytes]:
+        '''Yields the decompressed data in chunks.
+
+        ``read(n)`` must return up to n bytes of compressed data (b'' at
+        the end), like the method of a binary file.
+        '''
+        tables = cls.tables()
+        literal_table, literal_bits = tables['literal']
+        length_table, length_bits = tables['length']
+        distance_table, distance_bits = tables['distance']
+        length_base = cls.LENGTH_BASE
+        length_extra = cls.LENGTH_EXTRA
+        end_of_stream = cls.END_OF_STREAM
+        window_size = cls.WINDOW_SIZE
+        chunk_size = cls.CHUNK_SIZE
+
+        data = b''
+        pos = 0
+        bitbuf = 0
+        bitcnt = 0
+        exhausted = False
+        header = True
+        out = bytearray()
+
+        while True:
+            # At most 30 bits are used by each literal or match
+            if bitcnt < 32 and not exhausted:
+                if pos + 4 > len(data):
+                    more = read(chunk_size)
+                    exhausted = not more
+                    data = data[pos:] + more
+                    pos = 0
+                piece = data[pos:pos + 4]
+                pos += len(piece)
+                bitbuf |= int.from_bytes(piece, 'little') << bitcnt
+                bitcnt += 8 * len(piece)
+                continue
+            if header:
+                if bitcnt < 16:
+                    raise BlastError('truncated header')
+                coded_literals = bitbuf & 0xff
+                dictionary = (bitbuf >> 8) & 0xff
+                bitbuf >>= 16
+                bitcnt -= 16
+                if coded_literals > 1 or not 4 <= dictionary <= 6:
+                    raise BlastError('invalid header')
+                header = False
+                continue
+            if bitcnt < 1:
+                raise BlastError('truncated data')
+            flag = bitbuf & 1
+            bitbuf >>= 1
+            bitcnt -= 1
+            if flag:
+                symbol, n = length_table[bitbuf & ((1 << length_bits) - 1)]
+                bitbuf >>= n
+                extra = length_extra[symbol]
+                length = length_base[symbol] + (bitbuf & ((1 << extra) - 1))
+                bitbuf >>= extra
+                bitcnt -= n + extra
+                if length == end_of_stream:
+                    break
+                low_bits = 2 if length == 2 else dictionary
+                symbol, n = distance_table[
+                    bitbuf & ((1 << distance_bits) - 1)]
+                bitbuf >>= n
+                low = bitbuf & ((1 << low_bits) - 1)
+                distance = (symbol << low_bits) + low + 1
+                bitbuf >>= low_bits
+                bitcnt -= n + low_bits
+                if bitcnt < 0:
+                    raise BlastError('truncated data')
+                if distance > len(out):
+                    raise BlastError('distance too far back')
+                start = len(out) - distance
+                if distance >= length:
+                    out += out[start:start + length]
+                else:
+                    pattern = out[start:]
+                    out += (pattern * (length // distance + 1))[:length]
+            else:
+                if coded_literals:
+                    symbol, n = literal_table[
+                        bitbuf & ((1 << literal_bits) - 1)]
+                else:
+                    symbol, n = bitbuf & 0xff, 8
+                bitbuf >>= n
+                bitcnt -= n
+                if bitcnt < 0:
+                    raise BlastError('truncated data')
+                out.append(symbol)
+            if len(out) >= chunk_size + window_size:
+                chunk = bytes(out[:-window_size])
+                del out[:-window_size]
+                yield chunk
+        if out:
+            yield bytes(out)
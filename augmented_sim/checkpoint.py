@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import json
+import os
+
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+
+from augmented_sim.i18n import get_translator, get_tr
+from augmented_sim.table_reader import TableReadingError
+
+
+class Checkpoint:
+    '''Position up to which a run was saved, so that it can be resumed.
+
+    It is a small JSON file next to the output ("<output>.checkpoint") with
+    the input file being read, how many of its records were read and the
+    size of the output up to them. It is saved from time to time, right
+    after the output is flushed, and removed when the run finishes. The
+    settings of the run (input files, pattern, columns...) are saved with
+    it, and a run with other settings cannot be resumed from it.
+    '''
+
+    SUFFIX = '.checkpoint'
+    VERSION = 1
+    INTERVAL = 30.0  # seconds between checkpoints
+
+    def __init__(self, output_file_name: str, settings: Dict[str, Any],
+                 interval: float = INTERVAL):
+        self.output_file_name = output_file_name
+        self.file_name = output_file_name + self.SUFFIX
+        # As they are read back (e.g. dates become text)
+        self.settings = json.loads(json.dumps(settings, default=str))
+        self.interval = interval
+        self.last_saved = monotonic()
+        self.output_offset = None  # where the output is resumed, if it is
+
+    def due(self) -> bool:
+        return monotonic() - self.last_saved >= self.interval
+
+    def save(self, position: Tuple[int, int], output_offset: int) -> None:
+        file_index, records = position
+        data = {
+            'version': self.VERSION,
+            'settings': self.settings,
+            'file': file_index,
+            'records': records,
+            'output_offset': output_offset
+        }
+        temp_name = self.file_name + '.tmp'
+        with open(temp_name, 'w', encoding='utf-8') as fd:
+            json.dump(data, fd)
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.replace(temp_name, self.file_name)
+        self.last_saved = monotonic()
+
+    def load(self) -> Optional[Tuple[int, int]]:
+        '''Position in the input files to resume from (None without one).
+
+        The output file must still have what was saved up to it.
+        '''
+        if not os.path.exists(self.file_name):
+            return None
+        try:
+            with open(self.file_name, encoding='utf-8') as fd:
+                data = json.load(fd)
+            if data.get('version') != self.VERSION or \
+                    data.get('settings') != self.settings:
+                raise ValueError('the settings of the run are not the same')
+            output_offset = int(data['output_offset'])
+            if os.path.getsize(self.output_file_name) < output_offset:
+                raise ValueError('the output file is shorter than saved')
+            position = int(data['file']), int(data['records'])
+        except Exception as e:
+            tr = get_tr(type(self).__name__, get_translator(None))
+            msg = tr('invalid-checkpoint').format(self.file_name)
+            raise TableReadingError(msg, self.file_name, e)
+        self.output_offset = output_offset
+        return position
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.file_name)
+        except FileNotFoundError:
+            pass
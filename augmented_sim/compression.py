@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import io
+import os
+import sys
+
+from types import ModuleType
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+# The compression modules are only imported when a file needs them
+
+
+# Compression chosen by the file name suffix (levels favour smaller files)
+COMPRESSION_SUFFIXES = ['.gz', '.xz', '.bz2', '.zst', '.zip']
+COMPRESSION_LEVELS = {'.gz': 9, '.xz': 6, '.bz2': 9, '.zst': 15, '.zip': 9}
+
+# Table formats that can be read from a compressed stream
+STREAMABLE_FORMATS = ['.csv', '.dbf']
+
+
+def compression_suffix(file_name: str) -> Optional[str]:
+    name = file_name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def split_member(file_name: str) -> Tuple[str, Optional[str]]:
+    '''Splits "archive.zip/member.csv" into the archive and member names.
+
+    The member is None if the name does not refer to a zip archive member.
+    '''
+    lower = file_name.lower()
+    start = 0
+    while True:
+        idx = lower.find('.zip', start)
+        if idx < 0:
+            return file_name, None
+        end = idx + len('.zip')
+        if lower[end:end + 1] in ('/', os.sep) and \
+                os.path.isfile(file_name[:end]):
+            return file_name[:end], file_name[end + 1:].replace(os.sep, '/')
+        start = end
+
+
+def table_name(file_name: str) -> str:
+    '''Name of the table inside a compressed file or a zip archive.
+
+    It ends with the extension of the table format (e.g. ".csv").
+    '''
+    archive, member = split_member(file_name)
+    if member is not None:
+        return member
+    suffix = compression_suffix(file_name)
+    if suffix and suffix != '.zip':
+        return file_name[:-len(suffix)]
+    return file_name
+
+
+def is_compressed(file_name: str) -> bool:
+    return split_member(file_name)[1] is not None or \
+        compression_suffix(file_name) is not None
+
+
+def zip_members(file_name: str) -> List[str]:
+    # Names ("archive.zip/member") of the tables in a zip archive
+    import zipfile
+    suffixes = tuple(STREAMABLE_FORMATS)
+    with zipfile.ZipFile(file_name) as archive:
+        members = [name for name in archive.namelist()
+                   if name.lower().endswith(suffixes)]
+    return [f'{file_name}/{member}' for member in members]
+
+
+def _zstandard() -> ModuleType:
+    try:
+        import zstandard
+    except ImportError:  # optional
+        raise ValueError('.zst files require the "zstandard" package')
+    return zstandard
+
+
+class CompressedFile(io.RawIOBase):
+    '''A compressed file or a member of a zip archive, opened for reading.
+
+    ``position`` is the number of compressed bytes read, out of ``size``.
+    It can be wrapped in io.TextIOWrapper to be read as text.
+    '''
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        path, member = split_member(file_name)
+        self.raw = open(path, 'rb')
+        self.archive = None
+        try:
+            if member is not None:
+                import zipfile
+                self.archive = zipfile.ZipFile(self.raw)
+                info = self.archive.getinfo(member)
+                self.start = info.header_offset
+                self.size = info.compress_size
+                self.stream = self.archive.open(info)
+            else:
+                self.start = 0
+                self.size = os.fstat(self.raw.fileno()).st_size
+                self.stream = self._decompressor(
+                    compression_suffix(file_name), self.raw)
+        except BaseException:
+            self.close()
+            raise
+
+    @classmethod
+    def _decompressor(cls, suffix: str, raw: BinaryIO) -> BinaryIO:
+        if suffix == '.gz':
+            import gzip
+            return gzip.GzipFile(fileobj=raw, mode='rb')
+        if suffix == '.xz':
+            import lzma
+            return lzma.LZMAFile(raw, 'rb')
+        if suffix == '.bz2':
+            import bz2
+            return bz2.BZ2File(raw, 'rb')
+        if suffix == '.zst':
+            return _zstandard().ZstdDecompressor().stream_reader(
+                raw, read_across_frames=True, closefd=False)
+        raise ValueError(f'unsupported compression: {suffix}')
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def readinto(self, buffer: Union[bytearray, memoryview]) -> int:
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    @property
+    def position(self) -> int:
+        return max(0, self.raw.tell() - self.start)
+
+    def close(self) -> None:
+        if not self.closed:
+            for name in ['stream', 'archive', 'raw']:
+                f = getattr(self, name, None)
+                if f is not None:
+                    f.close()
+        super().close()
+
+
+class ZipMemberWriter(io.RawIOBase):
+    '''Writes a single member of a new zip archive.'''
+
+    def __init__(self, file_name: str, member: str, level: int):
+        import zipfile
+        options = {'compresslevel': level} \
+            if sys.version_info >= (3, 7) else {}  # default level before
+        self.archive = zipfile.ZipFile(
+            file_name, 'w', zipfile.ZIP_DEFLATED, **options)
+        try:
+            self.member = self.archive.open(member, 'w', force_zip64=True)
+        except BaseException:
+            self.archive.close()
+            raise
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        return self.member.write(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self.member.close()
+            finally:
+                self.archive.close()
+        super().close()
+
+
+def open_output(file_name: str) -> BinaryIO:
+    '''Opens a file for writing, compressed according to its suffix.'''
+    suffix = compression_suffix(file_name)
+    level = COMPRESSION_LEVELS.get(suffix)
+    if suffix == '.gz':
+        import gzip
+        return gzip.open(file_name, 'wb', compresslevel=level)
+    if suffix == '.xz':
+        import lzma
+        return lzma.open(file_name, 'wb', preset=level)
+    if suffix == '.bz2':
+        import bz2
+        return bz2.open(file_name, 'wb', compresslevel=level)
+    if suffix == '.zst':
+        compressor = _zstandard().ZstdCompressor(level=level)
+        return compressor.stream_writer(open(file_name, 'wb'))
+    if suffix == '.zip':
+        member = os.path.basename(file_name)[:-len(suffix)]
+        if not member.lower().endswith('.csv'):
+            member += '.csv'
+        return io.BufferedWriter(ZipMemberWriter(file_name, member, level))
+    return open(file_name, 'wb')
@@ -6,18 +6,30 @@ if sys.version_info < (3, 6):
     sys.stderr.write('Python < 3.6: NOT SUPPORTED / NÃO SUPORTADO\n')
     exit(1)
 
+import os
 import threading
 
-from dateutil.relativedelta import relativedelta
+from collections import Counter, deque
+from contextlib import ExitStack
 from pathlib import Path
-from tqdm import tqdm
+from itertools import groupby, islice
 from time import time
-from typing import List, Callable, Union, Type
+from typing import List, Callable, Type, Dict, Optional, Tuple, Union, \
+    TYPE_CHECKING
 
+from augmented_sim.aggregator import Aggregator
+from augmented_sim.checkpoint import Checkpoint
+from augmented_sim.compression import compression_suffix
+from augmented_sim.delta import DeltaIndex, DeltaManifest, ROW_HASH, \
+    row_hash, value_text
 from augmented_sim.i18n import get_translator, get_tr
-from augmented_sim.table_reader import TableReader
+from augmented_sim.metrics import StageMetrics
+from augmented_sim.profiling import MemoryTracer, Profiler
+from augmented_sim.table_reader import TableReader, Progress, EncodingChanged
 from augmented_sim.table_writer import TableWriter
-from augmented_sim.sim.row_parser import SIMRowParser
+from augmented_sim.row_filter import RowFilter
+from augmented_sim.row_plan import RowPlan
+from augmented_sim.sim.augmenter import MemoizedAugmenter, memoize
 
 from augmented_sim.sim.input_pattern import ALL_PATTERNS
 
@@ -26,6 +38,11 @@ from augmented_sim.sim.death_cause_augmenter import DeathCauseAugmenter
 from augmented_sim.sim.death_date_augmenter import DeathDateAugmenter
 from augmented_sim.sim.neighbourhood_augmenter import NeighbourhoodAugmenter
 
+# tqdm, dateutil and worker processes are only imported when they are used
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from dateutil.relativedelta import relativedelta
+
 
 # Each new column comes after the column it depends on
 
@@ -36,6 +53,17 @@ COLS_AFTER = {
     'CAUSABAS': DeathCauseAugmenter.PRODUCES
 }
 
+# Types of the columns in Parquet and Arrow output (the others are text)
+
+COLUMN_TYPES = {
+    **{col: 'int' for a in [DeathDateAugmenter, AgeAugmenter,
+                            NeighbourhoodAugmenter, DeathCauseAugmenter]
+       for col in a.PRODUCES},
+    'CAUSABAS': 'dictionary',
+    'CAPCID': 'dictionary',  # "**" for invalid codes
+    'CIDBR': 'dictionary'
+}
+
 ALL_AUGMENTERS = [
     DeathDateAugmenter,
     AgeAugmenter,
@@ -43,6 +71,74 @@ ALL_AUGMENTERS = [
     DeathCauseAugmenter
 ]
 
+NEW_COLUMNS = [col for a in ALL_AUGMENTERS for col in a.PRODUCES]
+
+# Stands for all the columns of the input files in a list of columns
+ORIGINAL_COLUMNS = '*'
+
+# Number of rows augmented at once (and sent to each worker process)
+CHUNK_SIZE = 5000
+
+# Seconds between progress reports (the rows only update counters)
+PROGRESS_INTERVAL = 0.1
+
+
+def get_augmenters(cache_size: int = 0) -> List:
+    return [memoize(a, cache_size) for a in ALL_AUGMENTERS]
+
+
+def select_columns(cols: List[str], original_cols: List[str],
+                   requested: List[str]) -> Tuple[List[str], List[str]]:
+    '''Keeps the requested columns, in the order they have in cols.
+
+    Returns them and the requested columns that are not in cols.
+    '''
+    if ORIGINAL_COLUMNS in requested:
+        requested = [*requested, *original_cols]
+    selected = [col for col in cols if col in requested]
+    missing = [col for col in requested
+               if col != ORIGINAL_COLUMNS and col not in cols]
+    return selected, missing
+
+
+# Augmenters and plans used by this worker process (kept between chunks so
+# that the plans are compiled once and the caches are reused)
+_worker_augmenters = None
+_worker_plans = {}
+
+
+def augment_chunk(pattern: Type, in_cols: List[str], out_cols: List[str],
+                  rows: List[List], cache_size: int,
+                  group_by: Optional[List[str]] = None,
+                  adapted: bool = False) \
+        -> Tuple[Union[List[Tuple], Counter], int, Dict[str, Tuple[int, int]],
+                 Dict[str, List]]:
+    # Only the counts are sent back if group_by is given
+    global _worker_augmenters
+    metrics = StageMetrics()
+    if _worker_augmenters is None:
+        _worker_augmenters = get_augmenters(cache_size)
+    key = (pattern, tuple(in_cols), tuple(out_cols))
+    plan = _worker_plans.get(key)
+    if plan is None:
+        plan = RowPlan(pattern, in_cols, out_cols, _worker_augmenters)
+        _worker_plans[key] = plan
+    rows = plan.augment_chunk(rows, adapted, metrics)
+    if group_by is not None:
+        t = metrics.clock()
+        n = len(rows)
+        rows = Aggregator.count(group_by, out_cols, rows)
+        metrics.add('aggregate', t, n)
+    return rows, os.getpid(), cache_stats(_worker_augmenters), \
+        metrics.as_dict()
+
+
+def cache_stats(augmenters: List) -> Dict[str, Tuple[int, int]]:
+    return {
+        a.name: (a.hits, a.misses)
+        for a in augmenters if isinstance(a, MemoizedAugmenter)
+    }
+
 
 class AugmentThread(threading.Thread):
 
@@ -51,9 +147,19 @@ class AugmentThread(threading.Thread):
                  parser: TableReader.UNION_ALL_PARSERS,
                  cols: List[str],
                  pattern: Type,
-                 report_progress: Callable[[List], None] = None,
+                 report_progress: Callable[[Progress], None] = None,
                  report_exception: Callable[[BaseException], None] = None,
-                 report_conclusion: Callable[[], None] = None
+                 report_conclusion: Callable[[], None] = None,
+                 workers: int = 1,
+                 cache_size: int = 0,
+                 output_format: str = 'CSV',
+                 aggregator: Optional[Aggregator] = None,
+                 aggregate_file_name: Optional[str] = None,
+                 aggregate_format: str = 'CSV',
+                 previous_file_name: Optional[str] = None,
+                 delta_key: str = 'NUMERODO',
+                 checkpoint: Optional[Checkpoint] = None,
+                 hooks: Optional[List] = None
                  ):
         super().__init__()
         self.output_file_name = output_file_name
@@ -63,46 +169,392 @@ class AugmentThread(threading.Thread):
         self.report_progress = report_progress
         self.report_exception = report_exception
         self.report_conclusion = report_conclusion
+        self.workers = max(1, workers)
+        self.cache_size = cache_size
+        self.output_format = output_format
+        # Rows are only counted if there is no output_file_name
+        self.aggregator = aggregator
+        self.aggregate_file_name = aggregate_file_name
+        self.aggregate_format = aggregate_format
+        self.groups = 0
+        # Rows that were already in previous_file_name are copied from it
+        self.previous_file_name = previous_file_name
+        self.delta_key = delta_key
+        self.manifest = None
+        # Saved from time to time; the output is resumed from it if it was
+        # loaded (see Checkpoint.load)
+        self.checkpoint = checkpoint
+        # Context managers entered in this thread while it augments the
+        # rows (such as Profiler and MemoryTracer)
+        self.hooks = hooks or []
+        self.augmenters = get_augmenters(cache_size)
+        self.worker_cache_stats = {}
+        # Time spent in each stage (in all processes)
+        self.metrics = StageMetrics()
 
     def run(self) -> None:
         self.exception = None
         try:
-            if self.report_progress:
-                self.report_progress(self.parser.progress())
-            Path(self.output_file_name).parent.mkdir(
-                parents=True, exist_ok=True
-            )
-            with TableWriter('CSV', self.cols, self.output_file_name) as w:
-                w.write_header()
-                for row in self.parser.parse():
-                    row = self.pattern.adapt_row(row)
-                    parsed_row = SIMRowParser.parse_row(row)
-                    for augmenter in ALL_AUGMENTERS:
-                        row.update(augmenter.get_new_values(parsed_row))
-                    w.write_row(row)
-                    if self.report_progress:
-                        self.report_progress(self.parser.progress())
-                if self.report_progress:
-                    self.report_progress(self.parser.progress())
+            with ExitStack() as stack:
+                for hook in self.hooks:
+                    stack.enter_context(hook)
+                self._augment_all()
             if self.report_conclusion:
                 self.report_conclusion()
         except Exception as e:
+            self.exception = e
             if self.report_exception:
                 self.report_exception(e)
 
+    def _augment_all(self) -> None:
+        # Starts over if a file turns out to be in another encoding after
+        # some of its text was already augmented
+        counts = None
+        if self.aggregator is not None:
+            counts = Counter(self.aggregator.counts)
+        while True:
+            try:
+                self._augment()
+                return
+            except EncodingChanged as e:
+                self.parser.restart(e.file_name, e.encodings)
+            if counts is not None:
+                self.aggregator.counts = Counter(counts)
+            if self.checkpoint is not None:
+                self.checkpoint.remove()
+                self.checkpoint.output_offset = None
+            self.metrics = StageMetrics()
+
+    def _augment(self) -> None:
+        if self.report_progress:
+            self.report_progress(self.parser.progress())
+        if self.output_file_name is None:
+            self._run(None)
+        else:
+            Path(self.output_file_name).parent.mkdir(
+                parents=True, exist_ok=True
+            )
+            resume_at = None
+            if self.checkpoint is not None:
+                resume_at = self.checkpoint.output_offset
+            with TableWriter(self.output_format, self.cols,
+                             self.output_file_name, COLUMN_TYPES,
+                             resume_at) as w:
+                if resume_at is None:
+                    w.write_header()
+                self._run(w)
+            if self.checkpoint is not None:
+                self.checkpoint.remove()
+        if self.aggregator is not None:
+            Path(self.aggregate_file_name).parent.mkdir(
+                parents=True, exist_ok=True
+            )
+            self.groups = self.aggregator.save(
+                self.aggregate_file_name, self.aggregate_format)
+
+    def _run(self, w: Optional[TableWriter]) -> None:
+        if self.previous_file_name is not None:
+            self._run_delta(w)
+        elif self.workers > 1:
+            self._run_parallel(w)
+        else:
+            self._run_serial(w)
+        if self.report_progress:
+            self.report_progress(self.parser.progress())
+
+    def _plan(self, plans: Dict[Tuple, RowPlan],
+              columns: List[str]) -> RowPlan:
+        key = tuple(columns)
+        if key not in plans:
+            plans[key] = RowPlan(self.pattern, columns, self.cols,
+                                 self.augmenters)
+        return plans[key]
+
+    def _run_serial(self, w: Optional[TableWriter]) -> None:
+        plans = {}
+        metrics = self.metrics
+        t = metrics.clock()
+        for columns, chunk in self.parser.parse_chunks(CHUNK_SIZE):
+            metrics.add('read', t, len(chunk))
+            position = self.parser.input_position()
+            plan = self._plan(plans, columns)
+            self._write_rows(w, plan.augment_chunk(chunk, False, metrics))
+            self._save_checkpoint(w, position)
+            t = metrics.clock()
+
+    def _run_parallel(self, w: Optional[TableWriter]) -> None:
+        # Chunks are submitted in order and their results are written in
+        # the same order; at most two chunks per worker are kept in memory.
+        # Without an output file, workers only send back their counts.
+        group_by = None
+        if w is None and self.aggregator is not None:
+            group_by = self.aggregator.dimensions
+        metrics = self.metrics
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(self.workers) as executor:
+            pending = deque()
+            t = metrics.clock()
+            for columns, chunk in self.parser.parse_chunks(CHUNK_SIZE):
+                metrics.add('read', t, len(chunk))
+                pending.append((executor.submit(
+                    augment_chunk, self.pattern, columns, self.cols, chunk,
+                    self.cache_size, group_by), self.parser.input_position()))
+                if len(pending) >= 2 * self.workers:
+                    self._write_chunk(w, *pending.popleft())
+                t = metrics.clock()
+            while pending:
+                self._write_chunk(w, *pending.popleft())
+
+    def _run_delta(self, w: TableWriter) -> None:
+        # Rows are adapted here and compared with those of the previous
+        # output; only the new and changed ones are augmented (by worker
+        # processes, if any), and the others are copied
+        plans = {}
+        with ExitStack() as stack:
+            # The index is saved next to the new output, which is writable
+            delta = DeltaIndex(self.previous_file_name,
+                               self.output_file_name + DeltaIndex.SUFFIX,
+                               self.cols, self.delta_key,
+                               self._hashed_columns())
+            stack.callback(delta.close)
+            self.manifest = DeltaManifest(
+                self.output_file_name + DeltaManifest.SUFFIX, self.delta_key,
+                delta.index_file_name)
+            stack.callback(self.manifest.close)
+            executor = None
+            if self.workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(self.workers))
+            pending = deque()
+            metrics = self.metrics
+            t = metrics.clock()
+            for columns, chunk in self.parser.parse_chunks(CHUNK_SIZE):
+                t = metrics.add('read', t, len(chunk))
+                plan = self._plan(plans, columns)
+                plan.adapt_chunk(chunk)
+                t = metrics.add('adapt', t, len(chunk))
+                lines = self._compare(delta, plan, chunk)
+                chunk = [row for row, line in zip(chunk, lines)
+                         if line is None]
+                metrics.add('compare', t, len(lines))
+                if executor is None:
+                    rows = plan.augment_chunk(chunk, True, metrics) \
+                        if chunk else []
+                    self._write_merged(w, lines, rows)
+                    t = metrics.clock()
+                    continue
+                pending.append((lines, executor.submit(
+                    augment_chunk, self.pattern, columns, self.cols, chunk,
+                    self.cache_size, None, True)))
+                if len(pending) >= 2 * self.workers:
+                    self._write_merged(w, *pending.popleft())
+                t = metrics.clock()
+            while pending:
+                self._write_merged(w, *pending.popleft())
+            for key in delta.removed():
+                self.manifest.add(key, DeltaManifest.REMOVED)
+
+    def _hashed_columns(self) -> List[str]:
+        # Output columns that input values can reach as they are: those of
+        # the adapted rows, including the ones that an augmenter produces
+        # too (it leaves the values it cannot compute as they are). The
+        # other new columns only depend on these.
+        adapted = set()
+        for f in self.parser.files:
+            index, _ = self.pattern.compile_adapter(
+                self.parser.file_columns(f))
+            adapted.update(index)
+        return [col for col in self.cols if col in adapted]
+
+    def _compare(self, delta: DeltaIndex, plan: RowPlan,
+                 rows: List[List]) -> List[Optional[str]]:
+        # The line of the previous output to copy for each unchanged row
+        # (None for the others)
+        hashes = [row_hash(values)
+                  for values in plan.values(rows, delta.hashed)]
+        if delta.key == ROW_HASH:
+            keys = [h.hex() for h in hashes]
+        else:
+            keys = [value_text(v) for v, in plan.values(rows, [delta.key])]
+        previous = delta.lookup(keys)
+        lines = []
+        for key, h in zip(keys, hashes):
+            found = previous.get(key)
+            line = None
+            if found is None:
+                change = DeltaManifest.ADDED
+            elif h in found:
+                change = None
+                line = delta.line(*found[h])
+            else:
+                change = DeltaManifest.CHANGED
+            self.manifest.add(key, change)
+            lines.append(line)
+        return lines
+
+    def _write_merged(self, w: TableWriter, lines: List[Optional[str]],
+                      rows: Union[List[Tuple], 'Future']) -> None:
+        # Copied lines, with the augmented rows in place of the None ones
+        if not isinstance(rows, list):  # a Future
+            rows = self._result(rows)
+        t = self.metrics.clock()
+        rows = iter(rows)
+        for new, group in groupby(lines, lambda line: line is None):
+            if new:
+                w.write_many(islice(rows, sum(1 for line in group)))
+            else:
+                w.write_raw(''.join(group))
+        self.metrics.add('write', t, len(lines))
+
+    def _result(self, future: 'Future') -> Union[List[Tuple], Counter]:
+        # Waits for a worker process (see augment_chunk)
+        t = self.metrics.clock()
+        rows, pid, stats, stages = future.result()
+        self.metrics.add('wait', t)
+        self.worker_cache_stats[pid] = stats
+        self.metrics.merge(stages)
+        return rows
+
+    def _write_chunk(self, w: Optional[TableWriter], future: 'Future',
+                     position: Tuple[int, int]) -> None:
+        rows = self._result(future)
+        if isinstance(rows, Counter):
+            t = self.metrics.clock()
+            self.aggregator.merge(rows)
+            self.metrics.add('aggregate', t)
+        else:
+            self._write_rows(w, rows)
+            self._save_checkpoint(w, position)
+
+    def _save_checkpoint(self, w: Optional[TableWriter],
+                         position: Tuple[int, int]) -> None:
+        # Position in the input files after the rows written so far
+        checkpoint = self.checkpoint
+        if checkpoint is not None and checkpoint.due():
+            t = self.metrics.clock()
+            checkpoint.save(position, w.flush())
+            self.metrics.add('checkpoint', t)
+
+    def _write_rows(self, w: Optional[TableWriter],
+                    rows: List[Tuple]) -> None:
+        t = self.metrics.clock()
+        if w is not None:
+            w.write_many(rows)
+            t = self.metrics.add('write', t, len(rows))
+        if self.aggregator is not None:
+            self.aggregator.add(self.cols, rows)
+            self.metrics.add('aggregate', t, len(rows))
+
+    def cache_stats(self) -> Dict[str, Tuple[int, int]]:
+        # Hits and misses of each memoized augmenter, in all processes
+        total = cache_stats(self.augmenters)
+        for stats in self.worker_cache_stats.values():
+            for name, (hits, misses) in stats.items():
+                h, m = total.get(name, (0, 0))
+                total[name] = (h + hits, m + misses)
+        return total
+
+
+class HiddenBar:
+    '''Stands for a tqdm progress bar that is not shown.'''
+
+    disable = True
+
+    def __init__(self):
+        self.n = 0
+        self.total = None
+
+    def update(self, n: int = 1) -> None:
+        self.n += n
+
+    def close(self) -> None:
+        pass
+
+
+class ProgressPoller(threading.Thread):
+    '''Reports the progress periodically until it is stopped.'''
+
+    def __init__(self, get_progress: Callable[[], Progress],
+                 report_progress: Callable[[Progress], None],
+                 interval: float = PROGRESS_INTERVAL):
+        super().__init__(daemon=True)
+        self.get_progress = get_progress
+        self.report_progress = report_progress
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.report_progress(self.get_progress())
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+
 
 class AugmentedSIM:
 
     def __init__(self, input_file_names: str, output_file_name: str,
-                 pattern_name: str):
+                 pattern_name: str, workers: int = 1,
+                 encoding: Optional[str] = None, cache_size: int = 0,
+                 dbf_backend: str = 'fast',
+                 output_format: Optional[str] = None,
+                 columns: Optional[List[str]] = None,
+                 row_filter: Optional[RowFilter] = None,
+                 group_by: Optional[List[str]] = None,
+                 aggregate_file_name: Optional[str] = None,
+                 merge_aggregates: Optional[List[str]] = None,
+                 previous_file_name: Optional[str] = None,
+                 delta_key: str = 'NUMERODO', resume: bool = False,
+                 metrics_file_name: Optional[str] = None,
+                 prometheus_file_name: Optional[str] = None,
+                 profile_prefix: Optional[str] = None,
+                 trace_memory_file_name: Optional[str] = None,
+                 trace_memory_interval: float = 10.0):
         self.input_file_names = input_file_names
         self.output_file_name = output_file_name
+        self.pattern_name = pattern_name
         self.pattern = ALL_PATTERNS[pattern_name]
+        self.workers = workers
+        self.encoding = encoding
+        self.dbf_backend = dbf_backend
+        self.cache_size = cache_size
+        self.output_format = output_format or \
+            TableWriter.format_for(output_file_name)
+        self.columns = columns  # None for all of them
+        self.row_filter = row_filter
+        # Rows can be counted by the values of the group_by columns; the
+        # counts are saved in aggregate_file_name or, without it, in the
+        # output file instead of the rows. The counts in merge_aggregates
+        # (saved by previous runs) are added to them.
+        self.group_by = group_by
+        self.aggregate_file_name = aggregate_file_name
+        self.merge_aggregates = merge_aggregates or []
+        # With a CSV file saved by a previous run, only the rows that are
+        # new or changed (by delta_key, a column or ROW_HASH) are augmented
+        self.previous_file_name = previous_file_name
+        self.delta_key = delta_key
+        # Checkpoints are saved while a CSV file is written; with resume,
+        # the output is continued from the last one
+        self.resume = resume
+        # The time spent in each stage is also saved in these files, as
+        # JSON and in the text format of Prometheus
+        self.metrics_file_name = metrics_file_name
+        self.prometheus_file_name = prometheus_file_name
+        # The thread that reads and augments the rows can be profiled (see
+        # Profiler) and its memory can be traced (see MemoryTracer)
+        self.profile_prefix = profile_prefix
+        self.trace_memory_file_name = trace_memory_file_name
+        self.trace_memory_interval = trace_memory_interval
+        self.parser = None
+        self.thread = None
         self.trans = get_translator(None)
         self.tr = get_tr(type(self).__name__, self.trans)
 
     def augment(self,
-                report_progress: Callable[[List], None] = None,
+                report_progress: Callable[[Progress], None] = None,
                 report_exception: Callable[[BaseException], None] = None,
                 report_conclusion: Callable[[str], None] = None) -> None:
 
@@ -111,28 +563,37 @@ class AugmentedSIM:
         # Progress
         fmt = '{l_bar}{bar} {remaining}'
         disable = 'pythonw' in sys.executable  # avoid crash on Windows
-        overall_pbar = tqdm(
-            bar_format=fmt, colour='green',
-            desc='OVERALL', position=0, leave=False, disable=disable
-        )
-        current_pbar = tqdm(
-            bar_format=fmt, colour='green',
-            desc='CURRENT', position=1, leave=False, disable=disable
-        )
+        if disable:
+            overall_pbar, current_pbar = HiddenBar(), HiddenBar()
+        else:
+            from tqdm import tqdm
+            overall_pbar = tqdm(
+                bar_format=fmt, colour='green',
+                desc='OVERALL', position=0, leave=False
+            )
+            current_pbar = tqdm(
+                bar_format=fmt, colour='green',
+                desc='CURRENT', position=1, leave=False
+            )
 
-        def _report_progress(progress: Union[int, float]) -> None:
+        def _report_progress(progress: Progress) -> None:
             if report_progress:
                 report_progress(progress)
-            overall_pbar.update(-overall_pbar.n + progress[2])
-            current_pbar.total = progress[1]
-            current_pbar.update(-current_pbar.n + progress[0])
+            overall_pbar.update(-overall_pbar.n + progress.overall)
+            current_pbar.total = progress.current_total
+            current_pbar.update(-current_pbar.n + progress.current)
+
+        # Rows are not reported one by one: the reader only counts them,
+        # and the counters are polled here
+        poller = ProgressPoller(lambda: parser.progress(), _report_progress)
 
         def _report_exception(exc: str) -> None:
+            poller.stop()
             for bar in [overall_pbar, current_pbar]:
                 bar.close()
             report_exception(exc)
 
-        def _format_elapsed_time(dt: relativedelta) -> str:
+        def _format_elapsed_time(dt: 'relativedelta') -> str:
             # Report elapsed time (using symbols - language independent)
             t_str = []
             expr = [
@@ -152,6 +613,7 @@ class AugmentedSIM:
             return ''.join(t_str)
 
         def _report_conclusion() -> None:
+            poller.stop()
             for bar in [overall_pbar, current_pbar]:
                 bar.close()
                 if not bar.disable:
@@ -159,6 +621,39 @@ class AugmentedSIM:
             elapsed = time() - start_time
             if report_conclusion:
                 report_conclusion(elapsed)
+            # Detected encodings can be pinned in later runs
+            for file_name, enc in parser.detected_encodings().items():
+                print(self.tr('detected-encoding').format(file_name, enc))
+            skipped = parser.progress().skipped
+            if skipped:
+                print(self.tr('skipped-rows').format(skipped))
+            if thread.aggregator is not None:
+                print(self.tr('aggregate-saved').format(
+                    thread.groups, thread.aggregate_file_name))
+            if resumed_from is not None:
+                file_index, records = resumed_from
+                print(self.tr('resumed').format(
+                    records, parser.files[file_index][0]))
+            manifest = thread.manifest
+            if manifest is not None:
+                print(self.tr('delta-summary').format(
+                    manifest.counts[manifest.ADDED],
+                    manifest.counts[manifest.CHANGED],
+                    manifest.counts[manifest.REMOVED],
+                    manifest.unchanged, manifest.file_name,
+                    manifest.index_file_name))
+            for name, (hits, misses) in thread.cache_stats().items():
+                if hits + misses == 0:  # no column of it was output
+                    continue
+                rate = 100 * hits / max(1, hits + misses)
+                print(self.tr('cache-hit-rate').format(
+                    name, f'{rate:.1f}', hits + misses))
+            self._report_metrics(thread.metrics, elapsed)
+            for hook in thread.hooks:
+                msg = 'memory-trace-saved' if isinstance(hook, MemoryTracer) \
+                    else 'profile-saved'
+                print(self.tr(msg).format('”, “'.join(hook.file_names)))
+            from dateutil.relativedelta import relativedelta
             # Using an integer to get integer attributes later
             dt = relativedelta(seconds=elapsed)
             s = _format_elapsed_time(dt)
@@ -166,13 +661,15 @@ class AugmentedSIM:
 
         # Open input file
         try:
-            parser = TableReader(self.input_file_names)
+            parser = TableReader(self.input_file_names, self.encoding,
+                                 self.dbf_backend, self.row_filter)
         except Exception as e:
             _report_exception(e)
             return
 
         cols = parser.columns[:]
         cols = self.pattern.adapt_col_list(cols)
+        original_cols = cols[:]
         progress = parser.progress()
 
         # Add new columns depending on the existing ones
@@ -184,12 +681,177 @@ class AugmentedSIM:
             except ValueError:
                 pass
 
-        overall_pbar.total = progress[3]
-        current_pbar.total = progress[1]
+        # Only the requested columns are computed and saved
+        requested = self.columns
+        only_counts = self.group_by is not None and \
+            self.aggregate_file_name is None
+        if only_counts:
+            requested = self.group_by
+        if requested is not None:
+            cols, missing = select_columns(cols, original_cols, requested)
+            if missing:
+                _report_exception(ValueError(
+                    self.tr('unavailable-columns').format(
+                        ', '.join(missing))))
+                return
+            # The other columns of the input files are not read at all
+            needed = [col for col in cols if col in original_cols]
+            for augmenter in ALL_AUGMENTERS:
+                if any(col in cols for col in augmenter.PRODUCES):
+                    needed += augmenter.REQUIRES
+            parser.project(
+                self.pattern.source_columns(parser.columns, needed))
+
+        aggregator = None
+        if self.group_by is not None:
+            missing = [col for col in self.group_by if col not in cols]
+            if missing:
+                _report_exception(ValueError(
+                    self.tr('unavailable-columns').format(
+                        ', '.join(missing))))
+                return
+            aggregator = Aggregator(self.group_by, COLUMN_TYPES)
+            try:
+                for file_name in self.merge_aggregates:
+                    aggregator.load(file_name)
+            except Exception as e:
+                _report_exception(e)
+                return
+        if self.previous_file_name is not None:
+            error = self._check_delta(cols, original_cols)
+            if error:
+                _report_exception(ValueError(error))
+                return
+
+        checkpoint = None
+        resumed_from = None
+        if self._resumable():
+            checkpoint = Checkpoint(self.output_file_name, {
+                'input_files': self.input_file_names,
+                'pattern': self.pattern.__name__,
+                'encoding': self.encoding,
+                'columns': cols,
+                'filter': vars(self.row_filter) if self.row_filter else None
+            })
+            if self.resume:
+                try:
+                    resumed_from = checkpoint.load()
+                except Exception as e:
+                    _report_exception(e)
+                    return
+                if resumed_from is not None:
+                    parser.resume(*resumed_from)
+        elif self.resume:
+            _report_exception(ValueError(self.tr('resume-unsupported')))
+            return
+
+        aggregate_file_name = self.aggregate_file_name or \
+            self.output_file_name
+        aggregate_format = self.output_format if only_counts else \
+            TableWriter.format_for(aggregate_file_name)
+
+        # The profiler is entered last, so that it does not profile the
+        # memory tracer
+        hooks = []
+        if self.trace_memory_file_name is not None:
+            hooks.append(MemoryTracer(self.trace_memory_file_name,
+                                      self.trace_memory_interval))
+        if self.profile_prefix is not None:
+            hooks.append(Profiler(self.profile_prefix))
+
+        overall_pbar.total = progress.overall_total
+        current_pbar.total = progress.current_total
 
         # Open output file
         thread = AugmentThread(
-            self.output_file_name, parser, cols, self.pattern,
-            _report_progress, _report_exception, _report_conclusion
+            None if only_counts else self.output_file_name, parser, cols,
+            self.pattern, _report_progress, _report_exception,
+            _report_conclusion, self.workers, self.cache_size,
+            self.output_format, aggregator, aggregate_file_name,
+            aggregate_format, self.previous_file_name, self.delta_key,
+            checkpoint, hooks
         )
+        self.parser = parser
+        self.thread = thread
         thread.start()
+        poller.start()
+
+    def _report_metrics(self, metrics: StageMetrics, elapsed: float) -> None:
+        if self.workers > 1:
+            print(self.tr('stage-times-workers'))
+        else:
+            print(self.tr('stage-times'))
+        for stage, wall, cpu, rows, rate in metrics.summary():
+            rate = f'{rate:,.0f}' if rows and rate else '-'
+            print(self.tr('stage-time').format(
+                stage, f'{wall:.3f}', f'{cpu:.3f}', rows, rate))
+        progress = self.parser.progress()
+        run = {
+            'input_files': self.input_file_names,
+            'output_file': self.output_file_name,
+            'pattern': self.pattern_name,
+            'workers': self.workers,
+            'elapsed_seconds': round(elapsed, 6),
+            'rows': progress.rows,
+            'skipped_rows': progress.skipped,
+            'rows_per_second': round(progress.rows / elapsed, 1)
+            if elapsed > 0 else 0,
+            'last_run_timestamp_seconds': round(time())
+        }
+        for file_name, save in [
+                (self.metrics_file_name, metrics.save_json),
+                (self.prometheus_file_name, metrics.save_prometheus)]:
+            if file_name is None:
+                continue
+            try:
+                save(file_name, run)
+            except OSError as e:
+                print(self.tr('metrics-not-saved').format(
+                    file_name, e.strerror or e))
+            else:
+                print(self.tr('metrics-saved').format(file_name))
+
+    def _resumable(self) -> bool:
+        # Only an uncompressed CSV file of rows can be truncated and
+        # continued (the counts and changes are not saved while running)
+        return self.output_format == 'CSV' and self.group_by is None and \
+            self.previous_file_name is None and \
+            not compression_suffix(self.output_file_name)
+
+    def _check_delta(self, cols: List[str],
+                     original_cols: List[str]) -> Optional[str]:
+        # Error message if an incremental run is not possible
+        previous = self.previous_file_name
+        if self.output_format != 'CSV' or self.group_by is not None or \
+                TableWriter.format_for(previous) != 'CSV' or \
+                compression_suffix(previous) or \
+                os.path.abspath(previous) == \
+                os.path.abspath(self.output_file_name):
+            return self.tr('delta-unsupported')
+        produced = [col for a in ALL_AUGMENTERS for col in a.PRODUCES
+                    if any(c in cols for c in a.PRODUCES)]
+        if self.delta_key != ROW_HASH and \
+                (self.delta_key not in cols or self.delta_key in produced):
+            return self.tr('unavailable-columns').format(self.delta_key)
+        # New values are only compared through the columns they come from
+        required = [col for a in ALL_AUGMENTERS for col in a.REQUIRES
+                    if any(c in cols for c in a.PRODUCES)]
+        missing = [col for col in required
+                   if col in original_cols and col not in cols]
+        if missing:
+            return self.tr('delta-missing-columns').format(
+                ', '.join(dict.fromkeys(missing)))
+        return None
+
+    def progress(self) -> Optional[Progress]:
+        # Can be polled while running (e.g. by a timer in the GUI)
+        return self.parser.progress() if self.parser else None
+
+    def running(self) -> bool:
+        return bool(self.thread and self.thread.is_alive())
+
+    def wait(self) -> None:
+        # Worker processes cannot be started once the main thread has
+        # finished, so a CLI that uses them must wait here
+        if self.thread:
+            self.thread.join()
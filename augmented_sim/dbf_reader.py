@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import datetime
+import io
+import mmap
+import struct
+
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, \
+    Union
+
+from augmented_sim.blast import Blast
+
+
+class UnsupportedDBF(ValueError):
+    '''The file uses a feature that only dbfread supports.'''
+
+
+class DBFReader:
+    '''Reads the records of a DBF file as lists of values.
+
+    The file is memory-mapped and its header is parsed once; the fields of
+    each record are sliced directly from the mapped buffer. Values are the
+    same as those of dbfread, which remains necessary for memo fields and
+    other uncommon field types (UnsupportedDBF is raised for them).
+    '''
+
+    HEADER = struct.Struct('<BBBBLHHHBBLLLBBH')
+    FIELD = struct.Struct('<11scLBBHBBBB7sB')
+
+    def __init__(self, file_name: str, encoding: Optional[str] = None):
+        self.file_name = file_name
+        self.fd = open(file_name, 'rb')
+        try:
+            self.buffer = mmap.mmap(self.fd.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        except BaseException:
+            self.fd.close()
+            raise
+        try:
+            self._read_header(encoding)
+        except BaseException:
+            self.close()
+            raise
+        self.scanned = 0  # records read so far (including deleted ones)
+        self.skipped = 0  # records that did not pass row_test
+        self.first = 0  # record where reading starts
+
+    @property
+    def position(self) -> int:
+        # Used to report progress, from 0 to len(self)
+        return self.scanned
+
+    def _read_header(self, encoding: Optional[str]) -> None:
+        buffer = self.buffer
+        header = self.HEADER.unpack_from(buffer, 0)
+        self.num_records, self.header_length, self.record_length = \
+            header[4:7]
+        if encoding is None:
+            from dbfread.codepages import guess_encoding
+            try:
+                encoding = guess_encoding(header[14])
+            except LookupError:
+                encoding = 'ascii'
+        self.encoding = encoding
+        self.field_names = []
+        self.field_types = []
+        lengths = []
+        offset = self.HEADER.size
+        while buffer[offset:offset + 1] not in (b'\r', b'\n', b''):
+            name, type_, _, length, decimals, *_ = \
+                self.FIELD.unpack_from(buffer, offset)
+            type_ = type_.decode('ascii')
+            if type_ == 'C':  # the high byte of long character fields
+                length |= decimals << 8
+            self.field_names.append(
+                name.split(b'\0')[0].decode(encoding))
+            self.field_types.append(type_)
+            lengths.append(length)
+            offset += self.FIELD.size
+        converters = [self._converter(t) for t in self.field_types]
+        wrong_length = any(t == 'L' and n != 1
+                           for t, n in zip(self.field_types, lengths))
+        if None in converters or wrong_length:
+            raise UnsupportedDBF(f'field types: {self.field_types}')
+        self.field_lengths = lengths
+        # Position of each field in a record (after the deletion flag)
+        self.field_slices = []
+        start = 1
+        for n in lengths:
+            self.field_slices.append((start, start + n))
+            start += n
+        self.row_test = None  # (buffer, offset) -> whether to read it
+        self.all_converters = converters
+        self.select_fields(range(len(lengths)))
+
+    def select_fields(self, indices: Iterable[int]) -> None:
+        '''Reads only these fields (by position); the others are skipped.'''
+        indices = set(indices)
+        # The deletion flag comes before the fields
+        self.record = struct.Struct('<1x' + ''.join(
+            f'{n}s' if i in indices else f'{n}x'
+            for i, n in enumerate(self.field_lengths)))
+        self.converters = [c for i, c in enumerate(self.all_converters)
+                           if i in indices]
+        self.only_text = all(t == 'C' for i, t in enumerate(self.field_types)
+                             if i in indices)
+
+    def start_at(self, index: int) -> None:
+        '''Starts reading at this record, skipping the previous ones.'''
+        self.first = index
+
+    def _converter(self, field_type: str) -> Optional[Callable]:
+        encoding = self.encoding
+        if field_type == 'C':
+            return lambda data: data.rstrip(b'\0 ').decode(encoding)
+        return {
+            'D': self.parse_date,
+            'F': self.parse_float,
+            'L': self.parse_logical,
+            'N': self.parse_numeric
+        }.get(field_type)
+
+    def __iter__(self) -> Iterator[List]:
+        self.scanned = self.first
+        start = self.header_length + self.first * self.record_length
+        yield from self._records(self.buffer, start)
+
+    def _records(self, buffer: bytes, start: int) -> Iterator[List]:
+        # The whole records in buffer[start:]; self.finished becomes True
+        # at the end-of-file marker
+        self.finished = False
+        length = self.record_length
+        unpack = self.record.unpack_from
+        encoding = self.encoding
+        converters = self.converters
+        only_text = self.only_text
+        row_test = self.row_test
+        for offset in range(start, len(buffer) - length + 1, length):
+            flag = buffer[offset]
+            if flag == 0x1a:  # end of file
+                self.finished = True
+                return
+            self.scanned += 1
+            if flag != 0x20:  # deleted (*)
+                continue
+            if row_test is not None and not row_test(buffer, offset):
+                self.skipped += 1
+                continue
+            values = unpack(buffer, offset)
+            if only_text:
+                yield [v.rstrip(b'\0 ').decode(encoding) for v in values]
+            else:
+                yield [c(v) for c, v in zip(converters, values)]
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def _offset(self, index: int) -> int:
+        if not 0 <= index < self.num_records:
+            raise IndexError(index)
+        offset = self.header_length + index * self.record_length
+        if offset + self.record_length > len(self.buffer):
+            raise IndexError(index)
+        return offset
+
+    def is_deleted(self, index: int) -> bool:
+        return self.buffer[self._offset(index)] != 0x20
+
+    def get_record(self, index: int) -> Optional[List]:
+        # Random access by record number (None if deleted)
+        offset = self._offset(index)
+        if self.buffer[offset] != 0x20:
+            return None
+        values = self.record.unpack_from(self.buffer, offset)
+        return [c(v) for c, v in zip(self.converters, values)]
+
+    def close(self) -> None:
+        self.buffer.close()
+        self.fd.close()
+
+    @classmethod
+    def parse_date(cls, data: bytes) -> Optional[datetime.date]:
+        try:
+            return datetime.date(
+                int(data[:4]), int(data[4:6]), int(data[6:8]))
+        except ValueError:
+            if data.strip(b' 0') == b'':
+                return None
+            raise ValueError(f'invalid date {data!r}')
+
+    @classmethod
+    def parse_float(cls, data: bytes) -> Optional[float]:
+        data = data.strip().strip(b'*')
+        return float(data) if data else None
+
+    @classmethod
+    def parse_logical(cls, data: bytes) -> Optional[bool]:
+        if data in b'TtYy':
+            return True
+        if data in b'FfNn':
+            return False
+        if data in b'? ':
+            return None
+        raise ValueError(f'Illegal value for logical field: {data!r}')
+
+    @classmethod
+    def parse_numeric(cls, data: bytes) -> Optional[Union[int, float]]:
+        data = data.strip().strip(b'*')
+        try:
+            return int(data)
+        except ValueError:
+            if not data.strip():
+                return None
+            return float(data.replace(b',', b'.'))
+
+
+class DBFStreamReader(DBFReader):
+    '''Reads the records of a DBF file sequentially from a binary stream.
+
+    This is used for compressed files, which cannot be memory-mapped. The
+    stream must have a ``position`` (e.g. in compressed bytes), which is
+    the position reported here; random access is not possible.
+    '''
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, fd: BinaryIO, encoding: Optional[str] = None):
+        self.file_name = getattr(fd, 'file_name', '')
+        self.fd = fd
+        try:
+            head = fd.read(32)
+            header_length = int.from_bytes(head[8:10], 'little')
+            if len(head) < 32 or header_length < 32:
+                raise ValueError(f'invalid DBF header: {head!r}')
+            rest = fd.read(header_length - len(head))
+            if len(rest) < header_length - len(head):
+                raise ValueError('truncated DBF header')
+            self.buffer = bytearray(head + rest)
+            self._end_header()
+            self._read_header(encoding)
+        except BaseException:
+            fd.close()
+            raise
+        self.scanned = 0
+        self.skipped = 0
+        self.first = 0
+
+    def _end_header(self) -> None:
+        pass
+
+    @property
+    def position(self) -> int:
+        return self.fd.position
+
+    def _chunks(self) -> Iterator[bytes]:
+        read = self.fd.read
+        size = self.CHUNK_SIZE
+        while True:
+            chunk = read(size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self) -> Iterator[List]:
+        # Only one pass is possible; records before self.first are
+        # decompressed but not parsed
+        self.scanned = self.first
+        pending = b''
+        skip = self.first * self.record_length
+        for chunk in self._chunks():
+            data = pending + chunk
+            if skip:
+                data, skip = data[skip:], max(0, skip - len(data))
+            yield from self._records(data, 0)
+            if self.finished:
+                return
+            pending = data[len(data) - len(data) % self.record_length:]
+
+    def is_deleted(self, index: int) -> bool:
+        raise io.UnsupportedOperation(
+            f'{self.file_name}: a DBF stream can only be read sequentially')
+
+    def get_record(self, index: int) -> Optional[List]:
+        raise io.UnsupportedOperation(
+            f'{self.file_name}: a DBF stream can only be read sequentially')
+
+    def close(self) -> None:
+        self.fd.close()
+
+
+class DBCReader(DBFStreamReader):
+    '''Reads a DATASUS .dbc file, decompressing it while it is read.
+
+    A .dbc file has the header of a DBF file, four bytes (a checksum) and
+    the records compressed by PKWare's DCL implode. Random access is not
+    possible, and the position is the number of compressed bytes read.
+    '''
+
+    def __init__(self, file_name: str, encoding: Optional[str] = None):
+        super().__init__(open(file_name, 'rb'), encoding)
+        self.file_name = file_name
+
+    def _end_header(self) -> None:
+        self.buffer[-1] = 0x0d  # end of the field descriptors
+        if len(self.fd.read(4)) < 4:  # checksum
+            raise ValueError('truncated .dbc header')
+
+    @property
+    def position(self) -> int:
+        return self.fd.tell()
+
+    def _chunks(self) -> Iterator[bytes]:
+        return Blast.decompress(self.fd.read)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import csv
+import hashlib
+import locale
+import os
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from augmented_sim.i18n import get_translator, get_tr
+from augmented_sim.table_reader import TableReadingError
+
+
+# Stands for a hash of the whole row when used as the key
+ROW_HASH = '*'
+
+
+def value_text(value: object) -> str:
+    # Text of a value in a CSV file written by TableWriter
+    return '' if value is None else str(value)
+
+
+def row_hash(values: Sequence) -> bytes:
+    text = '\x1f'.join(map(value_text, values))
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'),
+                           digest_size=16).digest()
+
+
+class DeltaIndex:
+    '''Index of the rows of a CSV file saved by a previous run.
+
+    For each row, it has the key (a column, usually NUMERODO, or the hash
+    of the row), the hash of the values of the hashed columns and the
+    position of the row in the file, so that unchanged rows can be copied.
+    The index is an SQLite database saved in index_file_name (next to the
+    new output, "<output>.idx", so that the previous file may be
+    read-only), so it is not loaded into memory; it is rebuilt when the
+    file changes.
+    '''
+
+    SUFFIX = '.idx'
+    VERSION = 1
+    BATCH_SIZE = 500  # keys looked up at once
+
+    def __init__(self, file_name: str, index_file_name: str,
+                 columns: List[str], key: str, hashed: List[str]):
+        self.file_name = file_name
+        self.index_file_name = index_file_name
+        self.columns = columns
+        self.key = key
+        self.hashed = hashed
+        self.encoding = locale.getpreferredencoding(False)
+        self.fd = None
+        self.db = None
+        try:
+            self.fd = open(file_name, 'rb')
+            self._check_header()
+            import sqlite3
+            self.db = sqlite3.connect(index_file_name)
+            if not self._up_to_date():
+                self._build()
+            self.db.execute('CREATE TEMP TABLE seen (key TEXT PRIMARY KEY)')
+        except Exception as e:
+            self.close()
+            tr = get_tr(type(self).__name__, get_translator(None))
+            msg = tr('invalid-previous').format(file_name)
+            raise TableReadingError(msg, file_name, e)
+
+    def _check_header(self) -> None:
+        header = next(csv.reader([self.fd.readline().decode(self.encoding)]),
+                      [])
+        if header != self.columns:
+            raise ValueError(f'columns of {self.file_name} are not '
+                             f'{self.columns}')
+
+    def _signature(self) -> str:
+        st = os.stat(self.file_name)
+        return repr((self.VERSION, st.st_size, st.st_mtime_ns, self.key,
+                     self.hashed))
+
+    def _up_to_date(self) -> bool:
+        import sqlite3
+        try:
+            row = self.db.execute('SELECT signature FROM meta').fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None and row[0] == self._signature()
+
+    def _build(self) -> None:
+        db = self.db
+        db.executescript('''
+            DROP TABLE IF EXISTS meta;
+            DROP TABLE IF EXISTS rows;
+            CREATE TABLE meta (signature TEXT);
+            CREATE TABLE rows (key TEXT, hash BLOB, offset INTEGER,
+                               length INTEGER);
+        ''')
+        positions = [self.columns.index(c) for c in self.hashed]
+        key = None if self.key == ROW_HASH else self.columns.index(self.key)
+
+        def entries() -> Iterator[Tuple[str, bytes, int, int]]:
+            for offset, line in self._records():
+                values = next(csv.reader([line.decode(self.encoding)]))
+                h = row_hash([values[i] for i in positions])
+                k = h.hex() if key is None else values[key]
+                yield k, h, offset, len(line)
+
+        db.executemany('INSERT INTO rows VALUES (?, ?, ?, ?)', entries())
+        db.execute('CREATE INDEX rows_key ON rows (key)')
+        db.execute('INSERT INTO meta VALUES (?)', (self._signature(),))
+        db.commit()
+
+    def _records(self) -> Iterator[Tuple[int, bytes]]:
+        # Offset and bytes of each record after the header; a record
+        # spans several lines if a quoted value has line breaks
+        fd = self.fd
+        fd.seek(0)
+        fd.readline()
+        offset = fd.tell()
+        record = b''
+        for line in fd:
+            record += line
+            if record.count(b'"') % 2 == 0:
+                if record.strip():
+                    yield offset, record
+                offset += len(record)
+                record = b''
+
+    def lookup(self, keys: List[str]) \
+            -> Dict[str, Dict[bytes, Tuple[int, int]]]:
+        '''Offset and length of the rows with these keys, by their hash.
+
+        The keys are remembered, so that removed() can list the others.
+        '''
+        found = {}
+        db = self.db
+        for i in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[i:i + self.BATCH_SIZE]
+            marks = ','.join('?' * len(batch))
+            for k, h, offset, length in db.execute(
+                    f'SELECT key, hash, offset, length FROM rows '
+                    f'WHERE key IN ({marks})', batch):
+                found.setdefault(k, {})[h] = (offset, length)
+            db.executemany('INSERT OR IGNORE INTO seen VALUES (?)',
+                           ((k,) for k in batch))
+        return found
+
+    def line(self, offset: int, length: int) -> str:
+        self.fd.seek(offset)
+        return self.fd.read(length).decode(self.encoding)
+
+    def removed(self) -> Iterator[str]:
+        # Keys of the previous file that were not looked up
+        yield from (k for k, in self.db.execute(
+            'SELECT DISTINCT key FROM rows '
+            'WHERE key NOT IN (SELECT key FROM seen) ORDER BY rowid'))
+
+    def close(self) -> None:
+        if self.fd is not None:
+            self.fd.close()
+        if self.db is not None:
+            self.db.close()
+
+
+class DeltaManifest:
+    '''Lists the keys of the rows that are new, changed or removed.
+
+    It is saved as "<output>.changes.csv"; index_file_name is the
+    DeltaIndex of the previous output, which is kept to be reused.
+    '''
+
+    SUFFIX = '.changes.csv'
+    COLUMN = 'ALTERACAO'
+    HASH_COLUMN = 'HASH'  # when the key is ROW_HASH
+    ADDED, CHANGED, REMOVED = 'novo', 'alterado', 'removido'
+
+    def __init__(self, file_name: str, key: str, index_file_name: str):
+        self.file_name = file_name
+        self.index_file_name = index_file_name
+        self.fd = open(file_name, 'w', newline='')
+        self.writer = csv.writer(self.fd, quoting=csv.QUOTE_NONNUMERIC)
+        self.writer.writerow([
+            self.HASH_COLUMN if key == ROW_HASH else key, self.COLUMN])
+        self.counts = {self.ADDED: 0, self.CHANGED: 0, self.REMOVED: 0}
+        self.unchanged = 0
+
+    def add(self, key: str, change: Optional[str]) -> None:
+        if change is None:
+            self.unchanged += 1
+        else:
+            self.counts[change] += 1
+            self.writer.writerow([key, change])
+
+    def close(self) -> None:
+        self.fd.close()
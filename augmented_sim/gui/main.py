@@ -17,7 +17,7 @@ class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         if not MainWindow.objectName():
             MainWindow.setObjectName(u"MainWindow")
-        MainWindow.resize(890, 367)
+        MainWindow.resize(890, 467)
         sizePolicy = QSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -63,6 +63,18 @@ class Ui_MainWindow(object):
 
         self.horizontalLayout.addWidget(self.cbox_language)
 
+        self.label_workers = QLabel(self.widget)
+        self.label_workers.setObjectName(u"label_workers")
+        self.label_workers.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
+
+        self.horizontalLayout.addWidget(self.label_workers)
+
+        self.spin_workers = QSpinBox(self.widget)
+        self.spin_workers.setObjectName(u"spin_workers")
+        self.spin_workers.setMinimum(1)
+
+        self.horizontalLayout.addWidget(self.spin_workers)
+
         self.horizontalSpacer = QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum)
 
         self.horizontalLayout.addItem(self.horizontalSpacer)
@@ -81,7 +93,7 @@ class Ui_MainWindow(object):
         self.horizontalLayout.addWidget(self.btn_close)
 
 
-        self.gridLayout.addWidget(self.widget, 11, 0, 1, 5)
+        self.gridLayout.addWidget(self.widget, 12, 0, 1, 5)
 
         self.label_file1 = QLabel(self.centralwidget)
         self.label_file1.setObjectName(u"label_file1")
@@ -112,7 +124,7 @@ class Ui_MainWindow(object):
         self.pbar_current.setObjectName(u"pbar_current")
         self.pbar_current.setValue(0)
 
-        self.gridLayout.addWidget(self.pbar_current, 7, 2, 1, 3)
+        self.gridLayout.addWidget(self.pbar_current, 8, 2, 1, 3)
 
         self.label_input_pattern = QLabel(self.centralwidget)
         self.label_input_pattern.setObjectName(u"label_input_pattern")
@@ -132,13 +144,13 @@ class Ui_MainWindow(object):
         self.label_msg.setFont(font)
         self.label_msg.setAlignment(Qt.AlignCenter)
 
-        self.gridLayout.addWidget(self.label_msg, 4, 0, 1, 5)
+        self.gridLayout.addWidget(self.label_msg, 5, 0, 1, 5)
 
         self.pbar_overall = QProgressBar(self.centralwidget)
         self.pbar_overall.setObjectName(u"pbar_overall")
         self.pbar_overall.setValue(0)
 
-        self.gridLayout.addWidget(self.pbar_overall, 5, 2, 1, 3)
+        self.gridLayout.addWidget(self.pbar_overall, 6, 2, 1, 3)
 
         self.list_infile1 = QListWidget(self.centralwidget)
         self.list_infile1.setObjectName(u"list_infile1")
@@ -155,13 +167,13 @@ class Ui_MainWindow(object):
         self.label_current_file.setObjectName(u"label_current_file")
         self.label_current_file.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
 
-        self.gridLayout.addWidget(self.label_current_file, 10, 2, 1, 3)
+        self.gridLayout.addWidget(self.label_current_file, 11, 2, 1, 3)
 
         self.label_current_progress = QLabel(self.centralwidget)
         self.label_current_progress.setObjectName(u"label_current_progress")
         self.label_current_progress.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
 
-        self.gridLayout.addWidget(self.label_current_progress, 7, 0, 1, 1)
+        self.gridLayout.addWidget(self.label_current_progress, 8, 0, 1, 1)
 
         self.btn_outfile1 = QPushButton(self.centralwidget)
         self.btn_outfile1.setObjectName(u"btn_outfile1")
@@ -183,20 +195,35 @@ class Ui_MainWindow(object):
         self.label_overall_progress.setObjectName(u"label_overall_progress")
         self.label_overall_progress.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
 
-        self.gridLayout.addWidget(self.label_overall_progress, 5, 0, 1, 1)
+        self.gridLayout.addWidget(self.label_overall_progress, 6, 0, 1, 1)
 
         self.btn_execute = QPushButton(self.centralwidget)
         self.btn_execute.setObjectName(u"btn_execute")
         self.btn_execute.setFont(font)
 
-        self.gridLayout.addWidget(self.btn_execute, 3, 2, 1, 3)
+        self.gridLayout.addWidget(self.btn_execute, 4, 2, 1, 3)
 
         self.cbox_input_pattern = QComboBox(self.centralwidget)
         self.cbox_input_pattern.setObjectName(u"cbox_input_pattern")
 
         self.gridLayout.addWidget(self.cbox_input_pattern, 1, 2, 1, 3)
 
+        self.label_columns = QLabel(self.centralwidget)
+        self.label_columns.setObjectName(u"label_columns")
+        self.label_columns.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignTop)
+
+        self.gridLayout.addWidget(self.label_columns, 3, 0, 1, 1)
+
+        self.list_columns = QListWidget(self.centralwidget)
+        self.list_columns.setObjectName(u"list_columns")
+        self.list_columns.setFlow(QListView.LeftToRight)
+        self.list_columns.setProperty("isWrapping", True)
+        self.list_columns.setResizeMode(QListView.Adjust)
+
+        self.gridLayout.addWidget(self.list_columns, 3, 2, 1, 3)
+
         self.gridLayout.setRowStretch(0, 4)
+        self.gridLayout.setRowStretch(3, 2)
         self.gridLayout.setColumnStretch(0, 1)
         self.gridLayout.setColumnStretch(2, 3)
         MainWindow.setCentralWidget(self.centralwidget)
@@ -213,6 +240,7 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         self.label_outfile1.setText(QCoreApplication.translate("MainWindow", u"output-file", None))
         self.btn_about.setText(QCoreApplication.translate("MainWindow", u"about", None))
+        self.label_workers.setText(QCoreApplication.translate("MainWindow", u"workers", None))
         self.btn_close.setText(QCoreApplication.translate("MainWindow", u"exit", None))
         self.label_file1.setText(QCoreApplication.translate("MainWindow", u"input-files", None))
         self.btn_file1.setText(QCoreApplication.translate("MainWindow", u"add", None))
@@ -223,6 +251,7 @@ class Ui_MainWindow(object):
         self.btn_outfile1.setText(QCoreApplication.translate("MainWindow", u"choose", None))
         self.label_overall_progress.setText(QCoreApplication.translate("MainWindow", u"overall-progress", None))
         self.btn_execute.setText(QCoreApplication.translate("MainWindow", u"generate", None))
+        self.label_columns.setText(QCoreApplication.translate("MainWindow", u"columns", None))
         pass
     # retranslateUi
 
@@ -1,7 +1,11 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple, Union, \
+    TYPE_CHECKING
 
-from PySide2.QtCore import QObject, QTranslator, QLocale
+# Qt is only imported by the GUI
+if TYPE_CHECKING:
+    from PySide2.QtCore import QObject, QTranslator
 
 
 AVAILABLE_LANGUAGES = [
@@ -11,19 +15,78 @@ AVAILABLE_LANGUAGES = [
 
 CHOSEN_LANGUAGE = 'pt'
 
+FILE_PREFIX = 'augmentedsim'
 
-def get_translator(obj: Optional[QObject], locale: Optional[str] = None) \
-        -> QTranslator:
+
+class Catalog:
+    '''Messages read from a Qt Linguist (.ts) file, without Qt.
+
+    It translates like a QTranslator, so that only the GUI needs Qt.
+    '''
+
+    def __init__(self, messages: Dict[Tuple[str, str], str]):
+        self.messages = messages  # (context, source) -> translation
+
+    @classmethod
+    def load(cls, file_name: str) -> 'Catalog':
+        from xml.etree import ElementTree
+        messages = {}
+        for context in ElementTree.parse(file_name).iter('context'):
+            name = context.findtext('name', '')
+            for message in context.iter('message'):
+                translation = message.find('translation')
+                if translation is None or translation.get('type') in (
+                        'obsolete', 'vanished'):
+                    continue
+                source = message.findtext('source', '')
+                messages[(name, source)] = translation.text or ''
+        return cls(messages)
+
+    def translate(self, context: str, key: str,
+                  disambiguation: Optional[str] = None, n: int = -1) -> str:
+        return self.messages.get((context, key), '')
+
+
+def _file_names(locale: str) -> List[Path]:
+    # As QTranslator.load tries them: "pt_BR", then "pt"
+    directory = Path(__file__).parent.resolve()
+    names = [locale.replace('-', '_')]
+    while '_' in names[-1]:
+        names.append(names[-1].rsplit('_', 1)[0])
+    return [directory / f'{FILE_PREFIX}.{name}.ts' for name in names]
+
+
+@lru_cache(maxsize=None)
+def _load_catalog(locale: str) -> Catalog:
+    for file_name in _file_names(locale):
+        if file_name.exists():
+            return Catalog.load(str(file_name))
+    return Catalog({})
+
+
+def get_translator(obj: Optional['QObject'] = None,
+                   locale: Optional[str] = None) -> Catalog:
+    # obj is only used by get_qt_translator; it is kept here so that both
+    # are called in the same way
+    if not locale:
+        locale = CHOSEN_LANGUAGE
+    return _load_catalog(locale)
+
+
+def get_qt_translator(obj: Optional['QObject'] = None,
+                      locale: Optional[str] = None) -> 'QTranslator':
+    # A QTranslator, which the GUI installs for its forms
+    from PySide2.QtCore import QTranslator, QLocale
     if not locale:
         locale = CHOSEN_LANGUAGE
-    here = Path(__file__).parent.parent.resolve()
     translator = QTranslator(obj)
-    fn, d = 'augmentedsim', str(here / 'i18n')
-    translator.load(QLocale(locale), fn, prefix='.', directory=d)
+    d = str(Path(__file__).parent.resolve())
+    translator.load(QLocale(locale), FILE_PREFIX, prefix='.', directory=d)
     return translator
 
 
-def get_tr(context: str, translator: QTranslator) -> Callable:
+def get_tr(context: str,
+           translator: Union[Catalog, 'QTranslator']) -> Callable:
 
     def tr(key: str, *args, **kwargs) -> str:
         return translator.translate(context, key, *args, **kwargs)
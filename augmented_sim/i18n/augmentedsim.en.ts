@@ -23,6 +23,14 @@
         <translation>Framework/library licences</translation>
     </message>
 </context>
+<context>
+    <name>Aggregator</name>
+    <message>
+        <location filename="../aggregator.py" line="94"/>
+        <source>invalid-aggregate</source>
+        <translation>“{0}” is not a file of counts with the columns {1}.</translation>
+    </message>
+</context>
 <context>
     <name>AugmentedSIM</name>
     <message>
@@ -30,6 +38,91 @@
         <source>file-saved</source>
         <translation>The file has been saved (elapsed time: {0}).</translation>
     </message>
+    <message>
+        <location filename="../core.py" line="219"/>
+        <source>detected-encoding</source>
+        <translation>Encoding of “{0}”: {1} (it can be set with --encoding).</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="262"/>
+        <source>cache-hit-rate</source>
+        <translation>Cache of {0}: {1}% hits in {2} rows.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="360"/>
+        <source>unavailable-columns</source>
+        <translation>These columns are not available in the input files: {0}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="327"/>
+        <source>skipped-rows</source>
+        <translation>{0} rows did not pass the filters and were skipped.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="379"/>
+        <source>aggregate-saved</source>
+        <translation>{0} counts saved in “{1}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="491"/>
+        <source>delta-summary</source>
+        <translation>{0} new, {1} changed and {2} removed rows, listed in “{4}”; {3} rows were copied from the previous output, indexed in “{5}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="601"/>
+        <source>delta-unsupported</source>
+        <translation>Only CSV output (without counts) can be compared with a previous output, which must be another uncompressed CSV file.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="613"/>
+        <source>delta-missing-columns</source>
+        <translation>To compare with a previous output, these columns must be saved: {0}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="515"/>
+        <source>resumed</source>
+        <translation>Resumed after {0} records of “{1}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="618"/>
+        <source>resume-unsupported</source>
+        <translation>Only an uncompressed CSV output with rows (without counts or comparison with a previous output) can be resumed.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="691"/>
+        <source>stage-times</source>
+        <translation>Time spent in each stage:</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="689"/>
+        <source>stage-times-workers</source>
+        <translation>Time spent in each stage (added up over the worker processes):</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="694"/>
+        <source>stage-time</source>
+        <translation>    {0}: {1}s ({2}s of CPU), {3} rows, {4} rows/s</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="720"/>
+        <source>metrics-saved</source>
+        <translation>Metrics saved in “{0}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="717"/>
+        <source>metrics-not-saved</source>
+        <translation>The metrics could not be saved in “{0}”: {1}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="595"/>
+        <source>profile-saved</source>
+        <translation>Profile saved in “{0}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="595"/>
+        <source>memory-trace-saved</source>
+        <translation>Memory trace saved in “{0}”.</translation>
+    </message>
 </context>
 <context>
     <name>AugmentedSIMGUI</name>
@@ -83,6 +176,37 @@
         <source>blank-pattern</source>
         <translation>The input pattern cannot be blank.</translation>
     </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="294"/>
+        <source>executing-rate</source>
+        <translation>Performing operation ({0} rows/s, {1} remaining)...</translation>
+    </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="209"/>
+        <source>original-columns</source>
+        <translation>All columns of the input files</translation>
+    </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="282"/>
+        <source>no-columns</source>
+        <translation>Choose at least one column.</translation>
+    </message>
+</context>
+<context>
+    <name>Checkpoint</name>
+    <message>
+        <location filename="../checkpoint.py" line="78"/>
+        <source>invalid-checkpoint</source>
+        <translation>“{0}” does not match this run or its output file; run again without resuming.</translation>
+    </message>
+</context>
+<context>
+    <name>DeltaIndex</name>
+    <message>
+        <location filename="../delta.py" line="64"/>
+        <source>invalid-previous</source>
+        <translation>“{0}” is not a CSV file saved by a previous run with the same columns.</translation>
+    </message>
 </context>
 <context>
     <name>MainWindow</name>
@@ -141,6 +265,16 @@
         <source>input-pattern</source>
         <translation>Input pattern</translation>
     </message>
+    <message>
+        <location filename="../gui/main.ui" line="66"/>
+        <source>workers</source>
+        <translation>Processes</translation>
+    </message>
+    <message>
+        <location filename="../gui/main.ui" line="259"/>
+        <source>columns</source>
+        <translation>Columns</translation>
+    </message>
 </context>
 <context>
     <name>TableReader</name>
@@ -167,6 +301,11 @@
         <source>unsupported-file</source>
         <translation>The format of the following file is not supported: “{0}”.</translation>
     </message>
+    <message>
+        <location filename="../table_writer.py" line="100"/>
+        <source>missing-package</source>
+        <translation>Saving {0} files requires the “{1}” package.</translation>
+    </message>
 </context>
 <context>
     <name>TableWritingError</name>
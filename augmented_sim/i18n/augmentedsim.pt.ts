@@ -23,6 +23,14 @@
         <translation>Licenças de frameworks e bibliotecas</translation>
     </message>
 </context>
+<context>
+    <name>Aggregator</name>
+    <message>
+        <location filename="../aggregator.py" line="94"/>
+        <source>invalid-aggregate</source>
+        <translation>“{0}” não é um arquivo de contagens com as colunas {1}.</translation>
+    </message>
+</context>
 <context>
     <name>AugmentedSIM</name>
     <message>
@@ -30,6 +38,91 @@
         <source>file-saved</source>
         <translation>O arquivo foi salvo (tempo decorrido: {0}).</translation>
     </message>
+    <message>
+        <location filename="../core.py" line="219"/>
+        <source>detected-encoding</source>
+        <translation>Codificação de “{0}”: {1} (pode ser definida com --encoding).</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="262"/>
+        <source>cache-hit-rate</source>
+        <translation>Cache de {0}: {1}% de acertos em {2} linhas.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="360"/>
+        <source>unavailable-columns</source>
+        <translation>Estas colunas não estão disponíveis nos arquivos de entrada: {0}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="327"/>
+        <source>skipped-rows</source>
+        <translation>{0} linhas não passaram pelos filtros e foram ignoradas.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="379"/>
+        <source>aggregate-saved</source>
+        <translation>{0} contagens salvas em “{1}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="491"/>
+        <source>delta-summary</source>
+        <translation>{0} linhas novas, {1} alteradas e {2} removidas, listadas em “{4}”; {3} linhas foram copiadas da saída anterior, indexada em “{5}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="601"/>
+        <source>delta-unsupported</source>
+        <translation>Somente saídas CSV (sem contagens) podem ser comparadas com uma saída anterior, que deve ser outro arquivo CSV não comprimido.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="613"/>
+        <source>delta-missing-columns</source>
+        <translation>Para comparar com uma saída anterior, estas colunas devem ser salvas: {0}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="515"/>
+        <source>resumed</source>
+        <translation>Retomado após {0} registros de “{1}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="618"/>
+        <source>resume-unsupported</source>
+        <translation>Somente uma saída CSV não comprimida com linhas (sem contagens ou comparação com uma saída anterior) pode ser retomada.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="691"/>
+        <source>stage-times</source>
+        <translation>Tempo gasto em cada etapa:</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="689"/>
+        <source>stage-times-workers</source>
+        <translation>Tempo gasto em cada etapa (somado entre os processos de trabalho):</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="694"/>
+        <source>stage-time</source>
+        <translation>    {0}: {1}s ({2}s de CPU), {3} linhas, {4} linhas/s</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="720"/>
+        <source>metrics-saved</source>
+        <translation>Métricas salvas em “{0}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="717"/>
+        <source>metrics-not-saved</source>
+        <translation>Não foi possível salvar as métricas em “{0}”: {1}.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="595"/>
+        <source>profile-saved</source>
+        <translation>Perfil salvo em “{0}”.</translation>
+    </message>
+    <message>
+        <location filename="../core.py" line="595"/>
+        <source>memory-trace-saved</source>
+        <translation>Rastreamento de memória salvo em “{0}”.</translation>
+    </message>
 </context>
 <context>
     <name>AugmentedSIMGUI</name>
@@ -83,6 +176,37 @@
         <source>blank-pattern</source>
         <translation>O padrão de entrada não pode estar em branco.</translation>
     </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="294"/>
+        <source>executing-rate</source>
+        <translation>Executando operação ({0} linhas/s, faltam {1})...</translation>
+    </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="209"/>
+        <source>original-columns</source>
+        <translation>Todas as colunas dos arquivos de entrada</translation>
+    </message>
+    <message>
+        <location filename="../augmented_sim_gui.py" line="282"/>
+        <source>no-columns</source>
+        <translation>Escolha pelo menos uma coluna.</translation>
+    </message>
+</context>
+<context>
+    <name>Checkpoint</name>
+    <message>
+        <location filename="../checkpoint.py" line="78"/>
+        <source>invalid-checkpoint</source>
+        <translation>“{0}” não corresponde a esta execução ou ao seu arquivo de saída; execute novamente sem retomar.</translation>
+    </message>
+</context>
+<context>
+    <name>DeltaIndex</name>
+    <message>
+        <location filename="../delta.py" line="64"/>
+        <source>invalid-previous</source>
+        <translation>“{0}” não é um arquivo CSV salvo por uma execução anterior com as mesmas colunas.</translation>
+    </message>
 </context>
 <context>
     <name>MainWindow</name>
@@ -141,6 +265,16 @@
         <source>input-pattern</source>
         <translation>Padrão de entrada</translation>
     </message>
+    <message>
+        <location filename="../gui/main.ui" line="66"/>
+        <source>workers</source>
+        <translation>Processos</translation>
+    </message>
+    <message>
+        <location filename="../gui/main.ui" line="259"/>
+        <source>columns</source>
+        <translation>Colunas</translation>
+    </message>
 </context>
 <context>
     <name>TableReader</name>
@@ -167,6 +301,11 @@
         <source>unsupported-file</source>
         <translation>O formato do seguinte arquivo não é suportado: “{0}”.</translation>
     </message>
+    <message>
+        <location filename="../table_writer.py" line="100"/>
+        <source>missing-package</source>
+        <translation>Salvar arquivos {0} requer o pacote “{1}”.</translation>
+    </message>
 </context>
 <context>
     <name>TableWritingError</name>
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import json
+import os
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# CPU time of the current thread (of the process before Python 3.7)
+cpu_time = getattr(time, 'thread_time', time.process_time)
+
+
+class StageMetrics:
+    '''Wall and CPU time and rows of each stage of a run.
+
+    Stages are timed once per chunk of rows, so measuring them costs
+    nothing noticeable. A measure starts at clock() and each add() ends a
+    stage and starts the next one:
+
+        t = metrics.clock()
+        rows = read()
+        t = metrics.add('read', t, len(rows))
+        write(rows)
+        t = metrics.add('write', t, len(rows))
+
+    Metrics of worker processes are sent back with as_dict() and added up
+    with merge(), so the times of a stage run by the workers are the sum of
+    their times.
+    '''
+
+    PROMETHEUS_PREFIX = 'augmented_sim'
+
+    def __init__(self):
+        # Stage -> [wall seconds, CPU seconds, rows, calls]
+        self.stages = {}
+
+    @classmethod
+    def clock(cls) -> Tuple[float, float]:
+        return time.perf_counter(), cpu_time()
+
+    def add(self, stage: str, since: Tuple[float, float],
+            rows: int = 0) -> Tuple[float, float]:
+        now = self.clock()
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = [0.0, 0.0, 0, 0]
+        totals[0] += now[0] - since[0]
+        totals[1] += now[1] - since[1]
+        totals[2] += rows
+        totals[3] += 1
+        return now
+
+    def merge(self, stages: Dict[str, List]) -> None:
+        for stage, values in stages.items():
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = [0.0, 0.0, 0, 0]
+            for i, value in enumerate(values):
+                totals[i] += value
+
+    def as_dict(self) -> Dict[str, List]:
+        return {stage: list(values) for stage, values in self.stages.items()}
+
+    def summary(self) -> List[Tuple[str, float, float, int,
+                                    Optional[float]]]:
+        '''(stage, wall seconds, CPU seconds, rows, rows per second), from
+        the slowest stage to the fastest one.'''
+        return [
+            (stage, wall, cpu, rows, rows / wall if wall > 0 else None)
+            for stage, (wall, cpu, rows, _) in sorted(
+                self.stages.items(), key=lambda item: -item[1][0])
+        ]
+
+    def to_json(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **run,
+            'stages': {
+                stage: {
+                    'wall_seconds': round(wall, 6),
+                    'cpu_seconds': round(cpu, 6),
+                    'rows': rows,
+                    'calls': calls
+                }
+                for stage, (wall, cpu, rows, calls) in self.stages.items()
+            }
+        }
+
+    def save_json(self, file_name: str, run: Dict[str, Any]) -> None:
+        '''Saves the metrics with information about the run.'''
+        data = self.to_json(run)
+        self._replace(file_name, json.dumps(data, indent=2, default=str))
+
+    def save_prometheus(self, file_name: str, run: Dict[str, Any]) -> None:
+        '''Saves the metrics in the text format of Prometheus.
+
+        The file can be read by the textfile collector of the node exporter
+        (the file name must end with ".prom"). Numbers in run (such as the
+        elapsed time) are saved as well.
+        '''
+        prefix = self.PROMETHEUS_PREFIX
+        lines = []
+        for key, value in run.items():
+            if isinstance(value, bool) or \
+                    not isinstance(value, (int, float)):
+                continue
+            name = f'{prefix}_{key}'
+            lines += [f'# TYPE {name} gauge', f'{name} {value}']
+        measures = [
+            ('stage_wall_seconds', 'Wall time of each stage of the last run',
+             0),
+            ('stage_cpu_seconds', 'CPU time of each stage of the last run',
+             1),
+            ('stage_rows', 'Rows handled by each stage of the last run', 2)
+        ]
+        for measure, description, i in measures:
+            name = f'{prefix}_{measure}'
+            lines += [f'# HELP {name} {description}.',
+                      f'# TYPE {name} gauge']
+            for stage, values in self.stages.items():
+                label = stage.replace('\\', '\\\\').replace('"', '\\"') \
+                    .replace('\n', '\\n')
+                lines.append(f'{name}{{stage="{label}"}} {values[i]}')
+        self._replace(file_name, '\n'.join(lines) + '\n')
+
+    @classmethod
+    def _replace(cls, file_name: str, text: str) -> None:
+        # Readers (such as the node exporter) never see half a file
+        temp_name = file_name + '.tmp'
+        with open(temp_name, 'w', encoding='utf-8') as fd:
+            fd.write(text)
+        os.replace(temp_name, file_name)
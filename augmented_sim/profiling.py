@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import os
+import threading
+
+from time import monotonic
+from typing import Dict, List, Tuple
+
+
+class Profiler:
+    '''Profiles the thread where it is entered, with cProfile.
+
+    The statistics are saved in "<prefix>.pstats" (to be read with pstats,
+    snakeviz etc.) and as collapsed stacks in "<prefix>.collapsed" (one
+    line per stack, with its time in microseconds, as read by
+    flamegraph.pl, speedscope etc.). Worker processes are not profiled.
+    '''
+
+    PSTATS_SUFFIX = '.pstats'
+    COLLAPSED_SUFFIX = '.collapsed'
+    MAX_DEPTH = 200  # frames of a collapsed stack
+
+    def __init__(self, prefix: str):
+        if prefix.endswith(self.PSTATS_SUFFIX):
+            prefix = prefix[:-len(self.PSTATS_SUFFIX)]
+        self.file_names = [prefix + self.PSTATS_SUFFIX,
+                           prefix + self.COLLAPSED_SUFFIX]
+        self.profile = None
+
+    def __enter__(self) -> 'Profiler':
+        import cProfile
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profile.disable()
+        self.save()
+
+    def save(self) -> None:
+        import pstats
+        pstats_file_name, collapsed_file_name = self.file_names
+        for file_name in self.file_names:
+            parent = os.path.dirname(file_name)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        stats = pstats.Stats(self.profile)
+        stats.dump_stats(pstats_file_name)
+        with open(collapsed_file_name, 'w', encoding='utf-8') as fd:
+            for stack, microseconds in self.collapsed_stacks(stats.stats):
+                fd.write(f'{stack} {microseconds}\n')
+
+    @classmethod
+    def frame_name(cls, function: Tuple[str, int, str]) -> str:
+        file_name, line, name = function
+        if file_name == '~':  # built-in
+            text = name
+        else:
+            text = f'{name} ({os.path.basename(file_name)}:{line})'
+        return text.replace(';', ',')
+
+    @classmethod
+    def collapsed_stacks(cls, stats: Dict) -> List[Tuple[str, int]]:
+        '''Call stacks rebuilt from the statistics of cProfile.
+
+        cProfile only keeps the time of each function per caller, so the
+        time of a function that is called from several stacks is split
+        among them in proportion to the time of each caller.
+        '''
+        # stats: function -> (calls, calls, own time, total time, callers)
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, _, total) in callers.items():
+                callees.setdefault(caller, []).append((function, total))
+        roots = [f for f, (_, _, _, _, callers) in stats.items()
+                 if not callers or all(c not in stats for c in callers)]
+        stacks = {}
+
+        def visit(function: Tuple, stack: List[str], path: List[Tuple],
+                  share: float) -> None:
+            _, _, own, total, _ = stats[function]
+            stack = stack + [cls.frame_name(function)]
+            key = ';'.join(stack)
+            stacks[key] = stacks.get(key, 0.0) + own * share
+            if len(stack) >= cls.MAX_DEPTH or total <= 0:
+                return
+            for callee, time in callees.get(function, []):
+                # Recursion and stacks shorter than a microsecond are cut
+                if callee not in path and time * share >= 1e-6:
+                    visit(callee, stack, path + [callee],
+                          share * time / total)
+
+        for root in roots:
+            visit(root, [], [root], 1.0)
+        return [(stack, round(seconds * 1e6))
+                for stack, seconds in stacks.items()
+                if round(seconds * 1e6) > 0]
+
+
+class MemoryTracer(threading.Thread):
+    '''Traces the memory allocated by Python, with tracemalloc.
+
+    While it is entered, a snapshot is taken every interval seconds (and at
+    the end) and the lines that hold the most memory are appended to a text
+    file, with how much it grew since the previous snapshot. Tracing makes
+    the program much slower. Worker processes are not traced.
+    '''
+
+    TOP = 15  # lines in each snapshot
+    FRAMES = 1  # frames kept for each allocation
+
+    def __init__(self, file_name: str, interval: float = 10.0):
+        super().__init__(daemon=True)
+        self.file_names = [file_name]
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.start_time = None
+        self.previous = None
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> 'MemoryTracer':
+        import tracemalloc
+        parent = os.path.dirname(self.file_names[0])
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(self.file_names[0], 'w', encoding='utf-8'):
+            pass
+        tracemalloc.start(self.FRAMES)
+        self.start_time = monotonic()
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        import tracemalloc
+        self.stopped.set()
+        self.join()
+        self.snapshot()
+        tracemalloc.stop()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        import linecache
+        import tracemalloc
+        with self.lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, linecache.__file__),
+                tracemalloc.Filter(False, '<frozen importlib.*>'),
+                tracemalloc.Filter(False, '<unknown>')
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            if self.previous is None:
+                statistics = snapshot.statistics('lineno')
+            else:
+                statistics = snapshot.compare_to(self.previous, 'lineno')
+            statistics.sort(key=lambda s: s.size, reverse=True)
+            self.previous = snapshot
+            lines = [
+                f'== {monotonic() - self.start_time:.1f}s: '
+                f'{self.mib(current)} traced, {self.mib(peak)} at most'
+            ]
+            for s in statistics[:self.TOP]:
+                frame = s.traceback[0]
+                growth = getattr(s, 'size_diff', None)
+                growth = '' if growth is None else \
+                    f' ({"+" if growth >= 0 else "-"}' \
+                    f'{self.mib(abs(growth))})'
+                source = linecache.getline(frame.filename, frame.lineno)
+                lines += [
+                    f'{self.mib(s.size):>12}{growth} in {s.count} blocks: '
+                    f'{frame.filename}:{frame.lineno}',
+                    f'    {source.strip()}'
+                ]
+            with open(self.file_names[0], 'a', encoding='utf-8') as fd:
+                fd.write('\n'.join(lines) + '\n\n')
+
+    @classmethod
+    def mib(cls, size: int) -> str:
+        return f'{size / 2 ** 20:.1f} MiB'
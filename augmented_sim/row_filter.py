@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import datetime
+
+from typing import Any, AnyStr, Callable, List, Optional, Tuple
+
+
+# Tests a row given as a list of values
+RowTest = Callable[[List], bool]
+
+# Tests a record given as a buffer and the offset where it starts
+RecordTest = Callable[[bytes, int], bool]
+
+
+class RowFilter:
+    '''Selects rows by their raw values, before they are adapted or parsed.
+
+    A row is kept if it meets all the conditions given: a date of death
+    (DTOBITO, as DDMMYYYY) in a range, a year of death (from DTOBITO, or
+    ANO_OBITO / ANO without it), a municipality of residence (CODMUNRES,
+    compared without the check digit) and a cause of death (CAUSABAS)
+    starting with one of the given prefixes. Rows without the columns
+    needed by a condition are not kept.
+    '''
+
+    def __init__(self, date_from: Optional[datetime.date] = None,
+                 date_to: Optional[datetime.date] = None,
+                 years: Optional[List[int]] = None,
+                 municipalities: Optional[List[str]] = None,
+                 causes: Optional[List[str]] = None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.years = years
+        self.municipalities = municipalities
+        self.causes = causes
+
+    def __bool__(self) -> bool:
+        return any(c is not None for c in [
+            self.date_from, self.date_to, self.years,
+            self.municipalities, self.causes
+        ])
+
+    @classmethod
+    def _date_key(cls, value: AnyStr) -> AnyStr:
+        # DDMMYYYY (or DMMYYYY) becomes YYYYMMDD, which sorts as dates do;
+        # an invalid date becomes empty, which is in no range
+        if len(value) == 7:
+            value = (b'0' if isinstance(value, bytes) else '0') + value
+        if len(value) != 8 or not value.isdigit():
+            return value[:0]
+        try:
+            datetime.date(int(value[4:]), int(value[2:4]), int(value[:2]))
+        except ValueError:
+            return value[:0]
+        return value[4:] + value[2:4] + value[:2]
+
+    def _checks(self, columns: List[str], kind: type) \
+            -> Optional[List[Tuple[int, Callable[[Any], bool]]]]:
+        # Position of a column and a test of its stripped text (str or
+        # bytes, according to kind); None if no row can be kept
+        def const(value: str) -> AnyStr:
+            return value.encode('ascii') if kind is bytes else value
+
+        index = {c: i for i, c in enumerate(columns)}
+        checks = []
+        date_key = self._date_key
+        if self.date_from is not None or self.date_to is not None:
+            if 'DTOBITO' not in index:
+                return None
+            low = self.date_from or datetime.date.min
+            high = self.date_to or datetime.date.max
+            low = const(low.strftime('%Y%m%d'))
+            high = const(high.strftime('%Y%m%d'))
+            checks.append((index['DTOBITO'],
+                           lambda v: low <= date_key(v) <= high))
+        if self.years is not None:
+            years = {const(str(y)) for y in self.years}
+            if 'DTOBITO' in index:
+                checks.append((index['DTOBITO'],
+                               lambda v: date_key(v)[:4] in years))
+            else:
+                year_col = 'ANO_OBITO' if 'ANO_OBITO' in index else 'ANO'
+                if year_col not in index:
+                    return None
+                checks.append((index[year_col], lambda v: v in years))
+        if self.municipalities is not None:
+            if 'CODMUNRES' not in index:
+                return None
+            codes = {const(c.strip()[:6]) for c in self.municipalities}
+            checks.append((index['CODMUNRES'], lambda v: v[:6] in codes))
+        if self.causes is not None:
+            if 'CAUSABAS' not in index:
+                return None
+            prefixes = tuple(const(c.strip().upper().replace('.', ''))
+                             for c in self.causes)
+            dot = const('.')
+            empty = const('')
+            checks.append((index['CAUSABAS'],
+                           lambda v: v.upper().replace(dot, empty)
+                           .startswith(prefixes)))
+        return checks
+
+    @classmethod
+    def text(cls, value: object) -> str:
+        # Text of a value as it would be in a CSV file
+        if isinstance(value, str):
+            return value.strip()
+        if value is None:
+            return ''
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.strftime('%d%m%Y')
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    def compile(self, columns: List[str]) -> RowTest:
+        '''Test of rows of values in the order of these columns.'''
+        checks = self._checks(columns, str)
+        if checks is None:
+            return lambda row: False
+        text = self.text
+
+        def test(row: List) -> bool:
+            for i, check in checks:
+                if not check(text(row[i])):
+                    return False
+            return True
+        return test
+
+    def compile_raw(self, columns: List[str],
+                    slices: List[Tuple[int, int]]) -> RecordTest:
+        '''Test of records whose fields are in these slices of the record.
+
+        The fields must be ASCII-compatible text (e.g. DBF character
+        fields); leading and trailing spaces and NULs are ignored.
+        '''
+        checks = self._checks(columns, bytes)
+        if checks is None:
+            return lambda buffer, offset: False
+        checks = [(*slices[i], check) for i, check in checks]
+
+        def test(buffer: bytes, offset: int) -> bool:
+            for start, end, check in checks:
+                value = buffer[offset + start:offset + end]
+                if not check(value.strip(b'\0 ')):
+                    return False
+            return True
+        return test
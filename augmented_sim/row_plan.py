@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+from typing import Callable, List, Optional, Type, Tuple
+
+import numpy as np
+
+from augmented_sim.metrics import StageMetrics
+from augmented_sim.sim.row_parser import SIMRowParser
+
+
+class RowPlan:
+    '''Augments the rows of one input file, given as lists of values.
+
+    It is compiled once from the columns of the file and of the output: each
+    column is read from and written to a fixed position of the row. Rows
+    are augmented in chunks, column by column: each augmenter receives the
+    columns it may need and returns the new ones. Output columns that the
+    file does not have are blank. Augmenters that produce none of the
+    output columns are skipped.
+    '''
+
+    def __init__(self, pattern: Type, in_cols: List[str],
+                 out_cols: List[str], augmenters: List):
+        augmenters = [a for a in augmenters
+                      if any(col in out_cols for col in a.PRODUCES)]
+        self.augmenters = augmenters
+        # Stages of StageMetrics
+        self.stages = ['augment/' + (getattr(a, 'name', None) or a.__name__)
+                       for a in augmenters]
+        index, self.adapt = pattern.compile_adapter(in_cols)
+        size = max([len(in_cols) - 1, *index.values()]) + 1
+        extended = size
+        for augmenter in augmenters:
+            for col in augmenter.PRODUCES:
+                if col not in index:
+                    index[col] = extended
+                    extended += 1
+        blank = extended
+        self.slots = index
+        parsed = list(SIMRowParser.CONVERTERS)
+        for augmenter in augmenters:
+            parsed += [c for c in augmenter.REQUIRES if c not in parsed]
+        self.inputs = [(col, index[col]) for col in parsed if col in index]
+        self.outputs = [(col, index.get(col, blank)) for col in out_cols]
+
+    def augment(self, row: List) -> Tuple:
+        return self.augment_chunk([row])[0]
+
+    def adapt_chunk(self, rows: List[List]) -> None:
+        # In place, as augment_chunk does unless told they are adapted
+        if self.adapt:
+            for row in rows:
+                self.adapt(row)
+
+    @classmethod
+    def _column_getter(cls, rows: List[List]) -> Callable[[int], Tuple]:
+        table = list(zip(*rows))
+        blank = ('',) * len(rows)
+
+        def column(i: int) -> Tuple:
+            return table[i] if i < len(table) else blank
+        return column
+
+    def values(self, rows: List[List], cols: List[str]) -> List[Tuple]:
+        '''Values of these output columns in adapted rows, as they are.'''
+        if not cols:
+            return [()] * len(rows)
+        positions = dict(self.outputs)
+        column = self._column_getter(rows)
+        return list(zip(*[column(positions[col]) for col in cols]))
+
+    def augment_chunk(self, rows: List[List], adapted: bool = False,
+                      metrics: Optional[StageMetrics] = None) -> List[Tuple]:
+        # Each stage is timed if there are metrics
+        n = len(rows)
+        t = metrics.clock() if metrics else None
+        if not adapted:
+            self.adapt_chunk(rows)
+            if metrics:
+                t = metrics.add('adapt', t, n)
+        column = self._column_getter(rows)
+        columns = {col: column(i) for col, i in self.inputs}
+        if metrics:
+            t = metrics.add('transpose', t, n)
+        new = {}
+        for augmenter, stage in zip(self.augmenters, self.stages):
+            produced = augmenter.get_new_values_batch(columns)
+            for col, values in produced.items():
+                if isinstance(values, np.ndarray):
+                    values = values.tolist()
+                if None in values:  # keep the previous value
+                    previous = new.get(col) or column(self.slots[col])
+                    values = [p if v is None else v
+                              for v, p in zip(values, previous)]
+                new[col] = values
+            if metrics:
+                t = metrics.add(stage, t, n)
+        rows = list(zip(*[
+            new[col] if col in new else column(i)
+            for col, i in self.outputs
+        ]))
+        if metrics:
+            metrics.add('assemble', t, n)
+        return rows
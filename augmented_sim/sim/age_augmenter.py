@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
-from typing import Dict
+from typing import Any, Dict, List, Optional, Sequence
 import bisect
 
+import numpy as np
+
 from .augmenter import Augmenter
 
 
@@ -15,16 +17,98 @@ class AgeAugmenter(Augmenter):
         'IDADECAT2'       # age category II (1..8)
     ]
 
+    CACHEABLE = True
+
     @classmethod
     def get_new_values(cls, row: Dict) -> Dict:
         age = row.get('IDADE', None)
         if age is None:
             return {}
+        return cls.values_for_years(age.years)
+
+    @classmethod
+    def values_for_years(cls, years: int) -> Dict:
         return {
             'IDADEGERAL':
-                age.years,
+                years,
             'IDADECAT1':
-                1 if age.years < 1 else min(20, 2 + age.years // 5),
+                1 if years < 1 else min(20, 2 + years // 5),
             'IDADECAT2':
-                bisect.bisect([0, 5, 20, 40, 60, 70, 80, 90], age.years)
+                bisect.bisect([0, 5, 20, 40, 60, 70, 80, 90], years)
         }
+
+    @classmethod
+    def code_years(cls, code: str) -> Optional[int]:
+        '''The years of SIMRowParser.parse_age(code), or None.
+
+        The code is a unit digit (minutes, hours, days, months, years, or
+        years above 100) and a value; only months add up to years.
+        '''
+        try:
+            unit, value = int(code[:1]), int(code[1:])
+        except (TypeError, ValueError):
+            return None
+        if 0 <= unit <= 2:
+            return 0
+        if unit == 3:  # truncated towards zero, as relativedelta does
+            return value // 12 if value >= 0 else -(-value // 12)
+        if unit == 4:
+            return value
+        if unit == 5:
+            return value + 100
+        return None
+
+    # Values of the 1000 codes with three digits (by index), from
+    # code_years and values_for_years; None for the invalid ones
+    _CODE_TABLE = None
+
+    @classmethod
+    def code_table(cls) -> np.ndarray:
+        if cls._CODE_TABLE is None:
+            table = np.empty((1000, len(cls.PRODUCES)), dtype=object)
+            for code in range(1000):
+                table[code] = cls._code_values(f'{code:03}')
+            cls._CODE_TABLE = table
+        return cls._CODE_TABLE
+
+    @classmethod
+    def _code_values(cls, code: str) -> List[Optional[int]]:
+        years = cls.code_years(code)
+        if years is None:
+            return [None] * len(cls.PRODUCES)
+        values = cls.values_for_years(years)
+        return [values[c] for c in cls.PRODUCES]
+
+    @classmethod
+    def ages_batch(cls, codes: Sequence[Any]) -> Dict[str, np.ndarray]:
+        '''The values of get_new_values for many IDADE codes (unparsed).
+
+        Each column is an array, with None where the code is invalid.
+        Codes with three digits are looked up in code_table; the others
+        are converted one by one (see code_years).
+        '''
+        table = cls.code_table()
+        n = len(codes)
+        codes = np.array(codes, dtype=object).reshape(n)
+        chars = codes.astype('U4').view(np.uint32).reshape(n, 4)
+        chars = chars.astype(np.int64) - 48
+        regular = ((chars[:, :3] >= 0) & (chars[:, :3] <= 9)).all(axis=1) \
+            & (chars[:, 3] == -48)
+        if not all(type(c) is str for c in codes):
+            regular &= [isinstance(c, str) for c in codes]
+        index = chars[:, 0] * 100 + chars[:, 1] * 10 + chars[:, 2]
+        values = table[np.where(regular, index, 0)]
+        parsed = {}
+        for i in np.flatnonzero(~regular):
+            code = codes[i]
+            if code not in parsed:
+                parsed[code] = cls._code_values(code)
+            values[i] = parsed[code]
+        return dict(zip(cls.PRODUCES, values.T))
+
+    @classmethod
+    def get_new_values_batch(cls, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        if 'IDADE' not in columns:
+            return {}
+        return cls.ages_batch(columns['IDADE'])
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
-from typing import Dict
+from itertools import islice
+from typing import Callable, Dict, List, Sequence, Tuple, Type, Union
+
+from .row_parser import SIMRowParser
 
 
 class Augmenter:
@@ -9,6 +12,110 @@ class Augmenter:
     REQUIRES = []
     PRODUCES = []
 
+    # If True, the new values of each row depend only on its values of the
+    # REQUIRES columns, so they can be memoized
+    CACHEABLE = False
+
     @classmethod
     def get_new_values(cls, row: Dict) -> Dict:
         return {}
+
+    @classmethod
+    def get_new_values_batch(cls, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        '''Produces the new columns of many rows at once.
+
+        ``columns`` has the unparsed values of the columns that
+        get_new_values would receive parsed. Each column produced has a
+        value for each row, or None to leave the row unchanged. By default,
+        get_new_values is called for each row.
+        '''
+        return new_values_by_row(cls.get_new_values, cls.PRODUCES, columns)
+
+    @classmethod
+    def cache_keys(cls, columns: Dict[str, Sequence]) -> List[Tuple]:
+        '''The key of each row in the cache of a cacheable augmenter.
+
+        ``columns`` has the unparsed values of the REQUIRES columns that
+        the rows have. Rows with the same key must get the same new values.
+        By default, the key is the tuple of the values.
+        '''
+        return list(zip(*columns.values()))
+
+
+def new_values_by_row(get_new_values: Callable[[Dict], Dict],
+                      produces: List[str],
+                      columns: Dict[str, Sequence]) -> Dict[str, List]:
+    names = list(columns)
+    parsed = [list(map(SIMRowParser.converter(c), columns[c])) for c in names]
+    results = [get_new_values(dict(zip(names, values)))
+               for values in zip(*parsed)]
+    return {col: [r.get(col) for r in results] for col in produces}
+
+
+class MemoizedAugmenter:
+    '''Remembers the results of a cacheable augmenter.
+
+    Results are kept for each distinct key (see Augmenter.cache_keys), so
+    each of them is augmented once, in the first chunk where it appears.
+    At most ``max_size`` results are kept; after that, new keys are
+    augmented in every chunk where they appear.
+    '''
+
+    def __init__(self, augmenter: Type[Augmenter], max_size: int):
+        self.augmenter = augmenter
+        self.REQUIRES = augmenter.REQUIRES
+        self.PRODUCES = augmenter.PRODUCES
+        self.max_size = max_size
+        self.size = 0
+        # Required columns present -> (columns produced, values by key)
+        self.caches = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_new_values_batch(self, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        names = tuple(c for c in self.REQUIRES if c in columns)
+        if not names:
+            return self.augmenter.get_new_values_batch(columns)
+        required = {c: columns[c] for c in names}
+        keys = self.augmenter.cache_keys(required)
+        produced, cache = self.caches.get(names, (None, {}))
+        new = {}  # key -> first row with it
+        try:
+            for i, k in enumerate(keys):
+                if k not in cache and k not in new:
+                    new[k] = i
+        except TypeError:  # unhashable
+            return self.augmenter.get_new_values_batch(columns)
+        self.hits += len(keys) - len(new)
+        self.misses += len(new)
+        if new:
+            first = list(new.values())
+            values = self.augmenter.get_new_values_batch(
+                {c: [col[i] for i in first] for c, col in required.items()})
+            produced = list(values)
+            new = dict(zip(new, zip(*[
+                v.tolist() if hasattr(v, 'tolist') else v
+                for v in values.values()
+            ]))) if produced else dict.fromkeys(new, ())
+            room = self.max_size - self.size
+            if room > 0:
+                cache.update(islice(new.items(), room))
+                self.size += min(room, len(new))
+                self.caches[names] = (produced, cache)
+        if not produced:
+            return {}
+        rows = [new[k] if k in new else cache[k] for k in keys]
+        return dict(zip(produced, map(list, zip(*rows))))
+
+    @property
+    def name(self) -> str:
+        return self.augmenter.__name__
+
+
+def memoize(augmenter: Type[Augmenter], max_size: int) \
+        -> Union[Type[Augmenter], MemoizedAugmenter]:
+    if max_size > 0 and augmenter.CACHEABLE:
+        return MemoizedAugmenter(augmenter, max_size)
+    return augmenter
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 
-from typing import Dict, Union
+from typing import Dict, Union, Tuple, Optional, Sequence, List
 import bisect
+import string
+
+import numpy as np
 
 from .augmenter import Augmenter
+from .row_parser import SIMRowParser
 
 
 class DeathCauseAugmenter(Augmenter):
 
-    REQUIRES = ['CAUSABAS']
+    REQUIRES = ['CAUSABAS', 'DTOBITO']  # the date only matters for COVID
     PRODUCES = [
         'GARBAGECODE',  # garbage code (0..4)
         'CAPCID',       # ICD chapter (integer)
@@ -31,6 +35,8 @@ class DeathCauseAugmenter(Augmenter):
         'OUTEXT'        # other external causes (0/1)
     ]
 
+    CACHEABLE = True
+
     CIDBR_LEVELS = {0: {}, 1: {}, 2: {}}
     CIDBR_LEVELS[0]['begin'] = [
         'A00', 'A65', 'B25', 'B84', 'C00', 'C15', 'C16', 'C17', 'C18', 'C22',
@@ -313,6 +319,221 @@ class DeathCauseAugmenter(Augmenter):
                 return level
         return 0
 
+    @classmethod
+    def classify(cls, icd: str) -> Dict:
+        # All values that depend only on the ICD code
+        cidbr = cls.icd_to_cidbr(icd)
+        return {
+            'GARBAGECODE': cls.garbage_code(icd),
+            'CAPCID': cls.icd_chapter(icd),
+            'COVID': cls.covid(icd),
+            'CIDBR': cidbr,
+            **cls.cidbr_conditions(cidbr)
+        }
+
+    # Every code from A00 to Z999 (three or four characters) is classified
+    # once, on first use; other values are classified row by row
+    _CLASSIFICATION = None
+
+    @classmethod
+    def _classification(cls) -> Dict[str, Dict]:
+        if cls._CLASSIFICATION is None:
+            shared = {}  # identical values share the same dict
+
+            def add(icd: str, key: Tuple) -> None:
+                if key not in shared:
+                    shared[key] = {c: v for c, v in zip(cls.PRODUCES, key)
+                                   if v is not None}
+                table[icd] = shared[key]
+
+            table = {}
+            for letter in string.ascii_uppercase:
+                for number in range(100):
+                    prefix = f'{letter}{number:02}'
+                    common = cls.as_tuple(cls.classify(prefix))
+                    add(prefix, common)
+                    # only the garbage code and COVID look past the third
+                    # character (and CID-BR, for O24.4)
+                    for icd in [prefix + d for d in string.digits]:
+                        if prefix == 'O24':
+                            add(icd, cls.as_tuple(cls.classify(icd)))
+                        else:
+                            add(icd, (cls.garbage_code(icd), common[1],
+                                      cls.covid(icd), *common[3:]))
+            cls._CLASSIFICATION = table
+        return cls._CLASSIFICATION
+
+    @classmethod
+    def as_tuple(cls, values: Dict) -> Tuple:
+        return tuple(values.get(c) for c in cls.PRODUCES)
+
+    @classmethod
+    def classification_table(cls) -> Dict[str, Tuple]:
+        '''Maps each ICD code to its values, in the order of PRODUCES.
+
+        Columns that would be left blank (e.g. the CID-BR conditions when
+        there is no CID-BR code) are None. COVID is 0 anyway if the death
+        happened before 2020.
+        '''
+        return {
+            icd: cls.as_tuple(values)
+            for icd, values in cls._classification().items()
+        }
+
+    @classmethod
+    def lookup(cls, icd: str) -> Optional[Tuple]:
+        values = cls._classification().get(icd)
+        return None if values is None else cls.as_tuple(values)
+
+    # Codes made of a letter and two or three digits are packed into
+    # integers in the same order as the strings: the letter and the first
+    # two digits in base 10, then the third digit plus 1 (0 if absent)
+    _BATCH_TABLES = None
+
+    @classmethod
+    def pack(cls, icd: str) -> int:
+        key = ((ord(icd[0]) - 65) * 10 + int(icd[1])) * 10 + int(icd[2])
+        return key * 11 + (int(icd[3]) + 1 if len(icd) > 3 else 0)
+
+    @classmethod
+    def _ranges(cls, begin: List[str], end: List[str]) -> Tuple:
+        return (np.array([cls.pack(c) for c in begin]),
+                np.array([cls.pack(c) for c in end]),
+                np.array([len(c) == 3 for c in end]))
+
+    @classmethod
+    def _batch_tables(cls) -> Dict:
+        if cls._BATCH_TABLES is None:
+            cidbr_values = ['']
+            for level in [0, 1, 2]:
+                cidbr_values += cls.CIDBR_LEVELS[level]['values']
+            cidbr_values = list(dict.fromkeys(cidbr_values + ['089']))
+            conditions = cls.PRODUCES[4:]
+            cidbr_conditions = np.empty(
+                (len(cidbr_values), len(conditions)), dtype=object)
+            for i, cidbr in enumerate(cidbr_values):
+                values = cls.cidbr_conditions(cidbr)
+                cidbr_conditions[i] = [values.get(c) for c in conditions]
+            levels = {}
+            for level in [0, 1, 2]:
+                table = cls.CIDBR_LEVELS[level]
+                levels[level] = cls._ranges(table['begin'], table['end']) \
+                    + (np.array([cidbr_values.index(v)
+                                 for v in table['values']]),)
+            cls._BATCH_TABLES = {
+                'chapter': cls._ranges(
+                    cls.ICD_CHAPTER_BEGIN, cls.ICD_CHAPTER_END),
+                'garbage': {
+                    level: cls._ranges(table['begin'], table['end'])
+                    for level, table in cls.GARBAGE_CODE_LEVELS.items()
+                },
+                'cidbr': levels,
+                'cidbr_values': np.array(cidbr_values, dtype=object),
+                'cidbr_089': cidbr_values.index('089'),
+                'cidbr_conditions': cidbr_conditions,
+                'special': {c: cls.pack(c) for c in ['B342', 'U04', 'O244']}
+            }
+        return cls._BATCH_TABLES
+
+    @classmethod
+    def _search(cls, ranges: Tuple, keys: np.ndarray) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        # Index of the range of each key, and whether the key is in it;
+        # end codes with three characters also cover their subcodes
+        begin, end, short = ranges
+        idx = np.searchsorted(begin, keys, side='right') - 1
+        last = np.maximum(idx, 0)
+        prefix = np.where(short[last], keys - keys % 11, keys)
+        return last, (idx >= 0) & (prefix <= end[last])
+
+    @classmethod
+    def _classify_keys(cls, keys: np.ndarray) -> np.ndarray:
+        # Values of packed codes, one row per code in the order of PRODUCES
+        tables = cls._batch_tables()
+        special = tables['special']
+        n = len(keys)
+        keys3 = keys - keys % 11
+
+        garbage = np.zeros(n, dtype=np.int64)
+        for level in sorted(tables['garbage']):  # the highest one wins
+            idx, found = cls._search(tables['garbage'][level], keys)
+            garbage[found] = level
+
+        idx, found = cls._search(tables['chapter'], keys3)
+        chapter = np.where(found, (idx + 1).astype(object),
+                           cls.INVALID_ICD_CHAPTER)
+
+        covid = np.zeros(n, dtype=np.int64)
+        covid[keys == special['B342']] = 1
+        covid[keys3 == special['U04']] = 2
+
+        cidbr = np.zeros(n, dtype=np.int64)  # index in cidbr_values
+        for level in [0, 1, 2]:  # the last one wins
+            begin, end, short, values = tables['cidbr'][level]
+            idx, found = cls._search((begin, end, short), keys3)
+            cidbr[found] = values[idx[found]]
+        cidbr[keys == special['O244']] = tables['cidbr_089']
+
+        values = np.empty((n, len(cls.PRODUCES)), dtype=object)
+        values[:, 0] = garbage.astype(object)
+        values[:, 1] = chapter
+        values[:, 2] = covid.astype(object)
+        values[:, 3] = tables['cidbr_values'][cidbr]
+        values[:, 4:] = tables['cidbr_conditions'][cidbr]
+        return values
+
+    @classmethod
+    def classify_batch(cls, icds: Sequence[Optional[str]],
+                       before_2020: Optional[Sequence[bool]] = None) \
+            -> Dict[str, np.ndarray]:
+        '''Classifies many ICD codes at once.
+
+        Returns an array for each column in PRODUCES, with the same values
+        as get_new_values (None where it would leave the column blank).
+        Each distinct code is classified once; codes other than a letter
+        followed by two or three digits are rare and are classified one by
+        one.
+        '''
+        n = len(icds)
+        codes = np.array(icds, dtype=object).reshape(n)
+        codes[np.equal(codes, None)] = ''
+        chars = codes.astype('U5').view(np.uint32).reshape(n, 5)
+        chars = chars.astype(np.int64)
+        letter, d1, d2, d3 = chars[:, 0], chars[:, 1], chars[:, 2], \
+            chars[:, 3]
+        regular = (letter >= 65) & (letter <= 90) & (chars[:, 4] == 0)
+        for d in [d1, d2]:
+            regular &= (d >= 48) & (d <= 57)
+        regular &= (d3 == 0) | ((d3 >= 48) & (d3 <= 57))
+        keys = ((letter - 65) * 10 + d1 - 48) * 10 + d2 - 48
+        keys = keys * 11 + np.where(d3 == 0, 0, d3 - 47)
+
+        # Other values (including empty ones) get negative keys
+        others = {}
+        irregular = np.flatnonzero(~regular)
+        keys[irregular] = [
+            -others.setdefault(code or '', len(others) + 1)
+            for code in codes[irregular]
+        ]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        split = np.searchsorted(unique, 0)
+        values = np.empty((len(unique), len(cls.PRODUCES)), dtype=object)
+        values[split:] = cls._classify_keys(unique[split:])
+        for code, number in others.items():
+            row = values[np.searchsorted(unique, -number)]
+            if code:
+                row[:] = cls.as_tuple(cls.classify(code))
+            else:
+                row[:] = cls.as_tuple({
+                    'CAPCID': cls.INVALID_ICD_CHAPTER,
+                    'COVID': cls.INVALID_COVID
+                })
+
+        values = values[inverse.reshape(n)]
+        if before_2020 is not None:
+            values[np.asarray(before_2020, dtype=bool), 2] = 0
+        return dict(zip(cls.PRODUCES, values.T))
+
     @classmethod
     def get_new_values(cls, row: Dict) -> Dict:
         if 'CAUSABAS' not in row:
@@ -323,15 +544,42 @@ class DeathCauseAugmenter(Augmenter):
                 'CAPCID': cls.INVALID_ICD_CHAPTER,
                 'COVID': cls.INVALID_COVID
             }
-        cidbr = cls.icd_to_cidbr(icd)
-        if 'DTOBITO' in row and row['DTOBITO'].year < 2020:
-            covid = 0
-        else:
-            covid = cls.covid(icd)
-        return {
-            'GARBAGECODE': cls.garbage_code(icd),
-            'CAPCID': cls.icd_chapter(icd),
-            'COVID': covid,
-            'CIDBR': cidbr,
-            **cls.cidbr_conditions(cidbr)
-        }
+        values = cls._classification().get(icd)
+        if values is None:
+            values = cls.classify(icd)
+        # A missing or invalid date of death is not before 2020
+        date = row.get('DTOBITO')
+        if date is not None and date.year < 2020 and values['COVID']:
+            values = {**values, 'COVID': 0}
+        return values
+
+    @classmethod
+    def cache_keys(cls, columns: Dict[str, Sequence]) -> List[Tuple]:
+        # The date of death only matters through whether it is before 2020
+        # (for COVID), so there are at most two keys for each code
+        if 'CAUSABAS' not in columns or 'DTOBITO' not in columns:
+            return super().cache_keys(columns)
+        dates = SIMRowParser.parse_date_batch(columns['DTOBITO'])
+        before_2020 = (dates < np.datetime64('2020-01-01')).tolist()
+        return list(zip(columns['CAUSABAS'], before_2020))
+
+    @classmethod
+    def get_new_values_batch(cls, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        if 'CAUSABAS' not in columns:
+            return {}
+        parsed = {}  # by unparsed code
+        icds = []
+        for code in columns['CAUSABAS']:
+            try:
+                icd = parsed[code]
+            except KeyError:
+                icd = parsed[code] = SIMRowParser.parse_icd(code)
+            icds.append(icd)
+        before_2020 = None
+        if 'DTOBITO' in columns:
+            dates = SIMRowParser.parse_date_batch(columns['DTOBITO'])
+            valid = np.array([bool(icd) for icd in icds], dtype=bool)
+            # NaT (a missing or invalid date) is not before 2020
+            before_2020 = valid & (dates < np.datetime64('2020-01-01'))
+        return cls.classify_batch(icds, before_2020)
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Sequence
 import datetime
 
+import numpy as np
+
 from .augmenter import Augmenter
+from .row_parser import SIMRowParser
 
 
 class DeathDateAugmenter(Augmenter):
@@ -17,6 +20,8 @@ class DeathDateAugmenter(Augmenter):
         'SEMANAEPI',      # epidemiological week (1..53)
     ]
 
+    CACHEABLE = True
+
     FIRST_EPIDEMIOLOGICAL_WEEK_CACHE = {}
 
     @classmethod
@@ -42,6 +47,55 @@ class DeathDateAugmenter(Augmenter):
             first_epi_week_start = cls.first_epi_week_start_in_year(year)
         return (year, 1 + ((date - first_epi_week_start).days) // 7)
 
+    # Start of the first epidemiological week of each year (by index)
+    _EPI_WEEK_STARTS = None
+
+    @classmethod
+    def epi_week_starts(cls) -> np.ndarray:
+        if cls._EPI_WEEK_STARTS is None:
+            years = np.arange(10002) - 1970  # up to the year 10001
+            first_day = years.astype('datetime64[Y]').astype('datetime64[D]')
+            weekday = (first_day.astype(np.int64) + 3) % 7  # Monday is 0
+            first_sunday = first_day + (6 - weekday)
+            cls._EPI_WEEK_STARTS = np.where(
+                weekday >= 3, first_sunday, first_sunday - 7)
+        return cls._EPI_WEEK_STARTS
+
+    @classmethod
+    def epidemiological_week_batch(cls, dates: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        # Same as epidemiological_week, for an array of valid dates
+        starts = cls.epi_week_starts()
+        year = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        epi_year = np.where(dates >= starts[year + 1], year + 1,
+                            np.where(dates >= starts[year], year, year - 1))
+        epi_week = 1 + (dates - starts[epi_year]).astype(np.int64) // 7
+        return epi_year, epi_week
+
+    @classmethod
+    def dates_batch(cls, dates: np.ndarray) -> Dict[str, np.ndarray]:
+        '''The values of get_new_values for an array of datetime64[D].
+
+        Each column is an array, with None where the date is NaT.
+        '''
+        valid = ~np.isnat(dates)
+        d = np.where(valid, dates, np.datetime64('2000-01-01'))
+        month_start = d.astype('datetime64[M]')
+        epi_year, epi_week = cls.epidemiological_week_batch(d)
+        columns = [
+            (d - month_start.astype('datetime64[D]')).astype(np.int64) + 1,
+            month_start.astype(np.int64) % 12 + 1,
+            d.astype('datetime64[Y]').astype(np.int64) + 1970,
+            epi_year,
+            epi_week
+        ]
+        result = {}
+        for col, values in zip(cls.PRODUCES, columns):
+            values = values.astype(object)
+            values[~valid] = None
+            result[col] = values
+        return result
+
     @classmethod
     def get_new_values(cls, row: Dict) -> Dict:
         d = row.get('DTOBITO', None)
@@ -55,3 +109,11 @@ class DeathDateAugmenter(Augmenter):
             'ANOEPI': epi_year,
             'SEMANAEPI': epi_week,
         }
+
+    @classmethod
+    def get_new_values_batch(cls, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        if 'DTOBITO' not in columns:
+            return {}
+        return cls.dates_batch(
+            SIMRowParser.parse_date_batch(columns['DTOBITO']))
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Adapts a row given as a list, in place (see InputPattern.compile_adapter)
+RowAdapter = Optional[Callable[[List], None]]
 
 
 class InputPattern:
@@ -15,6 +19,53 @@ class InputPattern:
     def adapt_row(cls, row: Dict) -> Dict:
         raise NotImplementedError
 
+    @classmethod
+    def compile_adapter(cls, cols: List[str]) -> \
+            Tuple[Dict[str, int], RowAdapter]:
+        '''Positional version of adapt_row for rows with the given columns.
+
+        Returns the position of each column of the adapted row and a
+        function that adapts a row (a list of values in the order of
+        ``cols``) in place, appending new columns at the end. The function
+        is None if there is nothing to do.
+        '''
+        raise NotImplementedError
+
+    @classmethod
+    def source_columns(cls, cols: List[str],
+                       adapted: List[str]) -> List[str]:
+        # Columns among cols that the given adapted columns come from
+        return [c for c in cols
+                if any(a in adapted for a in cls.adapt_col_list([c]))]
+
+    @classmethod
+    def column_index(cls, cols: List[str]) -> Dict[str, int]:
+        # Repeated columns behave as in a dict: the last one wins
+        return {c: i for i, c in enumerate(cols)}
+
+    @classmethod
+    def chain(cls, steps: List[Callable[[List], None]]) -> RowAdapter:
+        if not steps:
+            return None
+        if len(steps) == 1:
+            return steps[0]
+
+        def adapt(row: List) -> None:
+            for step in steps:
+                step(row)
+        return adapt
+
+    @classmethod
+    def add_neighbourhood(cls, index: Dict[str, int], size: int,
+                          steps: List[Callable[[List], None]]) -> None:
+        if 'CD_GEOCODI' in index and 'CODBAIRES' not in index:
+            i = index['CD_GEOCODI']
+            index['CODBAIRES'] = size
+
+            def neighbourhood(row: List) -> None:
+                row.append(str(row[i])[7:9])
+            steps.append(neighbourhood)
+
 
 class Pattern0(InputPattern):
 
@@ -28,6 +79,11 @@ class Pattern0(InputPattern):
     def adapt_row(cls, row: Dict) -> Dict:
         return row.copy()
 
+    @classmethod
+    def compile_adapter(cls, cols: List[str]) -> \
+            Tuple[Dict[str, int], RowAdapter]:
+        return cls.column_index(cols), None
+
 
 class Pattern1(InputPattern):
 
@@ -65,6 +121,29 @@ class Pattern1(InputPattern):
             row['CODBAIRES'] = str(row['CD_GEOCODI'])[7:9]
         return row
 
+    @classmethod
+    def compile_adapter(cls, cols: List[str]) -> \
+            Tuple[Dict[str, int], RowAdapter]:
+        index = cls.column_index(cols)
+        steps = []
+        if 'IDADE' in index:
+            age = index['IDADE']
+
+            def adapt_age(row: List) -> None:
+                if row[age]:
+                    row[age] = str(400 + int(row[age]))
+            steps.append(adapt_age)
+        for old, new in [('MES_OBITO', 'MES'), ('ANO_OBITO', 'ANO')]:
+            if old in index:
+                i = index.pop(old)
+                index[new] = i
+
+                def adapt_int(row: List, i: int = i) -> None:
+                    row[i] = int(row[i]) if row[i] else ''
+                steps.append(adapt_int)
+        cls.add_neighbourhood(index, len(cols), steps)
+        return index, cls.chain(steps)
+
 
 class Pattern2(InputPattern):
 
@@ -84,5 +163,13 @@ class Pattern2(InputPattern):
             row['CODBAIRES'] = str(row['CD_GEOCODI'])[7:9]
         return row
 
+    @classmethod
+    def compile_adapter(cls, cols: List[str]) -> \
+            Tuple[Dict[str, int], RowAdapter]:
+        index = cls.column_index(cols)
+        steps = []
+        cls.add_neighbourhood(index, len(cols), steps)
+        return index, cls.chain(steps)
+
 
 ALL_PATTERNS = {c.NAME: c for c in [Pattern0, Pattern1, Pattern2]}
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
-from typing import Dict
+from typing import Dict, Sequence
 
 from .augmenter import Augmenter
+from .row_parser import SIMRowParser
 
 
 class NeighbourhoodAugmenter(Augmenter):
@@ -12,6 +13,8 @@ class NeighbourhoodAugmenter(Augmenter):
         'AREARENDA',      # neighbourhood income (ALTA/INTERMEDIARIA/BAIXA)
     ]
 
+    CACHEABLE = True
+
     neighbourhood_income_table = {
         1: 1, 2: 1, 3: 2, 4: 2, 5: 2, 6: 1, 7: 1, 8: 1, 9: 2,
         10: 2, 11: 3, 12: 1, 13: 3, 14: 1, 15: 1, 16: 1, 17: 3, 18: 2, 19: 3,
@@ -40,3 +43,20 @@ class NeighbourhoodAugmenter(Augmenter):
         return {
             'AREARENDA': income
         } if income else {}
+
+    @classmethod
+    def get_new_values_batch(cls, columns: Dict[str, Sequence]) \
+            -> Dict[str, Sequence]:
+        if 'CODBAIRES' not in columns:
+            return {}
+        incomes = {}  # by unparsed code
+        values = []
+        for code in columns['CODBAIRES']:
+            try:
+                income = incomes[code]
+            except KeyError:
+                row = {'CODBAIRES': SIMRowParser.parse_int(code)}
+                income = cls.get_new_values(row).get('AREARENDA')
+                incomes[code] = income
+            values.append(income)
+        return {'AREARENDA': values}
@@ -2,13 +2,25 @@
 
 import datetime
 
-from dateutil.relativedelta import relativedelta
-from typing import Optional, Dict
+import numpy as np
+
+from typing import Any, Callable, Optional, Dict, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dateutil.relativedelta import relativedelta
 
 
 class SIMRowParser:
     '''Parses a row of SIM values, converting them to appropriate types.'''
 
+    # Name of the method that parses each column (the others are kept)
+    CONVERTERS = {
+        'DTOBITO': 'parse_date',
+        'IDADE': 'parse_age',
+        'CODBAIRES': 'parse_int',
+        'CAUSABAS': 'parse_icd'
+    }
+
     @classmethod
     def parse_date(cls, d: str) -> Optional[datetime.date]:
         # foreseeing a problem caused by spreadsheets:
@@ -20,7 +32,51 @@ class SIMRowParser:
             return None
 
     @classmethod
-    def parse_age(cls, d: str) -> Optional[relativedelta]:
+    def parse_date_batch(cls, values: Sequence[Any]) -> np.ndarray:
+        '''Parses many dates at once, like parse_date (NaT for None).
+
+        Strings of seven or eight digits are parsed with array arithmetic;
+        other values are parsed one by one.
+        '''
+        n = len(values)
+        values = np.array(values, dtype=object).reshape(n)
+        chars = values.astype('U9').view(np.uint32).reshape(n, 9)
+        chars = chars.astype(np.int64) - 48
+        seven = (chars[:, 7] == -48) & (chars[:, 6] != -48)
+        chars[seven, 1:8] = chars[seven, :7]
+        chars[seven, 0] = 0
+        regular = ((chars[:, :8] >= 0) & (chars[:, :8] <= 9)).all(axis=1) \
+            & (chars[:, 8] == -48)
+        if not all(type(v) is str for v in values):
+            regular &= [isinstance(v, str) for v in values]
+        day = chars[:, 0] * 10 + chars[:, 1]
+        month = chars[:, 2] * 10 + chars[:, 3]
+        year = ((chars[:, 4] * 10 + chars[:, 5]) * 10 + chars[:, 6]) * 10 \
+            + chars[:, 7]
+        regular &= (month >= 1) & (month <= 12) & (year >= 1) & (day >= 1)
+        months = np.where(regular, (year - 1970) * 12 + month - 1, 0)
+        first = months.astype('datetime64[M]').astype('datetime64[D]')
+        last = (months + 1).astype('datetime64[M]').astype('datetime64[D]')
+        dates = first + (day - 1)
+        dates[~regular | (dates >= last)] = np.datetime64('NaT')
+        parsed = {}
+        for i in np.flatnonzero(~regular):
+            value = values[i]
+            try:
+                date = parsed[value]
+            except KeyError:
+                date = parsed[value] = np.datetime64(
+                    cls.parse_date(value), 'D')
+            except TypeError:  # unhashable
+                date = np.datetime64(cls.parse_date(value), 'D')
+            dates[i] = date
+        return dates
+
+    @classmethod
+    def parse_age(cls, d: str) -> Optional['relativedelta']:
+        # Only called for rows augmented one by one (AgeAugmenter computes
+        # the same years from the codes), so dateutil is only imported then
+        from dateutil.relativedelta import relativedelta
         try:
             unit, value = int(d[:1]), int(d[1:])
         except (TypeError, ValueError):
@@ -48,12 +104,14 @@ class SIMRowParser:
         except Exception:
             return None
 
+    @classmethod
+    def parse_value(cls, value: object) -> object:
+        return value
+
+    @classmethod
+    def converter(cls, column: str) -> Callable[[Any], Any]:
+        return getattr(cls, cls.CONVERTERS.get(column, 'parse_value'))
+
     @classmethod
     def parse_row(cls, row: Dict) -> Dict:
-        converters = {
-            'DTOBITO': cls.parse_date,
-            'IDADE': cls.parse_age,
-            'CODBAIRES': cls.parse_int,
-            'CAUSABAS': cls.parse_icd
-        }
-        return {k: converters.get(k, lambda x: x)(v) for k, v in row.items()}
+        return {k: cls.converter(k)(v) for k, v in row.items()}
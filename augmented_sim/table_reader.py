@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
 # coding=utf-8
 
+import codecs
 import csv
-import dbfread
-import openpyxl
+import io
+import os
+import struct
 
-from typing import Union, Optional, Iterator, Tuple, Dict
+from itertools import islice
+from time import monotonic
+from typing import Union, Optional, Iterator, Tuple, Dict, List, \
+    BinaryIO, Any, NamedTuple, TYPE_CHECKING
 
+from augmented_sim.compression import CompressedFile, compression_suffix, \
+    is_compressed, split_member, table_name, zip_members
+from augmented_sim.dbf_reader import DBFReader, DBFStreamReader, DBCReader
 from augmented_sim.i18n import get_translator, get_tr
+from augmented_sim.row_filter import RowFilter
+
+# dbfread and openpyxl are only imported when a file needs them
+if TYPE_CHECKING:
+    import dbfread
 
 
 class TableReadingError(ValueError):
@@ -25,12 +38,141 @@ class TableReadingError(ValueError):
             self.details = ''.join(tb.format())
 
 
+class Progress(NamedTuple):
+    '''Progress of a TableReader (bytes or rows, depending on the file).'''
+
+    current: int
+    current_total: int
+    overall: int
+    overall_total: int
+    file_name: Optional[str]
+    rows: int = 0  # including the skipped ones
+    rows_per_second: float = 0.0
+    eta: Optional[float] = None  # seconds
+    skipped: int = 0  # rows that did not pass the filter
+
+
+class EncodingChanged(Exception):
+    '''A file turned out not to be in the encoding it was being read in.
+
+    It is raised once non-ASCII text was already read from the file, so the
+    file must be read again from its start, trying ``encodings`` in turn
+    (see TableReader.restart).
+    '''
+
+    def __init__(self, encodings: List[str],
+                 file_name: Optional[str] = None):
+        super().__init__(file_name)
+        self.encodings = encodings
+        self.file_name = file_name
+
+
+class DecodedLineReader:
+    '''Decodes a binary text stream line by line in a single pass.
+
+    The number of bytes consumed so far is available in ``position``.
+    Each block is decoded as it is read. While everything decoded is plain
+    ASCII, any of the fallback encodings would have decoded it in the same
+    way, so if a block cannot be decoded, decoding continues with the next
+    fallback encoding. Once non-ASCII text was returned, that is no longer
+    possible and EncodingChanged is raised with the fallbacks left.
+    '''
+
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, fd: BinaryIO, encodings: List[str]):
+        self.fd = fd
+        self.encodings = encodings
+        self.encoding = encodings[0]
+        self.position = 0
+        self.ascii_only = True
+        self.decoder = self._new_decoder(self.encoding)
+
+    @classmethod
+    def _new_decoder(cls, encoding: str) -> io.IncrementalNewlineDecoder:
+        # same newline translation as open(..., 'r')
+        decoder = codecs.getincrementaldecoder(encoding)()
+        return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def __iter__(self) -> Iterator[str]:
+        pending = ''
+        while True:
+            block = self.fd.read(self.BLOCK_SIZE)
+            text = self._decode(block, not block)
+            self.position += len(block)
+            if text:
+                lines = (pending + text).split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line + '\n'
+            if not block:
+                break
+        if pending:
+            yield pending
+
+    def _decode(self, block: bytes, final: bool) -> str:
+        state = self.decoder.getstate()
+        try:
+            text = self.decoder.decode(block, final)
+        except UnicodeDecodeError as e:
+            text = self._fall_back(e, state, block, final)
+        if self.ascii_only and text:
+            try:
+                text.encode('ascii')
+            except UnicodeEncodeError:
+                self.ascii_only = False
+        return text
+
+    def _fall_back(self, exc: UnicodeDecodeError, state: Tuple[bytes, int],
+                   block: bytes, final: bool) -> str:
+        idx = self.encodings.index(self.encoding)
+        if not self.ascii_only:
+            if idx + 1 < len(self.encodings):
+                raise EncodingChanged(self.encodings[idx + 1:]) from exc
+            raise exc
+        buffered, flag = state
+        for encoding in self.encodings[idx + 1:]:
+            decoder = self._new_decoder(encoding)
+            decoder.setstate((b'', flag & 1))
+            try:
+                text = decoder.decode(buffered + block, final)
+            except UnicodeDecodeError:
+                continue
+            self.encoding, self.decoder = encoding, decoder
+            return text
+        raise exc
+
+
 class TableReader:
-    '''Reads a DBF or CSV table.'''
+    '''Reads a DBF, DBC, CSV or XLSX table.
+
+    CSV and DBF tables may also be compressed (.gz, .xz, .bz2, .zst) or in
+    a zip archive, either given as a whole or as "archive.zip/member".
+    '''
+
+    ENCODINGS = [
+        'UTF-8-sig', 'UTF-8', 'UTF-16-BE', 'UTF-16-LE',
+        'CP1252', 'ISO-8859-15'
+    ]  # the last ones are common in Brazil (on Windows)
+
+    # These decode ASCII text in the same way, so it is possible to switch
+    # from one to the next in the middle of a file that is ASCII so far
+    ASCII_COMPATIBLE_ENCODINGS = [
+        'UTF-8-sig', 'UTF-8', 'CP1252', 'ISO-8859-15'
+    ]
+
+    UNION_ALL_PARSERS = Union[Iterator[List], DBFReader, 'dbfread.DBF']
+
+    # Encoding detection samples the head, the tail and this many blocks
+    # evenly spaced in between
+    SAMPLE_MIDDLE_BLOCKS = 8
 
-    UNION_ALL_PARSERS = Union[csv.DictReader, dbfread.DBF]
+    # 'fast' falls back to dbfread for files that it does not support
+    DBF_BACKENDS = ['fast', 'dbfread']
 
-    def __init__(self, file_names: str):
+    def __init__(self, file_names: str, encoding: Optional[str] = None,
+                 dbf_backend: str = 'fast',
+                 row_filter: Optional[RowFilter] = None):
         self.trans = get_translator(None)
         self.tr = get_tr(type(self).__name__, self.trans)
         self.files = []
@@ -38,36 +180,99 @@ class TableReader:
         self.read_count = {}
         self.currently_reading = ''
         self.finished = False
-        self.fd = None
-        for file_name in file_names:
+        self.start_time = None
+        self.fds = []
+        self.line_readers = {}
+        self.projections = {}  # positions of the columns read, by file
+        self.row_filter = row_filter or None
+        self.skipped = {}
+        self.resumed = {}  # records skipped before self.start
+        self.reading_index = 0
+        self.start = (0, 0)  # file and record where reading starts
+        self.file_names = self._expand(file_names)
+        self.encoding = encoding
+        self.dbf_backend = dbf_backend
+        self.fallbacks = {}  # encodings left for a file, see restart()
+        self._open_files()
+
+    def _open_files(self) -> None:
+        encoding = self.encoding
+        for file_name in self.file_names:
             self.read_count[file_name] = 0
+            self.skipped[file_name] = 0
+            self.resumed[file_name] = 0
+            get_pos = (lambda fn: lambda: self.rows_read(fn))(file_name)
             try:
-                if file_name.lower().endswith('.csv'):
+                compressed = is_compressed(file_name)
+                name = table_name(file_name).lower()
+                if name.endswith('.csv'):
                     format = 'CSV'
-                    n, enc = self._count_lines_and_guess_encoding(file_name)
-                    denominator = n - 1  # excluding header
-                    fd = open(file_name, 'r', encoding=enc)
+                    # Read only once; progress is measured in bytes
+                    fd = self._open_binary(file_name)
+                    self.fds.append(fd)
+                    if file_name in self.fallbacks:
+                        encodings, head = self._decode_head_fallback(
+                            fd, file_name)
+                    elif encoding:
+                        encodings = [encoding]
+                        head = self._decode_head(fd, encoding)
+                    else:
+                        # A compressed stream is sampled at its head only
+                        enc, head = self._guess_encoding(
+                            fd, file_name, not compressed)
+                        encodings = self._fallbacks(enc)
                     dialect = csv.Sniffer().sniff(
-                        fd.read(1024).split('\n', 1)[0])
-                    fd.seek(0)
-                    fd.seek(0)
-                    parser = csv.DictReader(fd, dialect=dialect)
-                    columns = parser.fieldnames
-                    self.fd = fd
-                elif file_name.lower().endswith('.dbf'):
+                        head[:1024].split('\n', 1)[0])
+                    if compressed:
+                        fd.close()
+                        fd = self.fds[-1] = CompressedFile(file_name)
+                    else:
+                        fd.seek(0)
+                    lines = DecodedLineReader(fd, encodings)
+                    self.line_readers[file_name] = lines
+                    parser = csv.reader(lines, dialect=dialect)
+                    columns = next(parser, None)
+                    if compressed:
+                        get_pos = (lambda r: lambda: r.position)(fd)
+                        denominator = fd.size
+                    else:
+                        get_pos = (lambda r: lambda: r.position)(lines)
+                        denominator = os.path.getsize(file_name)
+                elif name.endswith('.dbf') and compressed:
                     format = 'DBF'
-                    parser = dbfread.DBF(file_name)
+                    fd = CompressedFile(file_name)
+                    parser = DBFStreamReader(fd)
+                    self.fds.append(parser)
+                    columns = parser.field_names[:]
+                    # Progress is measured in compressed bytes
+                    get_pos = (lambda r: lambda: r.position)(parser)
+                    denominator = fd.size
+                elif name.endswith('.dbf'):
+                    format = 'DBF'
+                    parser = self._open_dbf(file_name, self.dbf_backend)
+                    columns = parser.field_names[:]
+                    if isinstance(parser, DBFReader):
+                        self.fds.append(parser)
+                        get_pos = (lambda r: lambda: r.position)(parser)
+                        denominator = len(parser)
+                    else:
+                        denominator = parser.header.numrecords
+                elif name.endswith('.dbc') and not compressed:
+                    format = 'DBC'
+                    parser = DBCReader(file_name)
+                    self.fds.append(parser)
                     columns = parser.field_names[:]
-                    denominator = parser.header.numrecords
-                elif file_name.lower().endswith('.xlsx'):
+                    # Progress is measured in compressed bytes
+                    get_pos = (lambda r: lambda: r.position)(parser)
+                    denominator = os.path.getsize(file_name)
+                elif name.endswith('.xlsx') and not compressed:
                     format = 'XLSX'
+                    import openpyxl
                     ws = openpyxl.load_workbook(
                         filename=file_name, read_only=True).active
                     columns = [str(c.value) for c in ws[1]]
-                    rows = ws.rows
-                    next(rows)
-                    parser = (dict(zip(columns, (c.value for c in row)))
-                              for row in rows)
+                    parser = ws.rows
+                    next(parser)
                     denominator = ws.max_row - 1
                 else:
                     msg = self.tr('unsupported-file').format(file_name)
@@ -75,7 +280,6 @@ class TableReader:
             except Exception as e:
                 msg = self.tr('unsupported-invalid-file').format(file_name)
                 raise TableReadingError(msg, file_name, e)
-            get_pos = (lambda fn: lambda: self.read_count[fn])(file_name)
             denominator = max(denominator, 1)
             self.files.append(
                 [file_name, format, parser, columns, get_pos, 0, denominator]
@@ -84,63 +288,340 @@ class TableReader:
                 if column not in self.columns:
                     self.columns.append(column)
 
+    def restart(self, file_name: str, encodings: List[str]) -> None:
+        '''Prepares to read all files again from the start.
+
+        The file file_name is then read in the first of encodings that
+        decodes it (see EncodingChanged). The projection is kept.
+        '''
+        for fd in self.fds:
+            try:
+                fd.close()
+            except Exception:
+                pass
+        self.fallbacks[file_name] = encodings
+        self.files = []
+        self.fds = []
+        self.line_readers = {}
+        self.currently_reading = ''
+        self.finished = False
+        self.reading_index = 0
+        self.start = (0, 0)
+        self._open_files()
+
+    def rows_read(self, file_name: str) -> int:
+        # Including the rows skipped by the filter or before self.start
+        return self.read_count[file_name] + self.skipped[file_name] + \
+            self.resumed[file_name]
+
+    def input_position(self) -> Tuple[int, int]:
+        '''The file being read (by index) and how many records were read.
+
+        Between chunks (see parse_chunks), this is where the next chunk
+        starts, which can be given to resume().
+        '''
+        file_index = self.reading_index
+        f = self.files[file_index]
+        if isinstance(f[2], DBFReader):
+            return file_index, f[2].scanned  # including deleted records
+        return file_index, self.rows_read(f[0])
+
+    def resume(self, file_index: int, records: int) -> None:
+        '''Skips the files before this one and the first records of it.
+
+        This must be called before parsing. DBF files are read from the
+        record given; other files are read (but not parsed) up to it.
+        '''
+        self.start = (file_index, records)
+        for f in self.files[:file_index]:
+            f[-2] = f[-1]  # already read
+
+    def _expand(self, file_names: List[str]) -> List[str]:
+        # A zip archive stands for the tables in it
+        expanded = []
+        for file_name in file_names:
+            if compression_suffix(file_name) == '.zip' and \
+                    split_member(file_name)[1] is None:
+                try:
+                    members = zip_members(file_name)
+                except Exception as e:
+                    msg = self.tr('unsupported-invalid-file').format(
+                        file_name)
+                    raise TableReadingError(msg, file_name, e)
+                expanded += members or [file_name]
+            else:
+                expanded.append(file_name)
+        return expanded
+
+    @classmethod
+    def _open_binary(cls, file_name: str) -> BinaryIO:
+        if is_compressed(file_name):
+            return CompressedFile(file_name)
+        return open(file_name, 'rb')
+
+    def project(self, columns: List[str]) -> None:
+        '''Reads only these columns, skipping the others as early as possible.
+
+        This must be called before parsing. The columns of each file keep
+        their order.
+        '''
+        self.columns = [c for c in self.columns if c in columns]
+        for file_name, format, parser, file_columns, *_ in self.files:
+            indices = [i for i, c in enumerate(file_columns) if c in columns]
+            if len(indices) < len(file_columns):
+                self.projections[file_name] = indices
+
+    def file_columns(self, f: List) -> List[str]:
+        indices = self.projections.get(f[0])
+        if indices is None:
+            return f[3]
+        return [f[3][i] for i in indices]
+
     def parse(self) -> Iterator[Dict[str, Union[str, int, float]]]:
+        for columns, rows in self.parse_files():
+            for row in rows:
+                yield dict(zip(columns, row))
+
+    def parse_files(self) -> Iterator[Tuple[List[str], Iterator[List]]]:
+        '''Yields the columns of each file and an iterator over its rows.
+
+        Each row is a new list of values in the order of the columns. The
+        rows of a file must be consumed before moving to the next one.
+        '''
         self.finished = False
-        for f in self.files:
-            file_name, format, parser, columns, get_pos, num, den = f
-            self.currently_reading = file_name
-            try:
-                for row in parser:
-                    self.read_count[file_name] += 1
-                    f[-2] = min(den, get_pos())
-                    yield row
-            except Exception as e:
-                msg = self.tr('error-reading-file').format(file_name)
-                raise TableReadingError(msg, file_name, e)
-            f[-1] = get_pos()  # 100% even if denominator fails
+        self.start_time = monotonic()
+        start_file, start_record = self.start
+        for i, f in enumerate(self.files):
+            if i < start_file:
+                continue
+            self.reading_index = i
+            first = start_record if i == start_file else 0
+            yield self.file_columns(f), self._parse_file(f, first)
         self.currently_reading = ''
         self.finished = True
-        if self.fd:
+        for fd in self.fds:
             try:
-                self.fd.close()
+                fd.close()
             except Exception:
                 pass
-            self.fd = None
+        self.fds = []
+
+    def parse_chunks(self, size: int) -> Iterator[Tuple[List[str], List]]:
+        '''Yields the rows in lists of up to ``size`` rows.
+
+        A chunk never mixes rows of different files; it comes with the
+        columns of its file.
+        '''
+        for columns, rows in self.parse_files():
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= size:
+                    yield columns, chunk
+                    chunk = []
+            if chunk:
+                yield columns, chunk
+
+    def _parse_file(self, f: List, first: int = 0) -> Iterator[List]:
+        # Only the row count is updated here; the position in the file is
+        # read when progress() is called. The records before first are
+        # skipped.
+        file_name, format, parser, columns, get_pos, num, den = f
+        self.currently_reading = file_name
+        read_count = self.read_count
+        skipped = self.skipped
+        indices = self.projections.get(file_name)
+        test = None
+        if self.row_filter:
+            test = self.row_filter.compile(columns)
+        if isinstance(parser, DBFReader) and \
+                (test is None or set(parser.field_types) == {'C'}):
+            # The reader skips the other fields and tests the raw bytes
+            if test is not None:
+                parser.row_test = self.row_filter.compile_raw(
+                    columns, parser.field_slices)
+            if indices is not None:
+                parser.select_fields(indices)
+            test = indices = None
+        if isinstance(parser, DBFReader):
+            parser.start_at(first)
+            rows = self._rows(format, parser, len(columns))
+        else:
+            rows = islice(self._rows(format, parser, len(columns)),
+                          first, None)
+            self.resumed[file_name] = first
+        try:
+            for row in rows:
+                if test is not None and not test(row):
+                    skipped[file_name] += 1
+                    continue
+                if indices is not None:
+                    row = [row[i] for i in indices]
+                read_count[file_name] += 1
+                yield row
+        except EncodingChanged as e:
+            e.file_name = file_name
+            raise
+        except Exception as e:
+            msg = self.tr('error-reading-file').format(file_name)
+            raise TableReadingError(msg, file_name, e)
+        f[-1] = max(1, get_pos())  # 100% even if denominator fails
+        f[-2] = f[-1]
+
+    @classmethod
+    def _rows(cls, format: str, parser: UNION_ALL_PARSERS,
+              size: int) -> Iterator[List]:
+        if format == 'CSV':
+            return cls._csv_rows(parser, size)
+        if format == 'XLSX':
+            return cls._xlsx_rows(parser, size)
+        return iter(parser)
 
-    def progress(self) -> Tuple[int, int, int, int, Optional[str]]:
+    @classmethod
+    def _open_dbf(cls, file_name: str,
+                  backend: str) -> Union[DBFReader, 'dbfread.DBF']:
+        if backend == 'fast':
+            try:
+                return DBFReader(file_name)
+            except (OSError, ValueError, struct.error):
+                pass  # dbfread reports the error, if any
+        import dbfread
+        return dbfread.DBF(file_name, recfactory=cls._values)
+
+    @classmethod
+    def _csv_rows(cls, reader: Iterator[List[str]],
+                  size: int) -> Iterator[List]:
+        # Same as csv.DictReader: blank lines are skipped and missing
+        # values are None
+        for row in reader:
+            if len(row) != size:
+                if not row:
+                    continue
+                if len(row) > size:
+                    raise ValueError(
+                        f'line {reader.line_num}: {len(row)} values, '
+                        f'but {size} columns')
+                row += [None] * (size - len(row))
+            yield row
+
+    @classmethod
+    def _xlsx_rows(cls, rows: Iterator, size: int) -> Iterator[List]:
+        padding = [None] * size
+        for row in rows:
+            values = [c.value for c in row]
+            if len(values) != size:
+                values = (values + padding)[:size]
+            yield values
+
+    @classmethod
+    def _values(cls, items: List[Tuple[str, Any]]) -> List:
+        return [value for name, value in items]
+
+    def progress(self) -> Progress:
+        # This can be called from any thread while the files are read
         overall_num = 0
         overall_den = 0
         current = None
+        reading = self.currently_reading
         try:
             for f in self.files:
                 file_name, format, parser, columns, get_pos, num, den = f
+                if file_name == reading and num < den:
+                    num = min(den, get_pos())
                 overall_num += num
                 overall_den += den
                 if current is None and num < den:
                     current = (num, den)
+            skipped = sum(self.skipped.values()) + sum(
+                f[2].skipped for f in self.files
+                if isinstance(f[2], DBFReader))
+            rows = sum(self.read_count.values()) + skipped
         except Exception:
-            return (0, 1, 0, 1, '')
-        else:
-            if current is None:
-                current = (overall_num and 1, 1)
-            return (*current, overall_num, overall_den, self.currently_reading)
-
-    def _count_lines_and_guess_encoding(self, file_name: str) -> \
-            Tuple[int, str]:
-        encodings = [
-            'UTF-8-sig', 'UTF-8', 'UTF-16-BE', 'UTF-16-LE',
-            'CP1252', 'ISO-8859-15'
-        ]  # the last ones are common in Brazil (on Windows)
-        for enc in encodings:
+            return Progress(0, 1, 0, 1, '')
+        if current is None:
+            current = (overall_num and 1, 1)
+        rows_per_second = 0.0
+        eta = None
+        if self.start_time is not None:
+            elapsed = monotonic() - self.start_time
+            if elapsed > 0:
+                rows_per_second = rows / elapsed
+            if overall_num > 0:
+                eta = elapsed * (overall_den - overall_num) / overall_num
+        return Progress(*current, overall_num, overall_den, reading,
+                        rows, rows_per_second, eta, skipped)
+
+    def detected_encodings(self) -> Dict[str, str]:
+        # After reading, this reflects any fallback that happened
+        return {fn: r.encoding for fn, r in self.line_readers.items()}
+
+    def _guess_encoding(self, fd: BinaryIO, file_name: str,
+                        sample: bool = True) -> Tuple[str, str]:
+        # Only a bounded sample of the file is decoded here; if the guess
+        # turns out to be wrong later, DecodedLineReader falls back
+        block_size = DecodedLineReader.BLOCK_SIZE
+        head = fd.read(block_size)
+        final = len(head) < block_size
+        blocks = []
+        if sample and not final:
+            size = os.fstat(fd.fileno()).st_size
+            n = self.SAMPLE_MIDDLE_BLOCKS
+            offsets = [(size - block_size) * i // (n + 1)
+                       for i in range(1, n + 2)]
+            for offset in sorted(set(max(block_size, o - o % 4)
+                                     for o in offsets)):
+                fd.seek(offset)
+                block = fd.read(block_size + 4)
+                blocks.append((block, offset + len(block) >= size))
+        for enc in self.ENCODINGS:
             try:
-                with open(file_name, 'r', encoding=enc) as fd:
-                    first = fd.readline()
-                    if not set(first).intersection(set(',;:- \t')):
-                        continue
-                    n = 1 + sum(bool(ll.strip()) for ll in fd)
+                text = DecodedLineReader._new_decoder(enc).decode(head, final)
             except UnicodeDecodeError:
-                pass
-            else:
-                return n, enc
+                continue
+            first = text.split('\n', 1)[0]
+            if not set(first).intersection(set(',;:- \t')):
+                continue
+            if all(self._decodes_block(b, enc, f) for b, f in blocks):
+                return enc, text
         msg = self.tr('unsupported-invalid-file').format(file_name)
         raise TableReadingError(msg, file_name)
+
+    @classmethod
+    def _decodes_block(cls, block: bytes, encoding: str,
+                       final: bool) -> bool:
+        # The block may start in the middle of a multi-byte character
+        for skip in range(4):
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                decoder.decode(block[skip:], final)
+            except UnicodeDecodeError:
+                continue
+            return True
+        return False
+
+    @classmethod
+    def _decode_head(cls, fd: BinaryIO, encoding: str) -> str:
+        head = fd.read(DecodedLineReader.BLOCK_SIZE)
+        final = len(head) < DecodedLineReader.BLOCK_SIZE
+        return DecodedLineReader._new_decoder(encoding).decode(head, final)
+
+    def _decode_head_fallback(self, fd: BinaryIO,
+                              file_name: str) -> Tuple[List[str], str]:
+        # The first of the encodings left that decodes the head
+        encodings = self.fallbacks[file_name]
+        head = fd.read(DecodedLineReader.BLOCK_SIZE)
+        final = len(head) < DecodedLineReader.BLOCK_SIZE
+        for i, encoding in enumerate(encodings):
+            decoder = DecodedLineReader._new_decoder(encoding)
+            try:
+                return encodings[i:], decoder.decode(head, final)
+            except UnicodeDecodeError:
+                continue
+        msg = self.tr('unsupported-invalid-file').format(file_name)
+        raise TableReadingError(msg, file_name)
+
+    def _fallbacks(self, encoding: str) -> List[str]:
+        if encoding not in self.ASCII_COMPATIBLE_ENCODINGS:
+            return [encoding]
+        idx = self.ASCII_COMPATIBLE_ENCODINGS.index(encoding)
+        return self.ASCII_COMPATIBLE_ENCODINGS[idx:]
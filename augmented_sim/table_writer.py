@@ -1,11 +1,18 @@
 # coding=utf-8
 
-from typing import Optional, Callable, Any, List, Dict, Union
+from typing import Optional, Callable, Any, List, Dict, Union, Sequence, \
+    Iterable, TYPE_CHECKING
 import csv
+import io
 import os
 
+from augmented_sim.compression import compression_suffix, open_output
 from augmented_sim.i18n import get_translator, get_tr
 
+# pyarrow is only imported for the columnar formats
+if TYPE_CHECKING:
+    import pyarrow
+
 
 class TableWritingError(Exception):
 
@@ -24,79 +31,235 @@ class TableWritingError(Exception):
     def handle_exceptions(self, function: Callable) -> Callable:
 
         def f(*args, **kwargs) -> Any:
-            self.trans = get_translator(None)
-            self.tr = get_tr('TableWritingError', self.trans)
-            if hasattr(args[0], 'file_name'):
-                self.file_name = args[0].file_name
-            else:  # constructor of TableWriter
-                self.file_name = args[3]
             try:
-                function(*args, **kwargs)
-            except FileNotFoundError as e:
-                msg = self.tr('invalid-path').format(e.filename)
-                raise TableWritingError(msg, e.filename, e)
-            except IsADirectoryError as e:
-                msg = self.tr('output-file-is-directory').format(e.filename)
-                raise TableWritingError(msg, e.filename, e)
-            except PermissionError as e:
-                msg = self.tr('forbidden')
-                raise TableWritingError(msg, e.filename, e)
-            except OSError as e:
-                import errno
-                error = errno.errorcode.get(e.errno, '')
-                if error == 'ENOSPC':
-                    msg = self.tr('insufficient-space')
-                elif error == 'EROFS':
-                    msg = self.tr('read-only')
-                elif error.endswith('NAMETOOLONG'):
-                    msg = self.tr('long-file-name').format(e.filename)
-                else:
-                    msg = os.strerror(e.errno)
-                raise TableWritingError(msg, self.file_name, e)
+                return function(*args, **kwargs)
             except BaseException as e:
-                raise TableWritingError(str(e), self.file_name, e)
+                # The translator is only needed when something goes wrong
+                self.trans = get_translator(None)
+                self.tr = get_tr('TableWritingError', self.trans)
+                if hasattr(args[0], 'file_name'):
+                    self.file_name = args[0].file_name
+                else:  # constructor of TableWriter
+                    self.file_name = args[3]
+                raise self.convert(e)
         return f
 
+    def convert(self, e: BaseException) -> 'TableWritingError':
+        if isinstance(e, FileNotFoundError):
+            msg = self.tr('invalid-path').format(e.filename)
+            return TableWritingError(msg, e.filename, e)
+        if isinstance(e, IsADirectoryError):
+            msg = self.tr('output-file-is-directory').format(e.filename)
+            return TableWritingError(msg, e.filename, e)
+        if isinstance(e, PermissionError):
+            msg = self.tr('forbidden')
+            return TableWritingError(msg, e.filename, e)
+        if isinstance(e, OSError):
+            import errno
+            error = errno.errorcode.get(e.errno, '')
+            if error == 'ENOSPC':
+                msg = self.tr('insufficient-space')
+            elif error == 'EROFS':
+                msg = self.tr('read-only')
+            elif error.endswith('NAMETOOLONG'):
+                msg = self.tr('long-file-name').format(e.filename)
+            else:
+                msg = os.strerror(e.errno)
+            return TableWritingError(msg, self.file_name, e)
+        return TableWritingError(str(e), self.file_name, e)
+
 
 handle_table_writing_exceptions = TableWritingError('', '').handle_exceptions
 
 
 class TableWriter:
+    '''Writes a table as CSV, Parquet or Arrow IPC (Feather).
+
+    Parquet and Arrow files have typed columns (see ``types``; the others
+    are text). Rows are converted to columns in small batches and written
+    in row groups, so memory does not grow with the number of rows.
+    '''
+
+    FORMATS = ['CSV', 'PARQUET', 'ARROW']
+    SUFFIXES = {'.parquet': 'PARQUET', '.arrow': 'ARROW', '.feather': 'ARROW'}
+
+    # Rows kept as Python objects before conversion, and rows per row group
+    BATCH_SIZE = 10000
+    ROW_GROUP_SIZE = 100000
 
     @handle_table_writing_exceptions
-    def __init__(self, format: str, columns: List[str], file_name: str):
+    def __init__(self, format: str, columns: List[str], file_name: str,
+                 types: Optional[Dict[str, str]] = None,
+                 resume_at: Optional[int] = None):
         self.trans = get_translator(None)
         self.tr = get_tr(type(self).__name__, self.trans)
         self.file_name = file_name
         self.format = format.upper()
+        self.columns = columns
         self.fd = None
         self.writer = None
-        if format not in ['CSV']:
+        format = self.format
+        if format not in self.FORMATS:
             msg = self.tr('unsupported-file').format(file_name)
             raise TableWritingError(msg, file_name)
         if format == 'CSV':
-            self.fd = open(self.file_name, 'w', newline='',)
-            self.writer = csv.DictWriter(
+            if compression_suffix(file_name):
+                # Compressed while it is written, according to the suffix
+                self.fd = io.TextIOWrapper(open_output(file_name),
+                                           newline='')
+            elif resume_at is not None:
+                # What was written after this position is discarded
+                os.truncate(self.file_name, resume_at)
+                self.fd = open(self.file_name, 'a', newline='')
+            else:
+                self.fd = open(self.file_name, 'w', newline='',)
+            self.writer = csv.writer(
                 self.fd,
-                columns,
                 delimiter=',',
                 quoting=csv.QUOTE_NONNUMERIC
             )
         else:
-            pass  # possibly add support to more formats later
+            self._open_columnar(types or {})
+
+    @classmethod
+    def format_for(cls, file_name: str) -> str:
+        # Output format implied by the file name (CSV by default)
+        suffix = os.path.splitext(file_name)[1].lower()
+        return cls.SUFFIXES.get(suffix, 'CSV')
+
+    def _open_columnar(self, types: Dict[str, str]) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            msg = self.tr('missing-package').format(self.format, 'pyarrow')
+            raise TableWritingError(msg, self.file_name)
+        self.pa = pa
+        arrow_types = {
+            'int': pa.int32(),
+            'dictionary': pa.dictionary(pa.int32(), pa.string())
+        }
+        self.kinds = [types.get(c, 'text') for c in self.columns]
+        self.schema = pa.schema([
+            pa.field(c, arrow_types.get(k, pa.string()))
+            for c, k in zip(self.columns, self.kinds)
+        ])
+        # Dictionaries only grow, so each row group extends the previous
+        # one (as Arrow IPC files require)
+        self.dictionaries = [{} for c in self.columns]
+        self.pending = []
+        self.batches = []
+        self.batch_rows = 0
+        if self.format == 'PARQUET':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(
+                self.file_name, self.schema, compression='zstd')
+        else:
+            import pyarrow.ipc as ipc
+            options = ipc.IpcWriteOptions(
+                compression='zstd', emit_dictionary_deltas=True)
+            self.writer = ipc.new_file(
+                self.file_name, self.schema, options=options)
+        self.fd = self.writer
+
+    def _convert(self, values: Sequence, kind: str,
+                 dictionary: Dict[str, int]) -> 'pyarrow.Array':
+        pa = self.pa
+        if kind == 'int':
+            return pa.array(
+                [None if v is None or v == '' else int(v) for v in values],
+                pa.int32())
+        values = [None if v is None else str(v) for v in values]
+        if kind == 'dictionary':
+            return pa.array(
+                [None if v is None else dictionary.setdefault(
+                    v, len(dictionary)) for v in values],
+                pa.int32())
+        return pa.array(values, pa.string())
+
+    def _flush_batch(self) -> None:
+        if self.pending:
+            columns = zip(*self.pending)
+            self.batches.append([
+                self._convert(values, kind, dictionary)
+                for values, kind, dictionary
+                in zip(columns, self.kinds, self.dictionaries)
+            ])
+            self.batch_rows += len(self.pending)
+            self.pending = []
+        if self.batch_rows >= self.ROW_GROUP_SIZE:
+            self._write_row_group()
+
+    def _write_row_group(self) -> None:
+        if not self.batches:
+            return
+        pa = self.pa
+        arrays = []
+        for i, kind in enumerate(self.kinds):
+            array = pa.concat_arrays([b[i] for b in self.batches])
+            if kind == 'dictionary':
+                array = pa.DictionaryArray.from_arrays(
+                    array, pa.array(list(self.dictionaries[i]), pa.string()))
+            arrays.append(array)
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self.writer.write_batch(batch)
+        self.batches = []
+        self.batch_rows = 0
 
     def __enter__(self):
         return self
 
     @handle_table_writing_exceptions
     def __exit__(self, *args):
+        if self.format != 'CSV' and self.writer and args[0] is None:
+            self._flush_batch()
+            self._write_row_group()
         if self.fd:
             self.fd.close()
 
+    @handle_table_writing_exceptions
+    def flush(self) -> int:
+        # Only for uncompressed CSV; returns the size of the file
+        self.fd.flush()
+        os.fsync(self.fd.fileno())
+        return self.fd.buffer.tell()
+
     @handle_table_writing_exceptions
     def write_header(self) -> None:
-        self.writer.writeheader()
+        if self.format == 'CSV':
+            self.writer.writerow(self.columns)
 
     @handle_table_writing_exceptions
     def write_row(self, row: Dict[str, Union[str, int, float]]) -> None:
-        self.writer.writerow(row)
+        self._write([row.get(c, '') for c in self.columns])
+
+    @handle_table_writing_exceptions
+    def write_values(self, values: Sequence) -> None:
+        # Values in the order of the columns
+        self._write(values)
+
+    @handle_table_writing_exceptions
+    def write_raw(self, text: str) -> None:
+        # Rows already formatted as CSV (e.g. copied from another file)
+        self.fd.write(text)
+
+    @handle_table_writing_exceptions
+    def write_many(self, rows: Iterable[Sequence]) -> None:
+        self._write_many(rows)
+
+    def _write_many(self, rows: Iterable[Sequence]) -> None:
+        if self.format == 'CSV':
+            self.writer.writerows(rows)
+            return
+        pending = self.pending
+        batch_size = self.BATCH_SIZE
+        for row in rows:
+            pending.append(row)
+            if len(pending) >= batch_size:
+                self._flush_batch()
+                pending = self.pending
+
+    def _write(self, values: Sequence) -> None:
+        if self.format == 'CSV':
+            self.writer.writerow(values)
+        else:
+            self._write_many([values])
@@ -49,7 +49,7 @@ s = setup(
     install_requires=DEPENDENCIES,
     package_data={'augmented_sim':
                     ['../README.md', '../LICENCE.txt', '.licences/*',
-                     'i18n/*.qm']},
+                     'i18n/*.qm', 'i18n/*.ts']},
     include_package_data=True,
 
     entry_points={
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import unittest
+
+from augmented_sim.row_plan import RowPlan
+from augmented_sim.sim.death_cause_augmenter import DeathCauseAugmenter
+from augmented_sim.sim.input_pattern import ALL_PATTERNS
+from augmented_sim.sim.row_parser import SIMRowParser
+
+
+class MissingDateTest(unittest.TestCase):
+    '''A valid cause with a missing or invalid date of death.'''
+
+    def test_row(self) -> None:
+        icd = SIMRowParser.parse_icd('B342')
+        values = DeathCauseAugmenter.get_new_values(
+            {'CAUSABAS': icd, 'DTOBITO': None})
+        self.assertEqual(values['COVID'], 1)  # not before 2020
+        self.assertEqual(values['CAPCID'], 1)
+
+    def test_batch(self) -> None:
+        values = DeathCauseAugmenter.get_new_values_batch({
+            'CAUSABAS': ['B342', 'B342', 'B342', 'B342'],
+            'DTOBITO': ['', None, '32132019', '01012019']
+        })
+        self.assertEqual(list(values['COVID']), [1, 1, 1, 0])
+        self.assertEqual(list(values['CAPCID']), [1, 1, 1, 1])
+
+    def test_chunk(self) -> None:
+        # The other rows of the chunk are augmented as usual
+        cols = ['NUMERODO', 'DTOBITO', 'CAUSABAS']
+        out_cols = [*cols, 'CAPCID', 'COVID']
+        plan = RowPlan(ALL_PATTERNS['10.2020'], cols, out_cols,
+                       [DeathCauseAugmenter])
+        rows = plan.augment_chunk([
+            ['1', '', 'B342'],
+            ['2', '15062021', 'I219'],
+        ])
+        self.assertEqual(rows[0][3:], (1, 1))
+        self.assertEqual(rows[1][3:], (9, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
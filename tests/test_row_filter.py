@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+import datetime
+import unittest
+
+from augmented_sim.row_filter import RowFilter
+
+
+class DateRangeTest(unittest.TestCase):
+    '''Dates of death in a range, as text and as raw DBF fields.'''
+
+    DATES = ['15032020', '1032020', '32012020', '15132020', '00032020',
+             '30022020', '29022020', '1503202O', '']
+
+    def setUp(self) -> None:
+        self.row_filter = RowFilter(date_from=datetime.date(2020, 1, 1),
+                                    date_to=datetime.date(2020, 12, 31))
+
+    def test_row(self) -> None:
+        test = self.row_filter.compile(['DTOBITO'])
+        self.assertEqual([test([d]) for d in self.DATES], [
+            True, True, False, False, False, False, True, False, False])
+
+    def test_raw(self) -> None:
+        test = self.row_filter.compile_raw(['DTOBITO'], [(0, 8)])
+        self.assertEqual(
+            [test(d.ljust(8).encode('ascii'), 0) for d in self.DATES],
+            [True, True, False, False, False, False, True, False, False])
+
+    def test_years(self) -> None:
+        test = RowFilter(years=[2020]).compile(['DTOBITO'])
+        self.assertFalse(test(['32132020']))
+        self.assertTrue(test(['31122020']))
+
+
+if __name__ == '__main__':
+    unittest.main()